@@ -0,0 +1,30 @@
+"""Add full-text and trigram search indexes to transactions
+
+Revision ID: 0b7e4d2a9c56
+Revises: f3d62a9c8e14
+Create Date: 2025-09-17 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e4d2a9c56'
+down_revision: Union[str, Sequence[str], None] = 'f3d62a9c8e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_transactions_description_tsv', 'transactions', [sa.text("to_tsvector('spanish'::regconfig, description)")], unique=False, postgresql_using='gin')
+    op.create_index('ix_transactions_description_trgm', 'transactions', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_description_trgm', table_name='transactions', postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+    op.drop_index('ix_transactions_description_tsv', table_name='transactions', postgresql_using='gin')
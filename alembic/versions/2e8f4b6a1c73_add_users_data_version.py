@@ -0,0 +1,27 @@
+"""Add data_version to users
+
+Revision ID: 2e8f4b6a1c73
+Revises: 7a1c5e9b3d20
+Create Date: 2025-09-19 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8f4b6a1c73'
+down_revision: Union[str, Sequence[str], None] = '7a1c5e9b3d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'data_version')
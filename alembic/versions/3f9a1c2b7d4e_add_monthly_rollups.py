@@ -0,0 +1,61 @@
+"""Add monthly_rollups table
+
+Revision ID: 3f9a1c2b7d4e
+Revises: d70ff6c88081
+Create Date: 2025-09-02 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d4e'
+down_revision: Union[str, Sequence[str], None] = 'd70ff6c88081'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('monthly_rollups',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.UUID(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('first_date', sa.TIMESTAMP(), nullable=False),
+    sa.Column('last_date', sa.TIMESTAMP(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['transaction_categories.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'year', 'month', 'category_id', 'type')
+    )
+
+    # Cargar los rollups con el historial existente.
+    op.execute(
+        """
+        INSERT INTO monthly_rollups
+            (user_id, year, month, category_id, type,
+             total_amount, transaction_count, first_date, last_date)
+        SELECT user_id,
+               CAST(EXTRACT(YEAR FROM date) AS INTEGER),
+               CAST(EXTRACT(MONTH FROM date) AS INTEGER),
+               category_id,
+               type,
+               SUM(amount),
+               COUNT(*),
+               MIN(date),
+               MAX(date)
+        FROM transactions
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('monthly_rollups')
@@ -0,0 +1,34 @@
+"""Add user_id to the transactions search indexes
+
+Revision ID: 4c7d2e9f1a85
+Revises: 2e8f4b6a1c73
+Create Date: 2025-09-20 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '4c7d2e9f1a85'
+down_revision: Union[str, Sequence[str], None] = '2e8f4b6a1c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.drop_index('ix_transactions_description_trgm', table_name='transactions', postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+    op.drop_index('ix_transactions_description_tsv', table_name='transactions', postgresql_using='gin')
+    op.create_index('ix_transactions_description_tsv', 'transactions', ['user_id', sa.text("to_tsvector('spanish'::regconfig, description)")], unique=False, postgresql_using='gin')
+    op.create_index('ix_transactions_description_trgm', 'transactions', ['user_id', 'description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_description_trgm', table_name='transactions', postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+    op.drop_index('ix_transactions_description_tsv', table_name='transactions', postgresql_using='gin')
+    op.create_index('ix_transactions_description_tsv', 'transactions', [sa.text("to_tsvector('spanish'::regconfig, description)")], unique=False, postgresql_using='gin')
+    op.create_index('ix_transactions_description_trgm', 'transactions', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
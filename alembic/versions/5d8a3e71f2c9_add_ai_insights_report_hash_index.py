@@ -0,0 +1,27 @@
+"""Add report_hash expression index to ai_insights
+
+Revision ID: 5d8a3e71f2c9
+Revises: b6e2f9a4c013
+Create Date: 2025-09-10 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8a3e71f2c9'
+down_revision: Union[str, Sequence[str], None] = 'b6e2f9a4c013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_ai_insights_report_hash', 'ai_insights', [sa.text("(metadata ->> 'report_hash')")], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ai_insights_report_hash', table_name='ai_insights')
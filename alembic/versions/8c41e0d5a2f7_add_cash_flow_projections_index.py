@@ -0,0 +1,27 @@
+"""Add (user_id, date) index to cash_flow_projections
+
+Revision ID: 8c41e0d5a2f7
+Revises: 3f9a1c2b7d4e
+Create Date: 2025-09-05 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e0d5a2f7'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2b7d4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_cash_flow_projections_user_id_date', 'cash_flow_projections', ['user_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cash_flow_projections_user_id_date', table_name='cash_flow_projections')
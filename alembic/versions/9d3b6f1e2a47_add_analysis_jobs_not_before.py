@@ -0,0 +1,27 @@
+"""Add not_before to analysis_jobs
+
+Revision ID: 9d3b6f1e2a47
+Revises: 4c7d2e9f1a85
+Create Date: 2025-09-21 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b6f1e2a47'
+down_revision: Union[str, Sequence[str], None] = '4c7d2e9f1a85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('analysis_jobs', sa.Column('not_before', sa.TIMESTAMP(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('analysis_jobs', 'not_before')
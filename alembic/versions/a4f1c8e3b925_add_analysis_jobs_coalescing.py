@@ -0,0 +1,34 @@
+"""Add dedup_key and coalesced_count to analysis_jobs
+
+Revision ID: a4f1c8e3b925
+Revises: e27c94b1d6a8
+Create Date: 2025-09-13 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f1c8e3b925'
+down_revision: Union[str, Sequence[str], None] = 'e27c94b1d6a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('analysis_jobs', sa.Column('dedup_key', sa.String(), nullable=True))
+    op.add_column('analysis_jobs', sa.Column('coalesced_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(
+        'uq_analysis_jobs_active_dedup_key', 'analysis_jobs', ['user_id', 'dedup_key'],
+        unique=True, postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_analysis_jobs_active_dedup_key', table_name='analysis_jobs')
+    op.drop_column('analysis_jobs', 'coalesced_count')
+    op.drop_column('analysis_jobs', 'dedup_key')
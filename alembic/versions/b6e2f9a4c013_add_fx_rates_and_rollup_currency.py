@@ -0,0 +1,90 @@
+"""Add fx_rates table and currency to monthly_rollups
+
+Revision ID: b6e2f9a4c013
+Revises: 8c41e0d5a2f7
+Create Date: 2025-09-08 11:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2f9a4c013'
+down_revision: Union[str, Sequence[str], None] = '8c41e0d5a2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fx_rates',
+    sa.Column('id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('currency', sa.String(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('rate', sa.Numeric(precision=18, scale=6), nullable=False),
+    sa.Column('source', sa.String(), server_default='BCRA', nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('currency', 'date', name='uq_fx_rates_currency_date')
+    )
+
+    # Los rollups pasan a acumularse por moneda: se agrega la columna a la clave
+    # primaria y se recalculan desde las transacciones.
+    op.add_column('monthly_rollups', sa.Column('currency', sa.String(), server_default='ARS', nullable=False))
+    op.drop_constraint('monthly_rollups_pkey', 'monthly_rollups', type_='primary')
+    op.create_primary_key(
+        'monthly_rollups_pkey', 'monthly_rollups',
+        ['user_id', 'year', 'month', 'category_id', 'type', 'currency'],
+    )
+    op.execute("DELETE FROM monthly_rollups")
+    op.execute(
+        """
+        INSERT INTO monthly_rollups
+            (user_id, year, month, category_id, type, currency,
+             total_amount, transaction_count, first_date, last_date)
+        SELECT user_id,
+               CAST(EXTRACT(YEAR FROM date) AS INTEGER),
+               CAST(EXTRACT(MONTH FROM date) AS INTEGER),
+               category_id,
+               type,
+               COALESCE(currency, 'ARS'),
+               SUM(amount),
+               COUNT(*),
+               MIN(date),
+               MAX(date)
+        FROM transactions
+        GROUP BY 1, 2, 3, 4, 5, 6
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM monthly_rollups")
+    op.drop_constraint('monthly_rollups_pkey', 'monthly_rollups', type_='primary')
+    op.drop_column('monthly_rollups', 'currency')
+    op.create_primary_key(
+        'monthly_rollups_pkey', 'monthly_rollups',
+        ['user_id', 'year', 'month', 'category_id', 'type'],
+    )
+    op.execute(
+        """
+        INSERT INTO monthly_rollups
+            (user_id, year, month, category_id, type,
+             total_amount, transaction_count, first_date, last_date)
+        SELECT user_id,
+               CAST(EXTRACT(YEAR FROM date) AS INTEGER),
+               CAST(EXTRACT(MONTH FROM date) AS INTEGER),
+               category_id,
+               type,
+               SUM(amount),
+               COUNT(*),
+               MIN(date),
+               MAX(date)
+        FROM transactions
+        GROUP BY 1, 2, 3, 4, 5
+        """
+    )
+    op.drop_table('fx_rates')
@@ -0,0 +1,27 @@
+"""Add (user_id, created_at, id) index to ai_insights
+
+Revision ID: c9b5e2d7f301
+Revises: a4f1c8e3b925
+Create Date: 2025-09-15 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9b5e2d7f301'
+down_revision: Union[str, Sequence[str], None] = 'a4f1c8e3b925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_ai_insights_user_id_created_at_id', 'ai_insights', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ai_insights_user_id_created_at_id', table_name='ai_insights')
@@ -0,0 +1,31 @@
+"""Add keyset listing indexes to transactions
+
+Revision ID: f3d62a9c8e14
+Revises: c9b5e2d7f301
+Create Date: 2025-09-16 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3d62a9c8e14'
+down_revision: Union[str, Sequence[str], None] = 'c9b5e2d7f301'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_user_id_date_id', 'transactions', ['user_id', 'date', 'id'], unique=False)
+    op.create_index('ix_transactions_user_id_type_date_id', 'transactions', ['user_id', 'type', 'date', 'id'], unique=False)
+    op.create_index('ix_transactions_user_id_category_id_date_id', 'transactions', ['user_id', 'category_id', 'date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_user_id_category_id_date_id', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_type_date_id', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_date_id', table_name='transactions')
@@ -0,0 +1,134 @@
+"""
+Benchmark de la serialización de los listados de transacciones: la respuesta con
+`response_model` que valida cada objeto del ORM con Pydantic (como antes) contra la
+respuesta armada como diccionarios y serializada con orjson (`FastJSONResponse`),
+completa y en modo compacto.
+
+Cada variante se sirve desde una aplicación FastAPI en el mismo proceso, con páginas
+de transacciones ya construidas, y se llama directamente por ASGI (sin red ni base de
+datos), así que las solicitudes por segundo miden solo el costo de armar y serializar
+la respuesta.
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.benchmark_list_responses
+    python -m scripts.benchmark_list_responses --page-size 1000 --requests 200
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+from src.core.responses import FastJSONResponse
+from src.db.models import Transaction, TransactionCategory
+from src.schemas.transaction import TransactionPage
+from src.services.transaction_listing import CATEGORY_FIELDS, transaction_dict, transaction_with_category_dict
+
+CATEGORY_NAMES = [
+    "Ventas", "Servicios Profesionales", "Salarios", "Alquiler", "Servicios Públicos",
+    "Marketing", "Software y Suscripciones", "Insumos de Oficina", "Impuestos", "Otros Egresos",
+]
+
+
+def build_page(page_size: int, seed: int = 42):
+    """Devuelve la misma página como objetos del ORM y como filas de columnas."""
+    rnd = random.Random(seed)
+    categories = [
+        TransactionCategory(id=uuid.uuid4(), name=name, type="income" if i < 2 else "expense", color="#6B7280", is_default=True)
+        for i, name in enumerate(CATEGORY_NAMES)
+    ]
+    user_id = uuid.uuid4()
+    start = datetime(2024, 1, 1)
+    orm_rows, column_rows = [], []
+    for i in range(page_size):
+        category = rnd.choice(categories)
+        values = {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "category_id": category.id,
+            "description": f"Movimiento {i}",
+            "amount": Decimal(rnd.randint(100, 10**8)).scaleb(-2),
+            "currency": "ARS",
+            "type": category.type,
+            "date": start + timedelta(minutes=rnd.randint(0, 500_000)),
+            "created_at": start,
+        }
+        orm_rows.append(Transaction(**values, category=category))
+        column_rows.append(SimpleNamespace(**values, **{f"category__{f}": getattr(category, f) for f in CATEGORY_FIELDS}))
+    category_table = [{f: getattr(c, f) for f in CATEGORY_FIELDS} for c in categories]
+    return orm_rows, column_rows, category_table
+
+
+def build_app(orm_rows, column_rows, category_table) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before", response_model=TransactionPage)
+    async def before():
+        return {"items": orm_rows, "next_cursor": None}
+
+    @app.get("/after", response_class=FastJSONResponse)
+    async def after():
+        return FastJSONResponse({"items": [transaction_with_category_dict(r) for r in column_rows], "next_cursor": None})
+
+    @app.get("/after-compact", response_class=FastJSONResponse)
+    async def after_compact():
+        return FastJSONResponse({
+            "items": [transaction_dict(r) for r in column_rows],
+            "categories": category_table,
+            "next_cursor": None,
+        })
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    """Hace una solicitud GET directamente por ASGI y devuelve el cuerpo."""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": path,
+        "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def run_benchmark(page_size: int, requests: int) -> None:
+    app = build_app(*build_page(page_size))
+    print(f"Páginas de {page_size} transacciones, {requests} solicitudes por variante")
+    print(f"{'Variante':>22} | {'Solicitudes/s':>13} | {'ms/solicitud':>12} | {'Tamaño (KB)':>11}")
+    print("-" * 68)
+    baseline = None
+    for name, path in [("Pydantic (antes)", "/before"), ("orjson", "/after"), ("orjson compacto", "/after-compact")]:
+        size = len(await call(app, path))  # Precalentamiento.
+        started = time.perf_counter()
+        for _ in range(requests):
+            await call(app, path)
+        elapsed = time.perf_counter() - started
+        rate = requests / elapsed
+        baseline = baseline or rate
+        print(
+            f"{name:>22} | {rate:>13.1f} | {1000 * elapsed / requests:>12.2f} | {size / 1024:>11.1f}"
+            + ("" if rate == baseline else f"  ({rate / baseline:.1f}x)")
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=1000, help="Transacciones por página.")
+    parser.add_argument("--requests", type=int, default=100, help="Solicitudes por variante.")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.page_size, args.requests))
@@ -0,0 +1,105 @@
+"""
+Benchmark del cálculo de métricas: implementación de referencia con `Decimal`
+(`calculate_financial_metrics`) contra el motor columnar con NumPy
+(`calculate_financial_metrics_columnar`), sobre transacciones sintéticas.
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.benchmark_metrics
+    python -m scripts.benchmark_metrics --sizes 10000 1000000 10000000 --max-loop-size 0
+
+Construir 10 millones de objetos para el bucle con `Decimal` requiere varios GB
+de memoria, por eso por defecto el bucle solo se ejecuta hasta `--max-loop-size`
+transacciones (0 = sin límite). En los tamaños donde corren ambas
+implementaciones se verifica además que los resultados sean idénticos.
+"""
+import argparse
+import time
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.services.financial_analysis import calculate_financial_metrics
+from src.services.metrics_engine import (
+    TYPE_EXPENSE,
+    TYPE_INCOME,
+    calculate_financial_metrics_columnar,
+)
+
+CATEGORY_NAMES = [
+    "Ventas", "Servicios Profesionales", "Salarios", "Alquiler", "Servicios Públicos",
+    "Marketing", "Software y Suscripciones", "Insumos de Oficina", "Impuestos", "Otros Egresos",
+]
+# Las dos primeras categorías son de ingresos, el resto de egresos.
+INCOME_CATEGORIES = 2
+
+
+def generate_columns(size: int, seed: int = 42):
+    """Genera columnas sintéticas con montos entre $1 y $1.000.000 a lo largo de tres años."""
+    rng = np.random.default_rng(seed)
+    category_codes = rng.integers(0, len(CATEGORY_NAMES), size=size, dtype=np.int32)
+    type_codes = np.where(category_codes < INCOME_CATEGORIES, TYPE_INCOME, TYPE_EXPENSE).astype(np.int8)
+    amount_cents = rng.integers(100, 100_000_000, size=size, dtype=np.int64)
+    start = np.datetime64("2022-01-01T00:00:00", "s")
+    dates = start + rng.integers(0, 3 * 365 * 24 * 3600, size=size).astype("timedelta64[s]")
+    return amount_cents, type_codes, category_codes, dates
+
+
+def build_transactions(amount_cents, type_codes, category_codes, dates):
+    """Construye objetos equivalentes a `Transaction` para la implementación de referencia."""
+    categories = [SimpleNamespace(name=name) for name in CATEGORY_NAMES]
+    types = {TYPE_INCOME: "income", TYPE_EXPENSE: "expense"}
+    return [
+        SimpleNamespace(
+            amount=Decimal(int(cents)).scaleb(-2),
+            type=types[int(tipo)],
+            category=categories[int(code)],
+            date=datetime.fromisoformat(str(date)),
+        )
+        for cents, tipo, code, date in zip(
+            amount_cents.tolist(), type_codes.tolist(), category_codes.tolist(), dates.astype("datetime64[s]")
+        )
+    ]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(sizes, max_loop_size: int):
+    print(f"{'Transacciones':>14} | {'Decimal (s)':>12} | {'NumPy (s)':>10} | {'Aceleración':>11} | Resultado")
+    print("-" * 72)
+    for size in sizes:
+        columns = generate_columns(size)
+        columnar, columnar_time = timed(
+            calculate_financial_metrics_columnar,
+            columns[0], columns[1], columns[2], CATEGORY_NAMES, columns[3],
+        )
+
+        if max_loop_size and size > max_loop_size:
+            print(f"{size:>14,} | {'omitido':>12} | {columnar_time:>10.3f} | {'-':>11} | -")
+            continue
+
+        transactions = build_transactions(*columns)
+        reference, loop_time = timed(calculate_financial_metrics, transactions)
+        del transactions
+
+        identical = reference == columnar and list(reference["desglose_egresos"]) == list(columnar["desglose_egresos"])
+        print(
+            f"{size:>14,} | {loop_time:>12.3f} | {columnar_time:>10.3f} | "
+            f"{loop_time / columnar_time:>10.1f}x | {'idéntico' if identical else 'DIFERENTE'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument(
+        "--max-loop-size", type=int, default=1_000_000,
+        help="Tamaño máximo para ejecutar la implementación con Decimal (0 = sin límite).",
+    )
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.max_loop_size)
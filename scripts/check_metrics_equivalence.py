@@ -0,0 +1,91 @@
+"""
+Verifica que los cálculos de métricas agregados en la base de datos
+(`calculate_financial_metrics_from_db` y `calculate_financial_metrics_from_rollups`)
+produzcan exactamente el mismo resultado que la implementación de referencia
+en Python (`calculate_financial_metrics`).
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.check_metrics_equivalence
+    python -m scripts.check_metrics_equivalence --user-id <uuid>
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from src.db.session import AsyncSessionLocal
+from src.db.models import Transaction, User
+from src.services.financial_analysis import (
+    calculate_financial_metrics,
+    calculate_financial_metrics_from_db,
+    calculate_financial_metrics_from_rollups,
+)
+
+
+def compare_metrics(reference: Dict[str, Any], candidate: Dict[str, Any]) -> List[str]:
+    """
+    Compara dos diccionarios de métricas y devuelve la lista de diferencias.
+
+    Además de los valores, verifica que el desglose de egresos esté ordenado
+    de mayor a menor en ambos casos (el orden entre montos empatados puede variar).
+    """
+    differences = []
+    if reference.keys() != candidate.keys():
+        differences.append(f"claves distintas: {sorted(reference)} != {sorted(candidate)}")
+    for key in reference:
+        if reference.get(key) != candidate.get(key):
+            differences.append(f"{key}: {reference.get(key)!r} != {candidate.get(key)!r}")
+
+    desglose = list(candidate.get("desglose_egresos", {}).values())
+    if desglose != sorted(desglose, reverse=True):
+        differences.append("desglose_egresos no está ordenado de mayor a menor")
+    return differences
+
+
+async def check_equivalence(user_id: Optional[uuid.UUID] = None) -> int:
+    """Compara ambas implementaciones para uno o todos los usuarios. Devuelve la cantidad de fallas."""
+    failures = 0
+    async with AsyncSessionLocal() as db:
+        if user_id:
+            user_ids = [user_id]
+        else:
+            user_ids = (await db.execute(select(User.id))).scalars().all()
+
+        for uid in user_ids:
+            result = await db.execute(
+                select(Transaction)
+                .where(Transaction.user_id == uid)
+                .options(selectinload(Transaction.category))
+            )
+            reference = calculate_financial_metrics(result.scalars().all())
+            candidates = {
+                "agregación SQL": await calculate_financial_metrics_from_db(db, uid),
+                "rollups mensuales": await calculate_financial_metrics_from_rollups(db, uid),
+            }
+
+            differences = [
+                f"[{name}] {difference}"
+                for name, candidate in candidates.items()
+                for difference in compare_metrics(reference, candidate)
+            ]
+            if differences:
+                failures += 1
+                print(f"❌ Usuario {uid}:")
+                for difference in differences:
+                    print(f"   - {difference}")
+            else:
+                print(f"✅ Usuario {uid}: métricas equivalentes.")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=uuid.UUID, help="Verificar solo este usuario.")
+    args = parser.parse_args()
+
+    failures = asyncio.run(check_equivalence(args.user_id))
+    sys.exit(1 if failures else 0)
@@ -1,5 +1,6 @@
 import pandas as pd
-from typing import List
+
+from src.services.statement_import import check_statement_columns, clean_statement_frame
 
 def load_financial_data(filepath: str) -> pd.DataFrame:
     """
@@ -15,37 +16,18 @@ def load_financial_data(filepath: str) -> pd.DataFrame:
         FileNotFoundError: Si el archivo no se encuentra en la ruta especificada.
         ValueError: Si al archivo le faltan columnas requeridas.
     """
-    required_columns: List[str] = [
-        "Fecha",
-        "Descripción",
-        "Categoría",
-        "Ingreso",
-        "Egreso",
-    ]
-
     try:
         df = pd.read_csv(filepath)
     except FileNotFoundError:
         raise FileNotFoundError(f"Error: El archivo no fue encontrado en la ruta '{filepath}'")
 
-    # Validar que todas las columnas requeridas existan
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        raise ValueError(f"Error: Faltan las siguientes columnas en el archivo: {', '.join(missing_columns)}")
+    # Validar que todas las columnas requeridas existan (StatementFormatError es un ValueError)
+    check_statement_columns(df.columns)
 
     # --- Limpieza y formateo de datos ---
-
-    # Convertir columnas de moneda a tipo numérico, reemplazando errores con 0
-    df["Ingreso"] = pd.to_numeric(df["Ingreso"], errors="coerce").fillna(0)
-    df["Egreso"] = pd.to_numeric(df["Egreso"], errors="coerce").fillna(0)
-
-    # Convertir la columna de fecha a tipo datetime
-    df["Fecha"] = pd.to_datetime(df["Fecha"], errors="coerce")
-
-    # Eliminar filas donde la fecha no se pudo convertir
-    df.dropna(subset=["Fecha"], inplace=True)
-
-    return df
+    # Montos inválidos en 0 y filas sin fecha válida descartadas (mismas reglas que la
+    # importación de extractos de la API).
+    return clean_statement_frame(df)
 
 if __name__ == '__main__':
     # Ejemplo de uso y prueba rápida (se ejecutará solo si se corre este archivo directamente)
@@ -0,0 +1,55 @@
+"""
+Carga cotizaciones de monedas (en pesos argentinos por unidad) en la tabla
+`fx_rates` desde un CSV con las columnas `Fecha`, `Moneda`, `Cotizacion` y,
+opcionalmente, `Fuente`.
+
+Las cotizaciones que ya existen para la misma moneda y fecha se actualizan. Para
+convertir los montos de cada mes se usa la cotización de cierre (la del último día
+del mes o, si no hay, la última disponible antes).
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.load_fx_rates cotizaciones_bcra.csv
+"""
+import argparse
+import asyncio
+
+import pandas as pd
+
+from src.db.session import AsyncSessionLocal
+from src.services.fx import load_fx_rates
+
+REQUIRED_COLUMNS = ["Fecha", "Moneda", "Cotizacion"]
+
+
+def read_fx_file(filepath: str) -> list:
+    """Lee y valida el CSV de cotizaciones, devolviendo las filas listas para cargar."""
+    df = pd.read_csv(filepath)
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Error: Faltan las siguientes columnas en el archivo: {', '.join(missing_columns)}")
+
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    df["Fecha"] = pd.to_datetime(df["Fecha"], dayfirst=True).dt.date
+    return [
+        {
+            "currency": row["Moneda"],
+            "date": row["Fecha"],
+            "rate": row["Cotizacion"],
+            "source": row.get("Fuente") if pd.notna(row.get("Fuente")) else None,
+        }
+        for _, row in df.iterrows()
+    ]
+
+
+async def main(filepath: str):
+    rows = read_fx_file(filepath)
+    async with AsyncSessionLocal() as db:
+        loaded = await load_fx_rates(db, rows)
+    print(f"✅ {loaded} cotizaciones cargadas desde '{filepath}'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("filepath", help="Ruta al archivo CSV.")
+    args = parser.parse_args()
+    asyncio.run(main(args.filepath))
@@ -0,0 +1,53 @@
+"""
+Carga tasas de inflación mensual (en %) en la tabla `inflation_data` desde un CSV
+con las columnas `Año`, `Mes`, `Tasa` y, opcionalmente, `Fuente`.
+
+Los meses que ya existen se reemplazan. Al terminar se invalida el índice de
+inflación en memoria del proceso; los servidores de la API lo reconstruyen al
+vencer su TTL (`INFLATION_INDEX_TTL_SECONDS`).
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.load_inflation ipc_indec.csv
+"""
+import argparse
+import asyncio
+
+import pandas as pd
+
+from src.db.session import AsyncSessionLocal
+from src.services.inflation import load_inflation_rows
+
+REQUIRED_COLUMNS = ["Año", "Mes", "Tasa"]
+
+
+def read_inflation_file(filepath: str) -> list:
+    """Lee y valida el CSV de inflación, devolviendo las filas listas para cargar."""
+    df = pd.read_csv(filepath)
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Error: Faltan las siguientes columnas en el archivo: {', '.join(missing_columns)}")
+
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    return [
+        {
+            "year": int(row["Año"]),
+            "month": int(row["Mes"]),
+            "rate": row["Tasa"],
+            "source": row.get("Fuente") if pd.notna(row.get("Fuente")) else None,
+        }
+        for _, row in df.iterrows()
+    ]
+
+
+async def main(filepath: str):
+    rows = read_inflation_file(filepath)
+    async with AsyncSessionLocal() as db:
+        loaded = await load_inflation_rows(db, rows)
+    print(f"✅ {loaded} meses de inflación cargados desde '{filepath}'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("filepath", help="Ruta al archivo CSV.")
+    args = parser.parse_args()
+    asyncio.run(main(args.filepath))
@@ -0,0 +1,67 @@
+"""
+Prueba de carga del servicio de informes con el backend local (sin llamar a la API
+de IA): lanza muchas solicitudes a la vez y mide el rendimiento y las latencias que
+resultan del límite de concurrencia, los tiempos máximos y los reintentos.
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.load_test_reports
+    python -m scripts.load_test_reports --requests 500 --concurrency 16 --latency 0.5 --failure-rate 0.05
+
+Con N solicitudes, latencia L y concurrencia C, el tiempo total esperado es de
+aproximadamente N * L / C segundos; el event loop nunca queda bloqueado.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from src.services.report_service import ReportGenerationError, ReportService, StubBackend
+
+
+async def run_load_test(
+    requests: int,
+    concurrency: int,
+    latency: float,
+    failure_rate: float,
+    timeout: float,
+    retries: int,
+) -> None:
+    backend = StubBackend(latency=latency, jitter=latency * 0.2, failure_rate=failure_rate)
+    service = ReportService(backend, max_concurrency=concurrency, timeout=timeout, max_retries=retries, backoff=0.1)
+
+    async def one(i: int):
+        started = time.perf_counter()
+        try:
+            await service.generate(f"Prompt de prueba {i}")
+            return time.perf_counter() - started, True
+        except ReportGenerationError:
+            return time.perf_counter() - started, False
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([r[0] for r in results])
+    failures = sum(1 for r in results if not r[1])
+    print(f"Solicitudes: {requests} | concurrencia: {concurrency} | latencia simulada: {latency:.2f} s")
+    print(f"Tiempo total: {elapsed:.2f} s ({requests / elapsed:.1f} informes/s)")
+    print(
+        f"Latencia p50: {np.percentile(latencies, 50):.2f} s | "
+        f"p95: {np.percentile(latencies, 95):.2f} s | máx: {latencies.max():.2f} s"
+    )
+    print(f"Fallidas tras reintentos: {failures}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Cantidad de solicitudes.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Llamadas simultáneas permitidas.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Latencia simulada de cada llamada (s).")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Proporción de llamadas que fallan.")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Tiempo máximo por llamada (s).")
+    parser.add_argument("--retries", type=int, default=2, help="Reintentos por solicitud.")
+    args = parser.parse_args()
+    asyncio.run(run_load_test(
+        args.requests, args.concurrency, args.latency, args.failure_rate, args.timeout, args.retries
+    ))
@@ -0,0 +1,26 @@
+"""
+Elimina las claves de idempotencia vencidas (tabla `idempotency_keys`).
+
+Las claves vencidas ya no se usan para responder reintentos (una clave vencida se
+reutiliza como si fuera nueva), así que este script solo libera espacio. Conviene
+ejecutarlo una vez por día, por ejemplo junto con el análisis nocturno.
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.purge_idempotency_keys
+"""
+import argparse
+import asyncio
+
+from src.db.session import AsyncSessionLocal
+from src.services.idempotency import purge_expired_idempotency_keys
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as db:
+        deleted = await purge_expired_idempotency_keys(db)
+    print(f"✅ Claves de idempotencia vencidas eliminadas: {deleted}.")
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    asyncio.run(main())
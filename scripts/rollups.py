@@ -0,0 +1,53 @@
+"""
+Mantenimiento de la tabla de rollups mensuales (`monthly_rollups`).
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.rollups verify [--user-id <uuid>]
+    python -m scripts.rollups rebuild [--user-id <uuid>]
+
+`verify` informa las diferencias entre los rollups y la tabla `transactions`
+(termina con código 1 si hay desvíos). `rebuild` los recalcula desde cero.
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from typing import Optional
+
+from src.db.session import AsyncSessionLocal
+from src.services.rollups import rebuild_rollups, verify_rollups
+
+
+async def run_verify(user_id: Optional[uuid.UUID]) -> int:
+    async with AsyncSessionLocal() as db:
+        drift = await verify_rollups(db, user_id)
+
+    if not drift:
+        print("✅ Los rollups mensuales coinciden con las transacciones.")
+        return 0
+
+    print(f"❌ Se encontraron {len(drift)} rollups con desvíos:")
+    for item in drift:
+        print(
+            f"   - usuario {item['user_id']} {item['year']}-{item['month']:02d} "
+            f"categoría {item['category_id']} ({item['type']}, {item['currency']}): "
+            f"esperado {item['expected']}, almacenado {item['stored']}"
+        )
+    return 1
+
+
+async def run_rebuild(user_id: Optional[uuid.UUID]) -> int:
+    async with AsyncSessionLocal() as db:
+        total = await rebuild_rollups(db, user_id)
+    print(f"✅ Rollups reconstruidos: {total} filas.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--user-id", type=uuid.UUID, help="Limitar la operación a este usuario.")
+    args = parser.parse_args()
+
+    command = run_verify if args.command == "verify" else run_rebuild
+    sys.exit(asyncio.run(command(args.user_id)))
@@ -0,0 +1,70 @@
+"""
+Proceso por lotes que busca anomalías en las transacciones de todos los usuarios y
+las guarda como insights de tipo 'alert' (sin usar el modelo de IA).
+
+Detecta egresos muy por encima de la mediana reciente de su categoría, caídas
+bruscas del ingreso mensual y montos repetidos en el mismo día. Los usuarios se
+procesan de a uno (solo su historial reciente está en memoria) y las alertas se
+guardan con un commit por bloque de usuarios. Volver a correr el proceso sobre el
+mismo período no duplica alertas.
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.run_anomaly_detection                  # anomalías de ayer
+    python -m scripts.run_anomaly_detection --since 2025-01-01 --chunk-size 200
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select
+
+from src.db.session import AsyncSessionLocal
+from src.db.models import User
+from src.services.anomaly_detection import run_anomaly_detection_for_user
+
+
+async def run_detection(since: date, until: date, history_days: int, chunk_size: int) -> None:
+    report_from = datetime.combine(since, datetime.min.time())
+    report_to = datetime.combine(until, datetime.min.time())
+    # Historia previa necesaria para calcular medianas y promedios de referencia.
+    history_from = report_from - timedelta(days=history_days)
+
+    processed = 0
+    alerts = 0
+    started = time.perf_counter()
+    last_user_id = None
+
+    async with AsyncSessionLocal() as db:
+        while True:
+            stmt = select(User.id).order_by(User.id).limit(chunk_size)
+            if last_user_id is not None:
+                stmt = stmt.where(User.id > last_user_id)
+            user_ids = (await db.execute(stmt)).scalars().all()
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+
+            for user_id in user_ids:
+                alerts += await run_anomaly_detection_for_user(db, user_id, report_from, report_to, history_from)
+            await db.commit()
+
+            processed += len(user_ids)
+            elapsed = time.perf_counter() - started
+            print(f"   {processed} usuarios procesados, {alerts} alertas ({processed / elapsed:.1f} usuarios/s).")
+
+    print(f"✅ Detección de anomalías entre {since} y {until} completada: {alerts} alertas para {processed} usuarios.")
+
+
+if __name__ == "__main__":
+    today = date.today()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=date.fromisoformat, default=today - timedelta(days=1),
+                        help="Inicio (inclusive) del período a revisar, YYYY-MM-DD. Por defecto, ayer.")
+    parser.add_argument("--until", type=date.fromisoformat, default=today,
+                        help="Fin (exclusivo) del período a revisar, YYYY-MM-DD. Por defecto, hoy.")
+    parser.add_argument("--history-days", type=int, default=180,
+                        help="Días de historia previa usados como referencia.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Usuarios por bloque (un commit por bloque).")
+    args = parser.parse_args()
+    asyncio.run(run_detection(args.since, args.until, args.history_days, args.chunk_size))
@@ -0,0 +1,78 @@
+"""
+Proceso por lotes que calcula y guarda la proyección de flujo de caja de todos los
+usuarios en la tabla `cash_flow_projections`.
+
+Los usuarios se recorren en bloques. Por cada bloque se lee el historial mensual
+desde los rollups con una sola consulta, el cálculo se reparte entre un pool de
+procesos y las proyecciones resultantes se insertan en bloque.
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.run_cash_flow_projections
+    python -m scripts.run_cash_flow_projections --months 6 --chunk-size 1000 --workers 4
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from sqlalchemy import select
+
+from src.db.session import AsyncSessionLocal
+from src.db.models import User
+from src.services.cash_flow_projection import (
+    fetch_monthly_histories,
+    project_users,
+    save_projections,
+)
+from src.services.inflation import month_number
+
+
+async def run_projections(months: int, chunk_size: int, workers: int) -> None:
+    today = date.today()
+    # La proyección empieza el mes siguiente al actual, y el historial termina en el
+    # último mes cerrado (el anterior al actual).
+    current_month = month_number(today.year, today.month)
+    start_month = current_month + 1
+
+    loop = asyncio.get_running_loop()
+    processed = 0
+    started = time.perf_counter()
+    last_user_id = None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with AsyncSessionLocal() as db:
+            while True:
+                stmt = select(User.id).order_by(User.id).limit(chunk_size)
+                if last_user_id is not None:
+                    stmt = stmt.where(User.id > last_user_id)
+                user_ids = (await db.execute(stmt)).scalars().all()
+                if not user_ids:
+                    break
+                last_user_id = user_ids[-1]
+
+                histories = await fetch_monthly_histories(db, user_ids, current_month - 1)
+
+                # Repartir el bloque entre los procesos del pool.
+                batches = [histories[i::workers] for i in range(workers) if histories[i::workers]]
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(pool, project_users, batch, months, start_month)
+                    for batch in batches
+                ])
+                rows = [row for batch_rows in results for row in batch_rows]
+
+                await save_projections(db, user_ids, rows)
+                processed += len(user_ids)
+                elapsed = time.perf_counter() - started
+                print(f"   {processed} usuarios procesados ({processed / elapsed:.1f} usuarios/s).")
+
+    print(f"✅ Proyecciones de {months} meses generadas para {processed} usuarios.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months", type=int, default=12, help="Cantidad de meses a proyectar.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Usuarios por bloque.")
+    parser.add_argument("--workers", type=int, default=4, help="Procesos del pool de cálculo.")
+    args = parser.parse_args()
+    asyncio.run(run_projections(args.months, args.chunk_size, args.workers))
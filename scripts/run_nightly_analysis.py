@@ -0,0 +1,136 @@
+"""
+Proceso nocturno que genera un resumen financiero para cada usuario con
+transacciones nuevas desde su último resumen.
+
+Los usuarios se recorren en bloques. En cada bloque, las métricas se calculan con
+consultas agregadas en un pool de procesos (cada proceso con su propia conexión a
+la base), los informes se piden a la IA a través de una cola con límite de
+solicitudes por minuto (`REPORT_BATCH_RATE_PER_MINUTE`) y los resúmenes se guardan
+con un único `INSERT` por bloque.
+
+Un usuario ya analizado deja de estar pendiente, así que si el proceso se
+interrumpe basta con volver a ejecutarlo para continuar con los que faltan. Los
+usuarios cuyo informe falla no se guardan y se reintentan en la próxima ejecución.
+
+Uso (desde la raíz del proyecto):
+    python -m scripts.run_nightly_analysis
+    python -m scripts.run_nightly_analysis --chunk-size 200 --workers 4 --rate 120
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import DATABASE_URL, REPORT_BATCH_RATE_PER_MINUTE, REPORT_MAX_CONCURRENCY
+from src.db.models import User
+from src.db.session import AsyncSessionLocal
+from src.services.analysis_service import (
+    calculate_analysis_metrics,
+    financial_summary_values,
+    save_financial_summaries,
+    users_pending_analysis,
+)
+from src.services.report_cache import get_or_generate_report
+from src.services.report_service import RateLimiter, is_report_backend_configured
+
+
+async def _compute_metrics(user_ids):
+    # Cada proceso del pool usa su propio motor: las conexiones no se comparten entre procesos.
+    engine = create_async_engine(DATABASE_URL)
+    Session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    results = []
+    try:
+        async with Session() as db:
+            users = (await db.execute(select(User).where(User.id.in_(user_ids)))).scalars().all()
+            for user in users:
+                try:
+                    metrics = await calculate_analysis_metrics(db, user)
+                except ValueError as e:
+                    print(f"   No se pudo calcular el análisis del usuario {user.id}: {e}")
+                    continue
+                if metrics["periodo_analizado"] != "N/A":
+                    results.append((user.id, metrics))
+    finally:
+        await engine.dispose()
+    return results
+
+
+def compute_metrics(user_ids):
+    """Calcula las métricas de un grupo de usuarios. Se ejecuta dentro del pool de procesos."""
+    return asyncio.run(_compute_metrics(user_ids))
+
+
+async def generate_reports(items, limiter: RateLimiter, concurrency: int):
+    """Pide los informes de una lista de `(user_id, metrics)` y devuelve las filas a guardar."""
+    queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+    rows = []
+
+    async def consumer():
+        while not queue.empty():
+            user_id, metrics = queue.get_nowait()
+            async with AsyncSessionLocal() as db:
+                report_text, report_key = await get_or_generate_report(db, user_id, metrics, rate_limiter=limiter)
+            if report_key is None:
+                print(f"   Informe del usuario {user_id} no generado: {report_text}")
+                continue
+            rows.append(financial_summary_values(user_id, metrics, report_text, report_key))
+
+    await asyncio.gather(*[consumer() for _ in range(concurrency)])
+    return rows
+
+
+async def run_nightly_analysis(chunk_size: int, workers: int, rate: float) -> None:
+    if not is_report_backend_configured():
+        print("❌ No hay backend de informes configurado (GOOGLE_API_KEY o REPORT_BACKEND=stub).")
+        return
+
+    loop = asyncio.get_running_loop()
+    limiter = RateLimiter(rate)
+    processed = 0
+    saved = 0
+    started = time.perf_counter()
+    last_user_id = None
+
+    # `spawn`: los procesos hijos no heredan las conexiones abiertas del proceso principal.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        while True:
+            async with AsyncSessionLocal() as db:
+                user_ids = await users_pending_analysis(db, chunk_size, last_user_id)
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+
+            partitions = [user_ids[i::workers] for i in range(workers) if user_ids[i::workers]]
+            results = await asyncio.gather(*[
+                loop.run_in_executor(pool, compute_metrics, partition) for partition in partitions
+            ])
+            items = [item for partition_items in results for item in partition_items]
+
+            rows = await generate_reports(items, limiter, REPORT_MAX_CONCURRENCY)
+            async with AsyncSessionLocal() as db:
+                await save_financial_summaries(db, rows)
+
+            processed += len(user_ids)
+            saved += len(rows)
+            elapsed = time.perf_counter() - started
+            print(f"   {processed} usuarios procesados, {saved} resúmenes guardados ({processed / elapsed:.1f} usuarios/s).")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Análisis nocturno completado: {saved} resúmenes para {processed} usuarios en {elapsed:.1f} s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=200, help="Usuarios por bloque (un INSERT por bloque).")
+    parser.add_argument("--workers", type=int, default=4, help="Procesos del pool de cálculo de métricas.")
+    parser.add_argument("--rate", type=float, default=REPORT_BATCH_RATE_PER_MINUTE,
+                        help="Máximo de informes por minuto pedidos a la IA.")
+    args = parser.parse_args()
+    asyncio.run(run_nightly_analysis(args.chunk_size, args.workers, args.rate))
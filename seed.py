@@ -2,11 +2,12 @@ import asyncio
 import pandas as pd
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from decimal import Decimal
 
 from src.db.session import engine, AsyncSessionLocal
-from src.db.models import Base, TransactionCategory, User, Transaction
+from src.db.models import Base, TransactionCategory, User
 from src.core.security import get_password_hash
+from src.services.categorization import load_categorizer
+from src.services.statement_import import insert_statement_transactions, statement_to_transactions
 
 # --- Datos Iniciales ---
 
@@ -24,28 +25,6 @@ DEFAULT_CATEGORIES = [
     {"name": "Otros Egresos", "type": "expense", "color": "#71717A"},
 ]
 
-# Mapeo simple para convertir las categorías del CSV a las nuevas categorías por defecto
-CSV_CATEGORY_MAP = {
-    "Ventas": "Ventas",
-    "Compra de licencia de software": "Software y Suscripciones",
-    "Gastos de Software": "Software y Suscripciones",
-    "Gastos Fijos": "Alquiler",
-    "Pago de alquiler de oficina": "Alquiler",
-    "Salarios": "Salarios",
-    "Pago de salarios": "Salarios",
-    "Campaña publicitaria en redes": "Marketing",
-    "Marketing": "Marketing",
-    "Compra de insumos para oficina": "Insumos de Oficina",
-    "Gastos Administrativos": "Insumos de Oficina",
-    "Servicios de contador": "Servicios Profesionales",
-    "Venta de consultoría inicial": "Servicios Profesionales",
-    "Venta de consultoría recurrente": "Servicios Profesionales",
-    "Venta de consultoría final": "Servicios Profesionales",
-    "Venta de producto A": "Ventas",
-    "Venta de producto B": "Ventas",
-}
-
-
 async def seed_database():
     """
     Función principal para poblar la base de datos.
@@ -87,36 +66,15 @@ async def seed_database():
             all_categories = all_categories_q.scalars().all()
             category_map = {c.name: c.id for c in all_categories}
 
-            transactions_to_add = []
-            for _, row in df.iterrows():
-                ingreso = Decimal(row.get("Ingreso", 0))
-                egreso = Decimal(row.get("Egreso", 0))
-
-                amount = ingreso if ingreso > 0 else egreso
-                trans_type = "income" if ingreso > 0 else "expense"
-
-                csv_cat_name = row["Categoría"]
-                db_cat_name = CSV_CATEGORY_MAP.get(csv_cat_name, "Otros Egresos")
-                category_id = category_map.get(db_cat_name)
-
-                if not category_id:
-                    print(f"⚠️  Advertencia: No se encontró la categoría '{db_cat_name}' para la transacción '{row['Descripción']}'.")
-                    continue
-
-                transactions_to_add.append(
-                    Transaction(
-                        user_id=test_user.id,
-                        category_id=category_id,
-                        description=row["Descripción"],
-                        amount=amount,
-                        type=trans_type,
-                        date=pd.to_datetime(row["Fecha"], dayfirst=False)
-                    )
-                )
+            # Las filas cuya categoría no figura en el mapeo se clasifican por la descripción.
+            categorizer = await load_categorizer(db, test_user.id)
+            transactions, errors = statement_to_transactions(df, test_user.id, category_map, categorizer)
+            for error in errors:
+                print(f"⚠️  Advertencia: se omite la fila {error['index']}: {'; '.join(error['errors'])}")
 
-            db.add_all(transactions_to_add)
+            await insert_statement_transactions(db, transactions)
             await db.commit()
-            print(f"✅ {len(transactions_to_add)} transacciones del CSV cargadas para el usuario '{test_user.username}'.")
+            print(f"✅ {len(transactions)} transacciones del CSV cargadas para el usuario '{test_user.username}'.")
 
         except FileNotFoundError:
             print("ℹ️  No se encontró el archivo 'datos_ejemplo.csv'. Se omite la carga de transacciones de ejemplo.")
@@ -1,99 +1,418 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+import uuid
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import List
+from typing import Optional, Union
+from datetime import date, datetime
 
-from src.db.session import get_db
-from src.db.models import Transaction as TransactionModel, User as UserModel, AiInsight as AiInsightModel
-from src.schemas.ai_insight import AiInsight as AiInsightSchema
+from src.db.session import get_db, AsyncSessionLocal
+from src.db.models import User as UserModel, AiInsight as AiInsightModel, AnalysisJob as AnalysisJobModel
+from src.schemas.ai_insight import (
+    AiInsight as AiInsightSchema,
+    AiInsightPage,
+    AiInsightSummaryPage,
+    InsightFields,
+)
+from src.schemas.analysis import FinancialMetrics, Granularity, ReportCacheStats
+from src.schemas.analysis_job import AnalysisJob as AnalysisJobSchema, AnalysisJobStats
 from src.core.security import get_current_user
-from src.services.financial_analysis import calculate_financial_metrics
-from src.services.report_generator import generate_report
-from src.core.config import GOOGLE_API_KEY
+from src.core.sse import sse_event
+from src.core.responses import FastJSONResponse
+from src.core.etag import etag_matches, not_modified, weak_etag
+from src.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursorError,
+    decode_cursor,
+    keyset_paginate,
+    page_cursor,
+)
+from src.services.analysis_service import (
+    calculate_analysis_metrics,
+    calculate_metrics_for_range,
+    coalescing_stats,
+    job_params,
+    request_analysis,
+    save_financial_summary,
+)
+from src.services.financial_analysis import calculate_time_series
+from src.services.idempotency import (
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    claim_idempotency_key,
+    release_idempotency_key,
+    remember_idempotent_response,
+    request_fingerprint,
+    save_idempotent_response,
+)
+from src.services.report_cache import get_cached_report, remember_report, report_cache_stats, report_hash
+from src.services.report_generator import build_report_prompt
+from src.services.report_service import ReportGenerationError, get_report_service, is_report_backend_configured
+from src.services.inflation import InflationAdjustment, get_inflation_adjustment
 
 
 router = APIRouter()
 
-async def run_analysis_and_save(db: AsyncSession, user: UserModel):
+# Operación con la que se registran las claves de idempotencia de `request_financial_analysis`.
+REQUEST_ANALYSIS_SCOPE = "POST /analysis/"
+
+
+def validate_date_range(
+    date_from: Optional[date] = Query(None, alias="from", description="Fecha inicial (inclusive), formato YYYY-MM-DD."),
+    date_to: Optional[date] = Query(None, alias="to", description="Fecha final (inclusive), formato YYYY-MM-DD."),
+):
+    """Dependencia que lee y valida el rango de fechas de los endpoints de análisis."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha inicial ('from') no puede ser posterior a la fecha final ('to').",
+        )
+    return date_from, date_to
+
+
+async def resolve_inflation_adjustment(
+    base_month: Optional[str] = Query(
+        None,
+        pattern=r"^\d{4}-(0[1-9]|1[0-2])$",
+        description="Si se indica (YYYY-MM), los montos se expresan en pesos constantes de ese mes.",
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> Optional[InflationAdjustment]:
+    """Dependencia que construye el ajuste por inflación pedido con `base_month`."""
+    if not base_month:
+        return None
+    year, month = (int(part) for part in base_month.split("-"))
+    try:
+        return await get_inflation_adjustment(db, date(year, month, 1))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+async def stream_report_events(user_id, metrics: dict, cached_text: Optional[str], report_key: str):
     """
-    Función de servicio que se ejecuta en segundo plano para:
-    1. Obtener las transacciones del usuario.
-    2. Calcular las métricas financieras.
-    3. Generar un informe con IA.
-    4. Guardar el resultado como un nuevo "insight" en la base de datos.
+    Genera los eventos SSE de un análisis: primero las métricas, luego el informe
+    fragmento a fragmento y, al terminar, el ID del insight guardado.
+
+    Usa su propia sesión de base de datos, porque la de la solicitud se cierra antes
+    de que termine la respuesta. Si el cliente se desconecta, no se guarda nada.
     """
-    # 1. Obtener las transacciones del usuario, cargando las categorías relacionadas
-    #    para evitar consultas N+1.
-    stmt = (
-        select(TransactionModel)
-        .where(TransactionModel.user_id == user.id)
-        .options(selectinload(TransactionModel.category))
-    )
-    result = await db.execute(stmt)
-    transactions = result.scalars().all()
+    yield sse_event("metrics", metrics)
 
-    if not transactions:
-        print(f"No se encontraron transacciones para el usuario {user.id}. No se genera análisis.")
-        # En una app real, se podría crear una notificación para el usuario.
+    chunks = []
+    try:
+        if cached_text is not None:
+            chunks.append(cached_text)
+            yield sse_event("chunk", {"text": cached_text})
+        else:
+            async for chunk in get_report_service().stream(build_report_prompt(metrics)):
+                chunks.append(chunk)
+                yield sse_event("chunk", {"text": chunk})
+    except ReportGenerationError as e:
+        print(f"Error al generar el informe de IA: {e}")
+        yield sse_event("error", {"detail": f"Ocurrió un error al generar el informe: {e}"})
         return
 
-    # 2. Calcular métricas
-    metrics = calculate_financial_metrics(transactions)
+    report_text = "".join(chunks)
+    if cached_text is None:
+        remember_report(user_id, report_key, report_text)
+    async with AsyncSessionLocal() as db:
+        insight = await save_financial_summary(db, user_id, metrics, report_text, report_key)
+    yield sse_event("done", {"insight_id": insight.id})
 
-    # 3. Generar informe con IA
-    if not GOOGLE_API_KEY or GOOGLE_API_KEY == "TU_CLAVE_DE_API_DE_GOOGLE_AQUI":
-        print("ADVERTENCIA: La clave de API de Google no está configurada. No se puede generar el informe de IA.")
-        report_text = "El informe de IA no pudo ser generado porque la clave de API de Google no está configurada en el servidor."
-    else:
-        try:
-            report_text = generate_report(metrics, GOOGLE_API_KEY)
-        except Exception as e:
-            print(f"Error al generar el informe de IA: {e}")
-            report_text = f"Ocurrió un error al generar el informe: {e}"
-
-    # 4. Guardar el resultado en la tabla de insights
-    insight = AiInsightModel(
-        user_id=user.id,
-        type="financial_summary",
-        title="Resumen Financiero Automático",
-        description=report_text,
-        priority="medium",
-        json_metadata=metrics,
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED, summary="Solicitar un nuevo análisis financiero")
+async def request_financial_analysis(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    date_range: tuple = Depends(validate_date_range),
+    granularity: Optional[Granularity] = Query(None, description="Si se indica, el análisis incluye una serie temporal con esta granularidad."),
+    adjustment: Optional[InflationAdjustment] = Depends(resolve_inflation_adjustment),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Clave única elegida por el cliente para que los reintentos no encolen otro análisis.",
+    ),
+):
+    """
+    Encola un análisis financiero para el usuario actual.
+
+    Si ya hay un análisis con los mismos parámetros en curso, o uno completado sobre
+    los mismos datos, se devuelve ese trabajo (`coalesced: true`) en lugar de crear
+    otro. El análisis lo procesa un worker separado de la API
+    (`python -m src.workers.analysis_worker`); su estado se consulta en
+    `GET /analysis/jobs/{job_id}`. Opcionalmente se puede limitar el análisis a un
+    rango de fechas (`from`/`to`), incluir una serie temporal por período
+    (`granularity`) y expresar los montos en pesos constantes de un mes base (`base_month`).
+
+    Con el encabezado `Idempotency-Key`, los reintentos con la misma clave devuelven
+    la respuesta original (con `Idempotent-Replayed: true`) sin volver a registrar la
+    solicitud. Reusar la clave con otros parámetros devuelve 422.
+    """
+    date_from, date_to = date_range
+    params = job_params(
+        date_from,
+        date_to,
+        granularity.value if granularity else None,
+        adjustment.label if adjustment else None,
     )
-    db.add(insight)
+    fingerprint = None
+    if idempotency_key:
+        fingerprint = request_fingerprint(params)
+        try:
+            stored = await claim_idempotency_key(db, current_user.id, REQUEST_ANALYSIS_SCOPE, idempotency_key, fingerprint)
+        except IdempotencyConflictError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+        except IdempotencyInProgressError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if stored is not None:
+            status_code, body = stored
+            return FastJSONResponse(body, status_code=status_code, headers={"Idempotent-Replayed": "true"})
+
+    try:
+        job, coalesced = await request_analysis(db, current_user.id, params)
+    except Exception:
+        # `request_analysis` hace commit, así que la reserva de la clave pudo quedar
+        # confirmada: se libera para que el cliente pueda reintentar.
+        if idempotency_key:
+            await db.rollback()
+            await release_idempotency_key(db, current_user.id, REQUEST_ANALYSIS_SCOPE, idempotency_key)
+        raise
+    if job.status == "completed":
+        message = "Tus datos no cambiaron desde el último análisis. Se reutiliza su resultado."
+    elif coalesced:
+        message = "Ya hay un análisis igual en curso. Los resultados estarán disponibles en breve."
+    else:
+        message = "El análisis financiero ha sido encolado. Los resultados estarán disponibles en breve."
+    body = {
+        "message": message,
+        "job_id": job.id,
+        "status": job.status,
+        "insight_id": job.insight_id,
+        "coalesced": coalesced,
+    }
+    if not idempotency_key:
+        return body
+
+    body = jsonable_encoder(body)
+    await save_idempotent_response(db, current_user.id, REQUEST_ANALYSIS_SCOPE, idempotency_key, status.HTTP_202_ACCEPTED, body)
     await db.commit()
-    print(f"Análisis financiero completado y guardado para el usuario {user.id}.")
+    remember_idempotent_response(
+        current_user.id, REQUEST_ANALYSIS_SCOPE, idempotency_key, fingerprint, status.HTTP_202_ACCEPTED, body
+    )
+    return FastJSONResponse(body, status_code=status.HTTP_202_ACCEPTED)
 
 
-@router.post("/", status_code=status.HTTP_202_ACCEPTED, summary="Solicitar un nuevo análisis financiero")
-async def request_financial_analysis(
-    background_tasks: BackgroundTasks,
+@router.get("/jobs/stats", response_model=AnalysisJobStats, summary="Solicitudes de análisis unificadas")
+async def get_analysis_job_stats(
     db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_user),
 ):
     """
-    Inicia un análisis financiero para el usuario actual.
+    Devuelve cuántos análisis del usuario actual se ejecutaron y cuántas solicitudes
+    se unieron a uno existente (trabajo que se evitó repetir).
+    """
+    return await coalescing_stats(db, current_user.id)
+
 
-    El proceso se ejecuta en segundo plano para no bloquear la respuesta de la API.
+@router.get("/jobs/{job_id}", response_model=AnalysisJobSchema, summary="Consultar el estado de un análisis encolado")
+async def get_analysis_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Devuelve el estado de un trabajo de análisis del usuario actual: 'pending',
+    'running', 'completed' (con el `insight_id` generado) o 'failed' (con el error).
     """
-    print(f"Iniciando análisis financiero en segundo plano para el usuario {current_user.id}...")
-    background_tasks.add_task(run_analysis_and_save, db, current_user)
-    return {"message": "El análisis financiero ha sido iniciado. Los resultados estarán disponibles en breve."}
+    job = await db.get(AnalysisJobModel, job_id)
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo de análisis no encontrado.")
+    return job
 
 
-@router.get("/", response_model=List[AiInsightSchema], summary="Obtener los análisis financieros (insights)")
-async def get_financial_analyses(
+@router.post("/stream", summary="Generar un análisis financiero con el informe en streaming (SSE)")
+async def stream_financial_analysis(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    date_range: tuple = Depends(validate_date_range),
+    granularity: Optional[Granularity] = Query(None, description="Si se indica, el análisis incluye una serie temporal con esta granularidad."),
+    adjustment: Optional[InflationAdjustment] = Depends(resolve_inflation_adjustment),
+):
+    """
+    Calcula las métricas y transmite el informe de IA a medida que se genera, como
+    Server-Sent Events (`text/event-stream`):
+
+    - `metrics`: las métricas calculadas (se envía de inmediato).
+    - `chunk`: cada fragmento del informe, como `{"text": ...}`.
+    - `done`: el informe completo quedó guardado, como `{"insight_id": ...}`.
+    - `error`: no se pudo generar el informe.
+
+    No hace falta consultar `GET /analysis/` para obtener el resultado.
+    """
+    date_from, date_to = date_range
+    try:
+        metrics = await calculate_analysis_metrics(
+            db, current_user, date_from, date_to, granularity.value if granularity else None, adjustment
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if metrics["periodo_analizado"] == "N/A":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No se encontraron transacciones para analizar.")
+    if not is_report_backend_configured():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El informe de IA no puede generarse porque la clave de API de Google no está configurada en el servidor.",
+        )
+
+    report_key = report_hash(metrics)
+    cached_text = await get_cached_report(db, current_user.id, report_key)
+    return StreamingResponse(
+        stream_report_events(current_user.id, metrics, cached_text, report_key),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/metrics", response_model=FinancialMetrics, summary="Obtener métricas y serie temporal de forma sincrónica")
+async def get_financial_metrics(
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserModel = Depends(get_current_user),
+    date_range: tuple = Depends(validate_date_range),
+    granularity: Granularity = Query(Granularity.month, description="Granularidad de la serie temporal."),
+    adjustment: Optional[InflationAdjustment] = Depends(resolve_inflation_adjustment),
 ):
     """
-    Obtiene la lista de todos los análisis (insights) generados para el usuario actual.
+    Calcula al instante las métricas financieras del usuario para el rango de fechas
+    indicado, junto con la serie temporal de ingresos, egresos y resultado neto por
+    período, expresados en la moneda preferida del usuario. No genera informe con IA
+    ni guarda resultados.
     """
-    result = await db.execute(
-        select(AiInsightModel)
-        .where(AiInsightModel.user_id == current_user.id)
-        .order_by(AiInsightModel.created_at.desc())
+    date_from, date_to = date_range
+    currency = current_user.preferred_currency or "ARS"
+    try:
+        metrics = await calculate_metrics_for_range(db, current_user.id, date_from, date_to, adjustment, currency)
+        series = await calculate_time_series(
+            db, current_user.id, granularity.value, date_from, date_to, adjustment, currency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FinancialMetrics(
+        date_from=date_from,
+        date_to=date_to,
+        granularity=granularity,
+        currency=currency,
+        base_month=adjustment.label if adjustment else None,
+        metrics=metrics,
+        series=series,
     )
-    insights = result.scalars().all()
-    return insights
+
+
+@router.get("/report-cache", response_model=ReportCacheStats, summary="Estadísticas de la caché de informes de IA")
+async def get_report_cache_stats(current_user: UserModel = Depends(get_current_user)):
+    """
+    Devuelve los aciertos y fallos de la caché de informes del proceso que atiende
+    la solicitud. Un acierto evita una llamada a la API de Gemini.
+    """
+    return report_cache_stats()
+
+
+def _insight_payload(insight: AiInsightModel) -> dict:
+    # El esquema expone `json_metadata` con el alias `metadata`, que en el modelo ORM es
+    # el `MetaData` de SQLAlchemy; por eso el insight completo se arma a mano.
+    return {
+        "id": insight.id,
+        "user_id": insight.user_id,
+        "type": insight.type,
+        "title": insight.title,
+        "description": insight.description,
+        "priority": insight.priority,
+        "metadata": insight.json_metadata,
+        "is_read": insight.is_read,
+        "created_at": insight.created_at,
+    }
+
+
+INSIGHT_SUMMARY_COLUMNS = [
+    AiInsightModel.id,
+    AiInsightModel.type,
+    AiInsightModel.title,
+    AiInsightModel.priority,
+    AiInsightModel.is_read,
+    AiInsightModel.created_at,
+]
+
+
+@router.get(
+    "/",
+    response_model=Union[AiInsightPage, AiInsightSummaryPage],
+    response_class=FastJSONResponse,
+    summary="Obtener los análisis financieros (insights), paginados",
+)
+async def get_financial_analyses(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Cantidad de insights por página."),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en `next_cursor` por la página anterior."),
+    insight_type: Optional[str] = Query(None, alias="type", description="Filtrar por tipo de insight (ej. 'financial_summary', 'alert')."),
+    fields: InsightFields = Query(
+        InsightFields.summary,
+        description="'summary' devuelve solo id, tipo, título, prioridad, lectura y fecha; 'full' incluye descripción y metadatos.",
+    ),
+):
+    """
+    Obtiene los análisis (insights) generados para el usuario actual, del más reciente
+    al más antiguo, de a `limit` por página. Para la página siguiente se envía el
+    `next_cursor` de la respuesta. El detalle completo de un insight se obtiene con
+    `GET /analysis/insights/{insight_id}`.
+
+    Como `GET /transactions/`, responde `304 Not Modified` sin consultar los insights
+    si la ETag enviada en `If-None-Match` sigue vigente. La versión de datos de la
+    ETag viene de la fila del usuario que carga `get_current_user` (ver
+    `read_transactions`).
+    """
+    try:
+        after = decode_cursor(cursor, [datetime.fromisoformat, uuid.UUID]) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    etag = weak_etag("insights", current_user.id, current_user.data_version, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if fields == InsightFields.summary:
+        stmt = select(*INSIGHT_SUMMARY_COLUMNS)
+    else:
+        stmt = select(AiInsightModel)
+    stmt = stmt.where(AiInsightModel.user_id == current_user.id)
+    if insight_type:
+        stmt = stmt.where(AiInsightModel.type == insight_type)
+    stmt = keyset_paginate(stmt, [AiInsightModel.created_at, AiInsightModel.id], after, limit)
+
+    result = await db.execute(stmt)
+    rows = list(result.all() if fields == InsightFields.summary else result.scalars().all())
+    next_cursor = page_cursor(rows, limit, key=lambda row: (row.created_at, row.id))
+    if fields == InsightFields.full:
+        items = [_insight_payload(insight) for insight in rows]
+    else:
+        items = [row._asdict() for row in rows]
+    return FastJSONResponse({"fields": fields.value, "items": items, "next_cursor": next_cursor}, headers={"ETag": etag})
+
+
+@router.get("/insights/{insight_id}", response_model=AiInsightSchema, summary="Obtener un análisis (insight) completo")
+async def get_financial_analysis(
+    insight_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Devuelve un insight del usuario actual con su descripción y metadatos completos.
+    """
+    insight = await db.get(AiInsightModel, insight_id)
+    if insight is None or insight.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Insight no encontrado.")
+    return _insight_payload(insight)
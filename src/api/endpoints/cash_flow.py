@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List
+
+from src.db.session import get_db
+from src.db.models import CashFlowProjection as CashFlowProjectionModel, User as UserModel
+from src.schemas.cash_flow_projection import CashFlowProjection as CashFlowProjectionSchema
+from src.core.security import get_current_user
+
+router = APIRouter()
+
+@router.get(
+    "/projections",
+    response_model=List[CashFlowProjectionSchema],
+    summary="Obtener la proyección de flujo de caja del usuario"
+)
+async def read_cash_flow_projections(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Devuelve la proyección mensual de ingresos, egresos y flujo neto del usuario
+    autenticado, ordenada por mes.
+
+    Las proyecciones se calculan fuera de línea con el proceso por lotes
+    `python -m scripts.run_cash_flow_projections`.
+    """
+    result = await db.execute(
+        select(CashFlowProjectionModel)
+        .where(CashFlowProjectionModel.user_id == current_user.id)
+        .order_by(CashFlowProjectionModel.date)
+    )
+    return result.scalars().all()
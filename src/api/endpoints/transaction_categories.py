@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from typing import List
 
 from src.db.session import get_db
 from src.db.models import TransactionCategory as CategoryModel, User as UserModel
+from src.services.category_registry import get_category_registry, invalidate_category_registry
 from src.schemas.transaction_category import TransactionCategory as CategorySchema, TransactionCategoryCreate
 from src.core.security import get_current_user
+from src.core.etag import etag_matches, not_modified
+from src.core.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -33,20 +35,31 @@ async def create_transaction_category(
     db.add(db_category)
     await db.commit()
     await db.refresh(db_category)
+    # Se recarga el registro de categorías de este proceso para que la nueva se vea
+    # de inmediato (los demás procesos la verán al vencer su TTL).
+    invalidate_category_registry()
+    await get_category_registry(db)
     return db_category
 
 @router.get(
     "/",
     response_model=List[CategorySchema],
+    response_class=FastJSONResponse,
     summary="Obtener todas las categorías de transacción"
 )
 async def read_transaction_categories(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
     Devuelve una lista de todas las categorías de transacción disponibles en el sistema.
+
+    Las categorías se sirven desde el registro en memoria, sin consultar la base. La
+    respuesta incluye una ETag que solo cambia si cambian las categorías; si se envía
+    en `If-None-Match`, se responde `304 Not Modified` sin cuerpo.
     """
-    result = await db.execute(select(CategoryModel).order_by(CategoryModel.name))
-    categories = result.scalars().all()
-    return categories
+    registry = await get_category_registry(db)
+    if etag_matches(request, registry.etag):
+        return not_modified(registry.etag)
+    return FastJSONResponse(registry.as_dicts(), headers={"ETag": registry.etag})
@@ -1,19 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from typing import Optional, Union
+from datetime import datetime, timedelta
+from decimal import Decimal
 import uuid
 
-from src.db.session import get_db
+from src.db.session import get_db, AsyncSessionLocal
 from src.db.models import Transaction as TransactionModel, User as UserModel
-from src.schemas.transaction import Transaction as TransactionSchema, TransactionCreate
+from src.schemas.transaction import Transaction as TransactionSchema, TransactionCreate, TransactionBulkResult, TransactionPage, TransactionCompactPage, TransactionSearchPage, ExportFormat
 from src.core.security import get_current_user
+from src.core.sse import sse_event
+from src.core.responses import FastJSONResponse
+from src.core.etag import etag_matches, not_modified, weak_etag
+from src.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError, decode_cursor, keyset_paginate, page_cursor
+from src.api.endpoints.analysis import validate_date_range
+from src.services.rollups import apply_transactions_to_rollups
+from src.services.idempotency import (
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    claim_idempotency_key,
+    remember_idempotent_response,
+    request_fingerprint,
+    save_idempotent_response,
+)
+from src.services.transaction_ingestion import ingest_transactions, iter_json_array, iter_ndjson
+from src.services.category_registry import get_category_registry
+from src.services.transaction_search import MIN_QUERY_LENGTH, search_transactions
+from src.services.transaction_listing import (
+    load_categories,
+    transaction_dict,
+    transaction_list_statement,
+    transaction_with_category_dict,
+)
+from src.services.transaction_export import stream_transactions_export
+from src.services.statement_import import EXCEL_EXTENSIONS, StatementFormatError, import_statement
 
 router = APIRouter()
 
+# Operación con la que se registran las claves de idempotencia de `create_transaction`.
+CREATE_TRANSACTION_SCOPE = "POST /transactions/"
+
 @router.post(
     "/",
     response_model=TransactionSchema,
+    response_class=FastJSONResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Crear una nueva transacción"
 )
@@ -21,42 +55,313 @@ async def create_transaction(
     *,
     db: AsyncSession = Depends(get_db),
     transaction_in: TransactionCreate,
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserModel = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Clave única elegida por el cliente para que los reintentos no dupliquen la transacción.",
+    ),
 ):
     """
     Crea una nueva transacción asociada al usuario autenticado.
+
+    Si se envía el encabezado `Idempotency-Key`, los reintentos con la misma clave
+    devuelven la respuesta original (con el encabezado `Idempotent-Replayed: true`)
+    sin volver a crear la transacción. Reusar la clave con otro contenido devuelve 422.
     """
+    fingerprint = None
+    if idempotency_key:
+        fingerprint = request_fingerprint(jsonable_encoder(transaction_in))
+        try:
+            stored = await claim_idempotency_key(
+                db, current_user.id, CREATE_TRANSACTION_SCOPE, idempotency_key, fingerprint
+            )
+        except IdempotencyConflictError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+        except IdempotencyInProgressError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if stored is not None:
+            status_code, body = stored
+            return FastJSONResponse(body, status_code=status_code, headers={"Idempotent-Replayed": "true"})
+
     # Creamos el objeto del modelo SQLAlchemy a partir del esquema Pydantic
     db_transaction = TransactionModel(
         **transaction_in.dict(),
         user_id=current_user.id  # Asociamos la transacción al usuario actual
     )
     db.add(db_transaction)
+    # Actualizamos los rollups mensuales en la misma transacción de base de datos.
+    await apply_transactions_to_rollups(db, [db_transaction])
+    await db.flush()
+    # La respuesta se arma con la misma consulta del listado (transacción y categoría),
+    # y queda guardada junto con la transacción si la solicitud trae una clave.
+    result = await db.execute(
+        transaction_list_statement(current_user.id, [TransactionModel.id == db_transaction.id])
+    )
+    body = jsonable_encoder(transaction_with_category_dict(result.one()))
+    if idempotency_key:
+        await save_idempotent_response(
+            db, current_user.id, CREATE_TRANSACTION_SCOPE, idempotency_key, status.HTTP_201_CREATED, body
+        )
     await db.commit()
-    await db.refresh(db_transaction)
-    return db_transaction
+    if idempotency_key:
+        remember_idempotent_response(
+            current_user.id, CREATE_TRANSACTION_SCOPE, idempotency_key, fingerprint, status.HTTP_201_CREATED, body
+        )
+    return FastJSONResponse(body, status_code=status.HTTP_201_CREATED)
+
+@router.post(
+    "/bulk",
+    response_model=TransactionBulkResult,
+    summary="Cargar transacciones en forma masiva"
+)
+async def create_transactions_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Carga muchas transacciones del usuario autenticado en una sola solicitud.
+
+    El cuerpo puede ser un arreglo JSON de transacciones (`Content-Type: application/json`)
+    o un flujo NDJSON, con una transacción por línea (`Content-Type: application/x-ndjson`),
+    que se procesa a medida que llega. Las filas se validan e insertan en lotes dentro de
+    una misma transacción; las inválidas se informan en `errors` sin afectar al resto.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        rows = iter_ndjson(request.stream())
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El cuerpo no es JSON válido.")
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El cuerpo debe ser un arreglo JSON de transacciones.",
+            )
+        rows = iter_json_array(items)
+    return await ingest_transactions(db, current_user.id, rows)
+
+async def import_statement_events(user_id: uuid.UUID, file: UploadFile):
+    """
+    Genera los eventos SSE de la importación de un extracto: uno `progress` por bloque
+    y, al final, `done` o `error`. Usa su propia sesión de base de datos, porque la de
+    la solicitud se cierra antes de que termine la respuesta.
+    """
+    progress = None
+    try:
+        async with AsyncSessionLocal() as db:
+            async for progress in import_statement(db, user_id, file.file, file.filename):
+                yield sse_event("progress", progress)
+    except StatementFormatError as e:
+        yield sse_event("error", {"detail": f"No se pudo leer el extracto: {e}"})
+        return
+    finally:
+        await file.close()
+    result = {k: v for k, v in (progress or {"rows": 0, "inserted": 0, "failed": 0}).items() if k != "errors"}
+    yield sse_event("done", result)
+
+
+@router.post(
+    "/import",
+    summary="Importar un extracto CSV o Excel"
+)
+async def import_transactions_statement(
+    file: UploadFile = File(..., description="Extracto con las columnas Fecha, Descripción, Categoría, Ingreso y Egreso."),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Importa las transacciones de un extracto (`.csv`, `.xlsx`) del usuario autenticado.
+
+    El archivo se procesa en bloques, con memoria acotada sin importar su tamaño, y
+    la respuesta es un flujo de Server-Sent Events: un evento `progress` por bloque
+    (filas leídas, insertadas, rechazadas y el detalle de los rechazos) y, al final,
+    `done`. Si el formato no es válido se envía `error` y no se importa nada.
+    """
+    filename = (file.filename or "").lower()
+    if not filename.endswith((".csv",) + EXCEL_EXTENSIONS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato no soportado: el extracto debe ser .csv o .xlsx.",
+        )
+    return StreamingResponse(
+        import_statement_events(current_user.id, file),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def transaction_filters(
+    date_range: tuple = Depends(validate_date_range),
+    transaction_type: Optional[str] = Query(None, alias="type", pattern="^(income|expense)$", description="Filtrar por tipo: 'income' o 'expense'."),
+    category_id: Optional[uuid.UUID] = Query(None, description="Filtrar por categoría."),
+    min_amount: Optional[Decimal] = Query(None, ge=0, description="Monto mínimo (inclusive)."),
+    max_amount: Optional[Decimal] = Query(None, ge=0, description="Monto máximo (inclusive)."),
+) -> list:
+    """
+    Dependencia que lee los filtros de los listados de transacciones y los devuelve
+    como condiciones para el `WHERE` (además de la del usuario).
+    """
+    date_from, date_to = date_range
+    if min_amount is not None and max_amount is not None and min_amount > max_amount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El monto mínimo no puede ser mayor que el monto máximo.",
+        )
+    conditions = []
+    if date_from:
+        conditions.append(TransactionModel.date >= date_from)
+    if date_to:
+        conditions.append(TransactionModel.date < date_to + timedelta(days=1))
+    if transaction_type:
+        conditions.append(TransactionModel.type == transaction_type)
+    if category_id:
+        conditions.append(TransactionModel.category_id == category_id)
+    if min_amount is not None:
+        conditions.append(TransactionModel.amount >= min_amount)
+    if max_amount is not None:
+        conditions.append(TransactionModel.amount <= max_amount)
+    return conditions
+
+
+# Tamaño máximo de página del listado de transacciones (mayor que el de otros
+# listados: las filas son chicas y se serializan sin pasar por Pydantic).
+DEFAULT_TRANSACTION_PAGE_SIZE = 100
+MAX_TRANSACTION_PAGE_SIZE = 1000
+
 
 @router.get(
     "/",
-    response_model=List[TransactionSchema],
+    response_model=Union[TransactionPage, TransactionCompactPage],
+    response_class=FastJSONResponse,
     summary="Obtener las transacciones del usuario"
 )
 async def read_transactions(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    filters: list = Depends(transaction_filters),
+    limit: int = Query(DEFAULT_TRANSACTION_PAGE_SIZE, ge=1, le=MAX_TRANSACTION_PAGE_SIZE, description="Cantidad de transacciones por página."),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en `next_cursor` por la página anterior."),
+    compact: bool = Query(False, description="Si es verdadero, cada transacción trae solo `category_id` y las categorías se envían una vez en `categories`."),
 ):
     """
-    Devuelve una lista de las transacciones del usuario autenticado.
-    Soporta paginación con `skip` y `limit`.
+    Devuelve las transacciones del usuario autenticado, de la más reciente a la más
+    antigua, de a `limit` por página. Para la página siguiente se envía el
+    `next_cursor` de la respuesta; las transacciones nuevas no desplazan las páginas
+    ya recorridas.
+
+    Se pueden filtrar por rango de fechas (`from`/`to`), tipo, categoría y rango de montos.
+
+    La respuesta incluye una ETag que cambia con cada escritura de datos del usuario;
+    si se envía en `If-None-Match` y los datos no cambiaron, se responde
+    `304 Not Modified` sin consultar las transacciones.
+
+    La versión de datos (`users.data_version`) se toma de la fila del usuario que ya
+    carga `get_current_user`, en lugar de una caché propia: no agrega consultas y no
+    puede quedar desactualizada entre procesos (una caché por proceso no vería los
+    insights que guarda el worker de análisis).
     """
-    result = await db.execute(
-        select(TransactionModel)
-        .where(TransactionModel.user_id == current_user.id)
-        .order_by(TransactionModel.date.desc())
-        .offset(skip)
-        .limit(limit)
+    try:
+        after = decode_cursor(cursor, [datetime.fromisoformat, uuid.UUID]) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    etag = weak_etag("transactions", current_user.id, current_user.data_version, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    stmt = transaction_list_statement(current_user.id, filters, compact=compact)
+    stmt = keyset_paginate(stmt, [TransactionModel.date, TransactionModel.id], after, limit)
+    rows = list((await db.execute(stmt)).all())
+    next_cursor = page_cursor(rows, limit, key=lambda row: (row.date, row.id))
+
+    # La respuesta se arma como diccionarios y se serializa con orjson, sin validar
+    # cada fila con Pydantic (los esquemas de `response_model` documentan el formato).
+    if compact:
+        return FastJSONResponse({
+            "items": [transaction_dict(row) for row in rows],
+            "categories": await load_categories(db, (row.category_id for row in rows)),
+            "next_cursor": next_cursor,
+        }, headers={"ETag": etag})
+    return FastJSONResponse({
+        "items": [transaction_with_category_dict(row) for row in rows],
+        "next_cursor": next_cursor,
+    }, headers={"ETag": etag})
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+}
+
+
+async def export_transactions_chunks(user_id: uuid.UUID, export_format: ExportFormat, filters: list):
+    # Sesión propia: la de la solicitud se cierra antes de que termine la respuesta.
+    async with AsyncSessionLocal() as db:
+        async for chunk in stream_transactions_export(db, user_id, export_format.value, filters):
+            yield chunk
+
+
+@router.get(
+    "/export",
+    summary="Exportar las transacciones del usuario"
+)
+async def export_transactions(
+    export_format: ExportFormat = Query(ExportFormat.csv, alias="format", description="Formato del archivo: 'csv', 'ndjson' o 'parquet'."),
+    filters: list = Depends(transaction_filters),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Descarga todas las transacciones del usuario autenticado (en orden cronológico)
+    como CSV, NDJSON o Parquet, con los mismos filtros que el listado.
+
+    El archivo se genera y se envía de a partes, sin cargar todas las transacciones en
+    memoria. El CSV usa el formato de extracto (`Fecha`, `Descripción`, `Categoría`,
+    `Ingreso`, `Egreso`, más `Moneda`), así que se puede volver a importar con
+    `POST /transactions/import`.
+    """
+    filename = f"transacciones.{export_format.value}"
+    return StreamingResponse(
+        export_transactions_chunks(current_user.id, export_format, filters),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
-    transactions = result.scalars().all()
-    return transactions
+
+
+@router.get(
+    "/search",
+    response_model=TransactionSearchPage,
+    summary="Buscar transacciones por descripción"
+)
+async def search_transactions_by_description(
+    q: str = Query(..., min_length=MIN_QUERY_LENGTH, max_length=200, description="Texto a buscar (ej. 'alquiler', 'AFIP')."),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Cantidad de resultados por página."),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en `next_cursor` por la página anterior."),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Busca entre las transacciones del usuario autenticado por su descripción, de la
+    más a la menos relevante. Encuentra las palabras buscadas (y sus variantes en
+    español) y también descripciones parecidas, por ejemplo con errores de tipeo.
+    """
+    try:
+        after = decode_cursor(cursor, [float, uuid.UUID]) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    hits = await search_transactions(db, current_user.id, q.strip(), limit, after)
+    next_cursor = page_cursor(hits, limit, key=lambda hit: (hit[1], hit[0].id))
+    registry = await get_category_registry(db, {row.category_id for row, _ in hits})
+    return {
+        "items": [
+            {"transaction": {**transaction_dict(row), "category": registry.category_dict(row.category_id)}, "rank": rank}
+            for row, rank in hits
+        ],
+        "next_cursor": next_cursor,
+    }
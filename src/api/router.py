@@ -5,6 +5,7 @@ from src.api.endpoints import (
     transaction_categories,
     transactions,
     analysis,
+    cash_flow,
 )
 
 api_router = APIRouter()
@@ -22,3 +23,4 @@ api_router.include_router(
     transactions.router, tags=["Transactions"], prefix="/transactions"
 )
 api_router.include_router(analysis.router, tags=["Analysis"], prefix="/analysis")
+api_router.include_router(cash_flow.router, tags=["Cash Flow"], prefix="/cash-flow")
@@ -0,0 +1,59 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Caché en memoria de tamaño acotado con política LRU (se descarta la entrada
+    usada hace más tiempo) y, opcionalmente, vencimiento por tiempo (TTL).
+
+    Es local a cada proceso. No es segura para uso desde varios hilos, pero sí
+    desde varias corrutinas del mismo event loop, ya que no tiene puntos de espera.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Devuelve el valor asociado a `key` (o `default`) y lo marca como usado recientemente."""
+        entry = self._data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Guarda un valor, descartando la entrada menos usada si se supera `maxsize`."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Elimina una entrada y devuelve su valor (o `default` si no existía)."""
+        entry = self._data.pop(key, None)
+        return entry[0] if entry is not None else default
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[1] is None or entry[1] >= time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Cantidad de aciertos, fallos y entradas actuales de la caché."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
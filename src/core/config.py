@@ -20,6 +20,58 @@ API_SECRET_KEY = os.getenv("API_SECRET_KEY")
 # Tiempo de expiración del token de acceso en minutos
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Tiempo máximo (en segundos) que un proceso reutiliza el índice de inflación en memoria
+# antes de reconstruirlo desde la base de datos.
+INFLATION_INDEX_TTL_SECONDS = int(os.getenv("INFLATION_INDEX_TTL_SECONDS", 3600))
+
+# Cantidad máxima de cotizaciones (moneda, fecha) que se mantienen en memoria.
+FX_RATE_CACHE_SIZE = int(os.getenv("FX_RATE_CACHE_SIZE", 10000))
+
+# Tiempo máximo (en segundos) que un proceso reutiliza una cotización en memoria antes
+# de volver a leerla (así ve las cotizaciones nuevas o corregidas).
+FX_RATE_CACHE_TTL_SECONDS = int(os.getenv("FX_RATE_CACHE_TTL_SECONDS", 3600))
+
+# Cantidad máxima de informes de IA que cada proceso mantiene en memoria.
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", 1000))
+
+# Tiempo máximo (en segundos) que un proceso reutiliza las categorías en memoria antes
+# de volver a leerlas (el proceso que crea una categoría las recarga en el momento).
+CATEGORY_REGISTRY_TTL_SECONDS = int(os.getenv("CATEGORY_REGISTRY_TTL_SECONDS", 60))
+
+# Backend de generación de informes: "gemini" (por defecto) o "stub" (local, sin IA).
+REPORT_BACKEND = os.getenv("REPORT_BACKEND", "gemini").lower()
+# Máximo de llamadas simultáneas al backend de informes por proceso.
+REPORT_MAX_CONCURRENCY = int(os.getenv("REPORT_MAX_CONCURRENCY", 8))
+# Tiempo máximo (en segundos) de cada llamada al backend de informes.
+REPORT_TIMEOUT_SECONDS = float(os.getenv("REPORT_TIMEOUT_SECONDS", 60))
+# Reintentos ante errores o tiempos agotados, con espera exponencial desde este valor.
+REPORT_MAX_RETRIES = int(os.getenv("REPORT_MAX_RETRIES", 2))
+REPORT_RETRY_BACKOFF_SECONDS = float(os.getenv("REPORT_RETRY_BACKOFF_SECONDS", 1.0))
+# Máximo de informes por minuto que pide el proceso nocturno de análisis.
+REPORT_BATCH_RATE_PER_MINUTE = float(os.getenv("REPORT_BATCH_RATE_PER_MINUTE", 60))
+
+# Worker de análisis: trabajos simultáneos por proceso, espera (en segundos) cuando la
+# cola está vacía, antigüedad a partir de la cual un trabajo 'running' se considera
+# abandonado y cantidad máxima de intentos por trabajo.
+ANALYSIS_WORKER_CONCURRENCY = int(os.getenv("ANALYSIS_WORKER_CONCURRENCY", 4))
+ANALYSIS_JOB_POLL_SECONDS = float(os.getenv("ANALYSIS_JOB_POLL_SECONDS", 2.0))
+ANALYSIS_JOB_STALE_SECONDS = int(os.getenv("ANALYSIS_JOB_STALE_SECONDS", 900))
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", 3))
+# Espera (en segundos) antes de reintentar un trabajo que falló; se duplica en cada intento.
+ANALYSIS_JOB_RETRY_SECONDS = int(os.getenv("ANALYSIS_JOB_RETRY_SECONDS", 30))
+
+# Filas por lote (un `executemany` cada uno) en la carga masiva de transacciones.
+TRANSACTION_BULK_CHUNK_SIZE = int(os.getenv("TRANSACTION_BULK_CHUNK_SIZE", 5000))
+# Filas por bloque al importar extractos CSV/Excel (acota la memoria usada por archivo).
+STATEMENT_IMPORT_CHUNK_SIZE = int(os.getenv("STATEMENT_IMPORT_CHUNK_SIZE", 20000))
+# Filas leídas por lote del cursor del servidor al exportar transacciones.
+TRANSACTION_EXPORT_BATCH_SIZE = int(os.getenv("TRANSACTION_EXPORT_BATCH_SIZE", 5000))
+
+# Claves de idempotencia: tiempo (en segundos) durante el que se responde un reintento
+# con la respuesta guardada y cantidad de respuestas que cada proceso mantiene en memoria.
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", 86400))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 10000))
+
 
 # Validar que las variables críticas estén presentes
 if not DATABASE_URL:
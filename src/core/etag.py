@@ -0,0 +1,29 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def weak_etag(*parts: Any) -> str:
+    """ETag débil (`W/"..."`) a partir de los valores que determinan la respuesta."""
+    digest = hashlib.sha256("\n".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Indica si el encabezado `If-None-Match` de la solicitud incluye la ETag (con
+    comparación débil, como corresponde a una solicitud GET).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Respuesta `304 Not Modified`, sin cuerpo."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,84 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence
+
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+
+# Paginación por clave (keyset): en lugar de `OFFSET`, cada página continúa a partir
+# de los valores de orden de la última fila de la anterior, codificados en un cursor
+# opaco. Con un índice sobre las columnas de orden, el costo de cada página no
+# depende de cuántas filas haya antes.
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursorError(ValueError):
+    """El cursor recibido no es válido (no lo generó esta API o está dañado)."""
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Codifica los valores de orden de una fila como un cursor opaco."""
+    payload = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """
+    Decodifica un cursor generado por `encode_cursor`, convirtiendo cada valor con el
+    tipo correspondiente (por ejemplo, `datetime.fromisoformat` y `uuid.UUID`).
+
+    Raises:
+        InvalidCursorError: Si el cursor no es válido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return [None if v is None else convert(v) for convert, v in zip(types, values)]
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursorError("El cursor de paginación no es válido.") from e
+
+
+def keyset_paginate(
+    stmt: Select,
+    columns: Sequence[Any],
+    after: Optional[Sequence[Any]],
+    limit: int,
+    descending: bool = True,
+) -> Select:
+    """
+    Ordena la consulta por `columns` y la limita a la página que sigue a `after`
+    (los valores de orden de la última fila ya devuelta).
+
+    Se pide una fila de más para saber si existe una página siguiente (ver `page_cursor`).
+    """
+    if after is not None:
+        key = tuple_(*columns)
+        stmt = stmt.where(key < tuple_(*after) if descending else key > tuple_(*after))
+    order = [c.desc() if descending else c.asc() for c in columns]
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+def page_cursor(rows: List[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """
+    Recorta la fila extra que pidió `keyset_paginate` y devuelve el cursor de la
+    página siguiente (o `None` si no hay más). Modifica `rows`.
+    """
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    return encode_cursor(key(rows[-1]))
@@ -0,0 +1,24 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _orjson_default(value: Any) -> Any:
+    # Mismo criterio que los esquemas de Pydantic para los montos.
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Tipo no serializable a JSON: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Respuesta JSON serializada con orjson, para listados grandes que el endpoint ya
+    arma como diccionarios (sin validar cada fila con Pydantic). orjson serializa
+    directamente fechas y UUID.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default)
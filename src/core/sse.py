@@ -0,0 +1,6 @@
+import json
+
+
+def sse_event(event: str, data) -> str:
+    """Formatea un evento de Server-Sent Events con datos en JSON."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
@@ -5,10 +5,17 @@ from sqlalchemy import (
     String,
     Text,
     TIMESTAMP,
+    Date,
     Numeric,
     Integer,
+    BigInteger,
     Boolean,
     ForeignKey,
+    PrimaryKeyConstraint,
+    UniqueConstraint,
+    Index,
+    DDL,
+    event,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import declarative_base, relationship
@@ -29,6 +36,9 @@ class User(Base):
     company_name = Column("company_name", String, nullable=False)
     tax_id = Column("tax_id", String)
     preferred_currency = Column("preferred_currency", String, server_default="ARS")
+    # Versión de los datos del usuario: se incrementa con cada escritura de transacciones
+    # o insights (ver `src/services/data_version.py`) y define las ETag de los listados.
+    data_version = Column(BigInteger, nullable=False, server_default="0")
     created_at = Column(
         "created_at", TIMESTAMP, server_default=func.now(), nullable=False
     )
@@ -56,6 +66,13 @@ class TransactionCategory(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Índices del listado paginado (ver `read_transactions`): el orden (date, id) por
+    # usuario y sus variantes con los filtros más frecuentes.
+    __table_args__ = (
+        Index("ix_transactions_user_id_date_id", "user_id", "date", "id"),
+        Index("ix_transactions_user_id_type_date_id", "user_id", "type", "date", "id"),
+        Index("ix_transactions_user_id_category_id_date_id", "user_id", "category_id", "date", "id"),
+    )
 
     id = Column(
         UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
@@ -80,6 +97,71 @@ class Transaction(Base):
     category = relationship("TransactionCategory", back_populates="transactions")
 
 
+# Índices de búsqueda sobre la descripción (ver `src/services/transaction_search.py`):
+# texto completo con la configuración en español y trigramas (pg_trgm) para las
+# coincidencias aproximadas. La consulta debe usar la misma expresión que el índice.
+# Ambos empiezan por `user_id` (btree_gin permite indexarlo en un GIN), así la
+# búsqueda solo recorre las coincidencias del usuario y no las de todos.
+TRANSACTION_DESCRIPTION_TSVECTOR = func.to_tsvector(text("'spanish'::regconfig"), Transaction.description)
+Index(
+    "ix_transactions_description_tsv",
+    Transaction.user_id,
+    TRANSACTION_DESCRIPTION_TSVECTOR,
+    postgresql_using="gin",
+)
+Index(
+    "ix_transactions_description_trgm",
+    Transaction.user_id,
+    Transaction.description,
+    postgresql_using="gin",
+    postgresql_ops={"description": "gin_trgm_ops"},
+)
+
+# Extensiones que necesitan esos índices. Las migraciones las crean por su cuenta;
+# esto cubre `Base.metadata.create_all` (inicio de la app y `seed.py`).
+for _extension in ("pg_trgm", "btree_gin"):
+    event.listen(
+        Base.metadata,
+        "before_create",
+        DDL(f"CREATE EXTENSION IF NOT EXISTS {_extension}").execute_if(dialect="postgresql"),
+    )
+
+
+class MonthlyRollup(Base):
+    """
+    Totales mensuales precalculados por usuario, categoría y tipo de transacción.
+
+    Se mantienen actualizados en cada escritura de transacciones para que el
+    análisis financiero no tenga que recorrer el historial completo. Los montos se
+    acumulan por moneda, sin convertir.
+    """
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "year", "month", "category_id", "type", "currency"),
+    )
+
+    user_id = Column("user_id", UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    category_id = Column(
+        "category_id",
+        UUID(as_uuid=True),
+        ForeignKey("transaction_categories.id"),
+        nullable=False,
+    )
+    type = Column(String, nullable=False)  # 'income' or 'expense'
+    currency = Column(String, nullable=False, server_default="ARS")
+    total_amount = Column("total_amount", Numeric(18, 2), nullable=False)
+    transaction_count = Column("transaction_count", Integer, nullable=False)
+    first_date = Column("first_date", TIMESTAMP, nullable=False)
+    last_date = Column("last_date", TIMESTAMP, nullable=False)
+    updated_at = Column(
+        "updated_at", TIMESTAMP, server_default=func.now(), nullable=False
+    )
+
+    category = relationship("TransactionCategory")
+
+
 class InflationData(Base):
     __tablename__ = "inflation_data"
 
@@ -95,8 +177,31 @@ class InflationData(Base):
     )
 
 
+class FxRate(Base):
+    """Cotización de una moneda en pesos argentinos (ARS por unidad) para una fecha."""
+    __tablename__ = "fx_rates"
+    __table_args__ = (
+        UniqueConstraint("currency", "date", name="uq_fx_rates_currency_date"),
+    )
+
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
+    )
+    currency = Column(String, nullable=False)
+    date = Column(Date, nullable=False)
+    rate = Column(Numeric(18, 6), nullable=False)
+    source = Column(String, server_default="BCRA")
+    created_at = Column(
+        "created_at", TIMESTAMP, server_default=func.now(), nullable=False
+    )
+
+
 class AiInsight(Base):
     __tablename__ = "ai_insights"
+    __table_args__ = (
+        # Listado paginado por usuario, del más reciente al más antiguo.
+        Index("ix_ai_insights_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(
         UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
@@ -115,8 +220,85 @@ class AiInsight(Base):
     user = relationship("User", back_populates="ai_insights")
 
 
+# Índice de expresión para buscar informes ya generados por el hash de sus métricas.
+Index("ix_ai_insights_report_hash", AiInsight.json_metadata["report_hash"].astext)
+
+
+class AnalysisJob(Base):
+    """
+    Solicitud de análisis financiero pendiente o en curso.
+
+    Los trabajos se procesan en workers separados de la API
+    (`python -m src.workers.analysis_worker`), que los toman con
+    `SELECT ... FOR UPDATE SKIP LOCKED` para que cada uno se procese una sola vez.
+    """
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_created_at", "status", "created_at"),
+        Index("ix_analysis_jobs_user_id", "user_id"),
+        # Un solo trabajo activo por usuario y solicitud (ver `request_analysis`).
+        Index(
+            "uq_analysis_jobs_active_dedup_key",
+            "user_id",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+    id = Column(
+        UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
+    )
+    user_id = Column("user_id", UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    status = Column(String, nullable=False, server_default="pending")  # 'pending', 'running', 'completed', 'failed'
+    params = Column(JSONB, nullable=False)
+    # Hash de los parámetros y del estado de los datos del usuario al encolar.
+    dedup_key = Column(String)
+    # Solicitudes posteriores que se unieron a este trabajo en lugar de crear otro.
+    coalesced_count = Column(Integer, nullable=False, server_default="0")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    error = Column(Text)
+    insight_id = Column("insight_id", UUID(as_uuid=True), ForeignKey("ai_insights.id"))
+    created_at = Column(
+        "created_at", TIMESTAMP, server_default=func.now(), nullable=False
+    )
+    started_at = Column("started_at", TIMESTAMP)
+    finished_at = Column("finished_at", TIMESTAMP)
+    # Un trabajo que falló y se reintentará no se reclama antes de este momento.
+    not_before = Column("not_before", TIMESTAMP)
+
+
+class IdempotencyKey(Base):
+    """
+    Respuesta guardada de una solicitud con encabezado `Idempotency-Key`, para
+    responder los reintentos sin volver a ejecutarla (ver `src/services/idempotency.py`).
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "scope", "key"),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    user_id = Column("user_id", UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # Operación a la que corresponde la clave (ej. 'POST /transactions/').
+    scope = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    # Hash del cuerpo de la solicitud original, para rechazar la misma clave con otro contenido.
+    request_hash = Column(String, nullable=False)
+    # Nulos mientras la solicitud original se está procesando.
+    status_code = Column(Integer)
+    response = Column(JSONB)
+    created_at = Column(
+        "created_at", TIMESTAMP, server_default=func.now(), nullable=False
+    )
+    expires_at = Column(TIMESTAMP, nullable=False)
+
+
 class CashFlowProjection(Base):
     __tablename__ = "cash_flow_projections"
+    __table_args__ = (
+        Index("ix_cash_flow_projections_user_id_date", "user_id", "date"),
+    )
 
     id = Column(
         UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
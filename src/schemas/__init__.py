@@ -5,6 +5,13 @@
 
 from .user import User, UserCreate, UserInDB
 from .transaction_category import TransactionCategory, TransactionCategoryCreate
-from .transaction import Transaction, TransactionCreate
-from .ai_insight import AiInsight, AiInsightCreate
+from .transaction import (
+    Transaction, TransactionCreate, TransactionRowError, TransactionBulkResult, TransactionPage,
+    TransactionCompact, TransactionCompactPage,
+    TransactionSearchHit, TransactionSearchPage, ExportFormat,
+)
+from .ai_insight import AiInsight, AiInsightCreate, AiInsightSummary, AiInsightPage, AiInsightSummaryPage
 from .token import Token, TokenData
+from .analysis import Granularity, MetricsSeriesPoint, FinancialMetrics, ReportCacheStats
+from .cash_flow_projection import CashFlowProjection
+from .analysis_job import AnalysisJob, AnalysisJobStats
@@ -1,6 +1,7 @@
 import uuid
+from enum import Enum
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
 # --- Esquemas de AI Insight ---
@@ -29,3 +30,34 @@ class AiInsight(AiInsightBase):
 
     class Config:
         orm_mode = True
+
+
+class InsightFields(str, Enum):
+    """Campos incluidos en cada insight de un listado."""
+    summary = "summary"
+    full = "full"
+
+
+class AiInsightSummary(BaseModel):
+    """Versión liviana de un insight para listados: sin descripción ni metadatos."""
+    id: uuid.UUID
+    type: str
+    title: str
+    priority: Optional[str] = None
+    is_read: bool
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class AiInsightPage(BaseModel):
+    fields: Literal["full"] = "full"
+    items: List[AiInsight]
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (nulo si no hay más).")
+
+
+class AiInsightSummaryPage(BaseModel):
+    fields: Literal["summary"] = "summary"
+    items: List[AiInsightSummary]
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (nulo si no hay más).")
@@ -0,0 +1,43 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+from datetime import date
+
+# --- Esquemas de Análisis Financiero ---
+
+class Granularity(str, Enum):
+    """Tamaño de los períodos en los que se agrupa la serie temporal."""
+    day = "day"
+    week = "week"
+    month = "month"
+    quarter = "quarter"
+
+
+class MetricsSeriesPoint(BaseModel):
+    periodo: date = Field(..., description="Fecha de inicio del período.")
+    ingresos: float = Field(..., description="Total de ingresos del período.")
+    egresos: float = Field(..., description="Total de egresos del período.")
+    neto: float = Field(..., description="Resultado neto del período (ingresos - egresos).")
+
+
+class FinancialMetrics(BaseModel):
+    date_from: Optional[date] = Field(None, alias="from", description="Inicio del rango analizado (inclusive).")
+    date_to: Optional[date] = Field(None, alias="to", description="Fin del rango analizado (inclusive).")
+    granularity: Granularity = Field(..., description="Granularidad de la serie temporal.")
+    currency: str = Field("ARS", description="Moneda en la que están expresados los montos.")
+    base_month: Optional[str] = Field(None, description="Mes base (YYYY-MM) si los montos están en pesos constantes.")
+    metrics: Dict[str, Any] = Field(..., description="Métricas agregadas del rango analizado.")
+    series: List[MetricsSeriesPoint] = Field(..., description="Serie temporal de ingresos, egresos y neto por período.")
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+class ReportCacheStats(BaseModel):
+    memory_hits: int = Field(..., description="Informes servidos desde la memoria del proceso.")
+    db_hits: int = Field(..., description="Informes reutilizados desde insights guardados.")
+    misses: int = Field(..., description="Informes que requirieron una llamada a la API de IA.")
+    hit_ratio: float = Field(..., description="Proporción de aciertos sobre el total de búsquedas.")
+    size: int = Field(..., description="Informes actualmente en memoria.")
+    maxsize: int = Field(..., description="Capacidad máxima de la caché en memoria.")
+    prompt_version: str = Field(..., description="Versión del prompt vigente.")
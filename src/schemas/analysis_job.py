@@ -0,0 +1,27 @@
+import uuid
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+# --- Esquemas de Trabajos de Análisis ---
+
+class AnalysisJob(BaseModel):
+    id: uuid.UUID
+    status: str = Field(..., description="Estado del trabajo: 'pending', 'running', 'completed' o 'failed'.")
+    params: Dict[str, Any] = Field(..., description="Parámetros del análisis solicitado.")
+    attempts: int = Field(..., description="Cantidad de veces que un worker tomó el trabajo.")
+    coalesced_count: int = Field(0, description="Solicitudes posteriores que se unieron a este trabajo.")
+    error: Optional[str] = Field(None, description="Motivo del fallo, si lo hubo.")
+    insight_id: Optional[uuid.UUID] = Field(None, description="Insight generado, cuando el trabajo se completó.")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class AnalysisJobStats(BaseModel):
+    jobs: int = Field(..., description="Análisis efectivamente encolados.")
+    coalesced_requests: int = Field(..., description="Solicitudes que se unieron a un análisis existente.")
+    total_requests: int = Field(..., description="Total de solicitudes de análisis.")
@@ -0,0 +1,18 @@
+import uuid
+from pydantic import BaseModel, Field
+from datetime import datetime
+from decimal import Decimal
+
+# --- Esquemas de Proyección de Flujo de Caja ---
+
+class CashFlowProjection(BaseModel):
+    id: uuid.UUID
+    user_id: uuid.UUID = Field(..., description="ID del usuario al que pertenece la proyección.")
+    date: datetime = Field(..., description="Primer día del mes proyectado.")
+    projected_income: Decimal = Field(..., description="Ingresos proyectados para el mes.")
+    projected_expenses: Decimal = Field(..., description="Egresos proyectados para el mes.")
+    net_flow: Decimal = Field(..., description="Flujo neto proyectado (ingresos - egresos).")
+    created_at: datetime = Field(..., description="Fecha y hora en que se calculó la proyección.")
+
+    class Config:
+        orm_mode = True
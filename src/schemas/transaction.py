@@ -1,6 +1,8 @@
 import uuid
+from enum import Enum
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Optional
 from decimal import Decimal
 from .transaction_category import TransactionCategory
 
@@ -35,3 +37,49 @@ class Transaction(TransactionBase):
 
     class Config:
         orm_mode = True
+
+
+class TransactionRowError(BaseModel):
+    index: int = Field(..., description="Posición de la fila en la entrada (desde 0).")
+    errors: List[str] = Field(..., description="Motivos por los que la fila no se cargó.")
+
+
+class TransactionBulkResult(BaseModel):
+    received: int = Field(..., description="Filas recibidas.")
+    inserted: int = Field(..., description="Filas insertadas.")
+    failed: int = Field(..., description="Filas rechazadas.")
+    errors: List[TransactionRowError] = Field(..., description="Detalle de las filas rechazadas (hasta 1000).")
+
+
+class TransactionPage(BaseModel):
+    items: List[Transaction]
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (nulo si no hay más).")
+
+
+class TransactionCompact(TransactionBase):
+    # Igual que `Transaction`, pero sin la categoría anidada: se identifica por `category_id`.
+    id: uuid.UUID
+    user_id: uuid.UUID = Field(..., description="ID del usuario al que pertenece la transacción.")
+    created_at: datetime = Field(..., description="Fecha y hora de registro de la transacción.")
+
+
+class TransactionCompactPage(BaseModel):
+    items: List[TransactionCompact]
+    categories: List[TransactionCategory] = Field(..., description="Categorías de las transacciones de la página, sin repetir.")
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (nulo si no hay más).")
+
+
+class TransactionSearchHit(BaseModel):
+    transaction: Transaction
+    rank: float = Field(..., description="Relevancia del resultado (entre 0 y 1).")
+
+
+class TransactionSearchPage(BaseModel):
+    items: List[TransactionSearchHit]
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (nulo si no hay más).")
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    parquet = "parquet"
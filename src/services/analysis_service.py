@@ -0,0 +1,440 @@
+import hashlib
+import json
+import uuid
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import ANALYSIS_JOB_MAX_ATTEMPTS, ANALYSIS_JOB_RETRY_SECONDS, ANALYSIS_JOB_STALE_SECONDS
+from src.db.models import AiInsight, AnalysisJob, FxRate, InflationData, MonthlyRollup, User
+from src.services.data_version import bump_data_version
+from src.services.financial_analysis import (
+    calculate_financial_metrics_from_db,
+    calculate_financial_metrics_from_rollups,
+    calculate_time_series,
+)
+from src.services.inflation import InflationAdjustment, get_inflation_adjustment
+from src.services.report_cache import get_or_generate_report
+from src.services.report_generator import PROMPT_VERSION
+from src.services.report_service import is_report_backend_configured
+
+
+class AnalysisError(Exception):
+    """El análisis no puede completarse con los datos actuales (reintentarlo no sirve)."""
+
+
+async def calculate_metrics_for_range(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    adjustment: Optional[InflationAdjustment] = None,
+    currency: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Calcula las métricas del usuario eligiendo la fuente más barata: sin rango de
+    fechas se usan los rollups mensuales (el costo depende de la cantidad de meses y
+    categorías); con rango, consultas agregadas sobre las transacciones del rango.
+    """
+    if date_from or date_to:
+        return await calculate_financial_metrics_from_db(db, user_id, date_from, date_to, adjustment, currency)
+    return await calculate_financial_metrics_from_rollups(db, user_id, adjustment, currency)
+
+
+async def calculate_analysis_metrics(
+    db: AsyncSession,
+    user: User,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    granularity: Optional[str] = None,
+    adjustment: Optional[InflationAdjustment] = None,
+) -> Dict[str, Any]:
+    """
+    Calcula las métricas de un análisis en la moneda preferida del usuario, con la
+    serie temporal si se pidió una granularidad.
+
+    Raises:
+        ValueError: Si faltan datos de inflación o cotizaciones para algún mes del período.
+    """
+    currency = user.preferred_currency or "ARS"
+    metrics = await calculate_metrics_for_range(db, user.id, date_from, date_to, adjustment, currency)
+    if granularity and metrics["periodo_analizado"] != "N/A":
+        metrics["serie_temporal"] = await calculate_time_series(
+            db, user.id, granularity, date_from, date_to, adjustment, currency
+        )
+    return metrics
+
+
+def financial_summary_values(
+    user_id: uuid.UUID,
+    metrics: Dict[str, Any],
+    report_text: str,
+    report_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Columnas de un insight `financial_summary` (para guardarlo solo o en bloque)."""
+    return {
+        "user_id": user_id,
+        "type": "financial_summary",
+        "title": "Resumen Financiero Automático",
+        "description": report_text,
+        "priority": "medium",
+        "json_metadata": (
+            {**metrics, "report_hash": report_key, "prompt_version": PROMPT_VERSION} if report_key else metrics
+        ),
+    }
+
+
+async def save_financial_summary(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    metrics: Dict[str, Any],
+    report_text: str,
+    report_key: Optional[str] = None,
+) -> AiInsight:
+    """Guarda el informe como un insight `financial_summary` y hace commit."""
+    insight = AiInsight(**financial_summary_values(user_id, metrics, report_text, report_key))
+    db.add(insight)
+    await bump_data_version(db, [user_id])
+    await db.commit()
+    return insight
+
+
+async def run_analysis(
+    db: AsyncSession,
+    user: User,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    granularity: Optional[str] = None,
+    base_month: Optional[str] = None,
+) -> AiInsight:
+    """
+    Ejecuta un análisis financiero completo:
+    1. Calcula las métricas del usuario en su moneda preferida (opcionalmente en un
+       rango de fechas, con una serie temporal y en pesos constantes de `base_month`).
+    2. Genera el informe con IA (o reutiliza uno anterior con las mismas métricas).
+    3. Guarda el resultado como un nuevo "insight" y lo devuelve.
+
+    Raises:
+        AnalysisError: Si no hay transacciones o faltan datos de inflación o cotizaciones.
+    """
+    # 1. Calcular métricas
+    try:
+        adjustment = None
+        if base_month:
+            year, month = (int(part) for part in base_month.split("-"))
+            adjustment = await get_inflation_adjustment(db, date(year, month, 1))
+        metrics = await calculate_analysis_metrics(db, user, date_from, date_to, granularity, adjustment)
+    except ValueError as e:
+        raise AnalysisError(str(e)) from e
+
+    if metrics["periodo_analizado"] == "N/A":
+        raise AnalysisError("No se encontraron transacciones para analizar.")
+
+    # 2. Generar informe con IA
+    report_key = None
+    if not is_report_backend_configured():
+        print("ADVERTENCIA: La clave de API de Google no está configurada. No se puede generar el informe de IA.")
+        report_text = "El informe de IA no pudo ser generado porque la clave de API de Google no está configurada en el servidor."
+    else:
+        report_text, report_key = await get_or_generate_report(db, user.id, metrics)
+
+    # 3. Guardar el resultado en la tabla de insights
+    return await save_financial_summary(db, user.id, metrics, report_text, report_key)
+
+
+async def users_pending_analysis(
+    db: AsyncSession,
+    limit: int,
+    after_user_id: Optional[uuid.UUID] = None,
+) -> List[uuid.UUID]:
+    """
+    IDs de usuarios (en orden, desde `after_user_id`) con transacciones nuevas desde
+    su último resumen financiero. Se basa en la fecha de actualización de los rollups,
+    así que no recorre la tabla de transacciones.
+
+    Como un usuario ya analizado deja de cumplir la condición, volver a ejecutar el
+    proceso después de una interrupción continúa con los que faltan.
+    """
+    last_insight = (
+        select(AiInsight.user_id, func.max(AiInsight.created_at).label("last_insight_at"))
+        .where(AiInsight.type == "financial_summary")
+        .group_by(AiInsight.user_id)
+        .subquery()
+    )
+    stmt = (
+        select(MonthlyRollup.user_id)
+        .outerjoin(last_insight, last_insight.c.user_id == MonthlyRollup.user_id)
+        .group_by(MonthlyRollup.user_id, last_insight.c.last_insight_at)
+        .having(or_(
+            last_insight.c.last_insight_at.is_(None),
+            func.max(MonthlyRollup.updated_at) > last_insight.c.last_insight_at,
+        ))
+        .order_by(MonthlyRollup.user_id)
+        .limit(limit)
+    )
+    if after_user_id is not None:
+        stmt = stmt.where(MonthlyRollup.user_id > after_user_id)
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def save_financial_summaries(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Guarda varios resúmenes (ver `financial_summary_values`) con un único `INSERT` y hace commit."""
+    if rows:
+        await db.execute(insert(AiInsight), rows)
+        await bump_data_version(db, [row["user_id"] for row in rows])
+    await db.commit()
+
+
+# --- Cola de trabajos de análisis ---
+
+def job_params(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    granularity: Optional[str] = None,
+    base_month: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Parámetros de un análisis en formato JSON, tal como se guardan en `analysis_jobs.params`."""
+    return {
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None,
+        "granularity": granularity,
+        "base_month": base_month,
+    }
+
+
+ACTIVE_JOB_STATUSES = ("pending", "running")
+
+
+async def user_data_fingerprint(db: AsyncSession, user_id: uuid.UUID) -> str:
+    """
+    Resumen del estado de los datos de los que depende un análisis del usuario: sus
+    rollups mensuales (cambian con cada alta de transacciones), su moneda preferida y
+    las cotizaciones e índices de inflación cargados, porque un cambio en cualquiera
+    de ellos cambia los montos convertidos o ajustados.
+    """
+    def scalar(*columns):
+        return [select(column).scalar_subquery() for column in columns]
+
+    result = await db.execute(
+        select(
+            func.count(),
+            func.sum(MonthlyRollup.transaction_count),
+            func.sum(MonthlyRollup.total_amount),
+            func.max(MonthlyRollup.updated_at),
+            select(User.preferred_currency).where(User.id == user_id).scalar_subquery(),
+            # Las cotizaciones se actualizan en el lugar (ver `load_fx_rates`), así que
+            # se resume también la suma de las tasas.
+            *scalar(func.count(FxRate.id), func.max(FxRate.date), func.sum(FxRate.rate)),
+            *scalar(func.count(InflationData.id), func.max(InflationData.created_at)),
+        ).where(MonthlyRollup.user_id == user_id)
+    )
+    return "|".join(str(value) for value in result.one())
+
+
+def job_dedup_key(params: Dict[str, Any], fingerprint: str) -> str:
+    """Clave de un análisis: mismos parámetros sobre los mismos datos dan la misma clave."""
+    payload = json.dumps(params, sort_keys=True) + "\n" + fingerprint
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _find_coalescable_job(db: AsyncSession, user_id: uuid.UUID, dedup_key: str) -> Optional[AnalysisJob]:
+    """Último trabajo con la misma clave que sigue en curso o que ya generó su insight."""
+    result = await db.execute(
+        select(AnalysisJob)
+        .where(
+            AnalysisJob.user_id == user_id,
+            AnalysisJob.dedup_key == dedup_key,
+            or_(
+                AnalysisJob.status.in_(ACTIVE_JOB_STATUSES),
+                and_(AnalysisJob.status == "completed", AnalysisJob.insight_id.isnot(None)),
+            ),
+        )
+        .order_by(AnalysisJob.created_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def request_analysis(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    params: Dict[str, Any],
+) -> Tuple[AnalysisJob, bool]:
+    """
+    Encola un análisis, salvo que ya exista uno equivalente: si hay un trabajo con los
+    mismos parámetros en curso, o uno ya completado sobre los mismos datos, la
+    solicitud se une a ese trabajo (se incrementa su `coalesced_count`) en lugar de
+    repetir el cálculo y la llamada a la IA.
+
+    Un índice único parcial garantiza un solo trabajo activo por usuario y clave aun
+    con solicitudes simultáneas.
+
+    Returns:
+        Una tupla `(trabajo, coalesced)`. Hace commit.
+    """
+    dedup_key = job_dedup_key(params, await user_data_fingerprint(db, user_id))
+
+    for _ in range(2):
+        job = await _find_coalescable_job(db, user_id, dedup_key)
+        if job is not None:
+            await db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id == job.id)
+                .values(coalesced_count=AnalysisJob.coalesced_count + 1)
+            )
+            await db.commit()
+            await db.refresh(job)
+            return job, True
+
+        result = await db.execute(
+            pg_insert(AnalysisJob)
+            .values(user_id=user_id, status="pending", params=params, dedup_key=dedup_key)
+            .on_conflict_do_nothing(
+                index_elements=["user_id", "dedup_key"],
+                index_where=AnalysisJob.status.in_(ACTIVE_JOB_STATUSES),
+            )
+            .returning(AnalysisJob.id)
+        )
+        job_id = result.scalar_one_or_none()
+        await db.commit()
+        if job_id is not None:
+            return await db.get(AnalysisJob, job_id), False
+        # Otra solicitud simultánea creó el trabajo: unirse a ese.
+
+    raise RuntimeError("No se pudo encolar el análisis.")
+
+
+async def coalescing_stats(db: AsyncSession, user_id: Optional[uuid.UUID] = None) -> Dict[str, int]:
+    """Cantidad de trabajos creados y de solicitudes que se unieron a uno existente."""
+    stmt = select(func.count(), func.coalesce(func.sum(AnalysisJob.coalesced_count), 0))
+    if user_id:
+        stmt = stmt.where(AnalysisJob.user_id == user_id)
+    jobs, coalesced = (await db.execute(stmt)).one()
+    return {"jobs": jobs, "coalesced_requests": coalesced, "total_requests": jobs + coalesced}
+
+
+async def claim_next_job(db: AsyncSession) -> Optional[AnalysisJob]:
+    """
+    Toma el trabajo pendiente más antiguo y lo marca como 'running', con
+    `SELECT ... FOR UPDATE SKIP LOCKED`: varios workers pueden reclamar trabajos a la
+    vez sin bloquearse entre sí ni tomar el mismo. Los trabajos que esperan un
+    reintento no se toman antes de su `not_before`.
+
+    También se retoman los trabajos 'running' abandonados (su worker murió): los que
+    no renovaron `started_at` (ver `heartbeat_job`) en `ANALYSIS_JOB_STALE_SECONDS`.
+    Si ya agotaron sus `ANALYSIS_JOB_MAX_ATTEMPTS` intentos se marcan como 'failed',
+    para que un trabajo que tira abajo a su worker no se reintente para siempre.
+    """
+    stale_before = func.now() - timedelta(seconds=ANALYSIS_JOB_STALE_SECONDS)
+    is_stale = and_(AnalysisJob.status == "running", AnalysisJob.started_at < stale_before)
+    await db.execute(
+        update(AnalysisJob)
+        .where(is_stale, AnalysisJob.attempts >= ANALYSIS_JOB_MAX_ATTEMPTS)
+        .values(
+            status="failed",
+            error="El trabajo se abandonó en todos sus intentos.",
+            finished_at=func.now(),
+        )
+    )
+    result = await db.execute(
+        select(AnalysisJob)
+        .where(or_(
+            and_(
+                AnalysisJob.status == "pending",
+                or_(AnalysisJob.not_before.is_(None), AnalysisJob.not_before <= func.now()),
+            ),
+            and_(is_stale, AnalysisJob.attempts < ANALYSIS_JOB_MAX_ATTEMPTS),
+        ))
+        .order_by(AnalysisJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = result.scalar_one_or_none()
+    if job is None:
+        await db.commit()
+        return None
+
+    job.status = "running"
+    job.attempts += 1
+    job.started_at = func.now()
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def heartbeat_job(db: AsyncSession, job_id: uuid.UUID) -> None:
+    """
+    Renueva `started_at` de un trabajo en curso, para que no se lo considere
+    abandonado mientras su worker siga vivo. Hace commit.
+    """
+    await db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id, AnalysisJob.status == "running")
+        .values(started_at=func.now())
+    )
+    await db.commit()
+
+
+async def finish_job(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    status: str,
+    insight_id: Optional[uuid.UUID] = None,
+    error: Optional[str] = None,
+    retry_after: Optional[float] = None,
+) -> None:
+    """
+    Registra el resultado de un trabajo y hace commit. Con `retry_after` (segundos), un
+    trabajo devuelto a 'pending' no se vuelve a reclamar hasta que pase ese tiempo.
+    """
+    values = {"status": status, "insight_id": insight_id, "error": error}
+    if status in ("completed", "failed"):
+        values["finished_at"] = func.now()
+    if retry_after is not None:
+        values["not_before"] = func.now() + timedelta(seconds=retry_after)
+    await db.execute(update(AnalysisJob).where(AnalysisJob.id == job_id).values(**values))
+    await db.commit()
+
+
+async def process_job(db: AsyncSession, job: AnalysisJob) -> str:
+    """
+    Ejecuta el análisis de un trabajo ya reclamado y registra el resultado.
+
+    Los errores de datos (`AnalysisError`) marcan el trabajo como 'failed'. Los
+    errores inesperados lo devuelven a 'pending' hasta `ANALYSIS_JOB_MAX_ATTEMPTS`
+    intentos, con una espera antes de cada reintento que empieza en
+    `ANALYSIS_JOB_RETRY_SECONDS` y se duplica en cada intento.
+
+    Returns:
+        El estado final del trabajo.
+    """
+    params = job.params or {}
+    try:
+        user = await db.get(User, job.user_id)
+        insight = await run_analysis(
+            db,
+            user,
+            date.fromisoformat(params["date_from"]) if params.get("date_from") else None,
+            date.fromisoformat(params["date_to"]) if params.get("date_to") else None,
+            params.get("granularity"),
+            params.get("base_month"),
+        )
+    except AnalysisError as e:
+        await db.rollback()
+        await finish_job(db, job.id, "failed", error=str(e))
+        return "failed"
+    except Exception as e:
+        await db.rollback()
+        if job.attempts >= ANALYSIS_JOB_MAX_ATTEMPTS:
+            status, retry_after = "failed", None
+        else:
+            status, retry_after = "pending", ANALYSIS_JOB_RETRY_SECONDS * 2 ** (job.attempts - 1)
+        print(f"Error en el trabajo de análisis {job.id} (intento {job.attempts}): {e}")
+        await finish_job(db, job.id, status, error=str(e), retry_after=retry_after)
+        return status
+
+    await finish_job(db, job.id, "completed", insight_id=insight.id)
+    return "completed"
@@ -0,0 +1,258 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import AiInsight, Transaction
+from src.services.category_registry import get_category_registry
+from src.services.data_version import bump_data_version
+
+# Cantidad de egresos previos de la misma categoría usados para la mediana móvil.
+ROLLING_WINDOW = 10
+# Mínimo de egresos previos en la categoría para evaluar un egreso.
+ROLLING_MIN_PERIODS = 5
+# Un egreso es atípico si supera esta cantidad de veces la mediana móvil de su categoría.
+EXPENSE_OUTLIER_FACTOR = 3.0
+# Meses previos usados como referencia para detectar una caída de ingresos.
+INCOME_REFERENCE_MONTHS = 3
+# Caída relativa (respecto del promedio de referencia) que dispara una alerta.
+INCOME_DROP_THRESHOLD = 0.5
+
+TRANSACTION_COLUMNS = ["id", "date", "amount", "currency", "type", "category", "description"]
+
+
+async def fetch_user_transactions(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    since: datetime,
+) -> pd.DataFrame:
+    """
+    Lee las transacciones de un usuario desde `since` en un DataFrame, con una única
+    consulta y solo las columnas que necesita la detección.
+    """
+    result = await db.execute(
+        select(
+            Transaction.id,
+            Transaction.date,
+            Transaction.amount,
+            Transaction.currency,
+            Transaction.type,
+            Transaction.category_id,
+            Transaction.description,
+        )
+        .where(Transaction.user_id == user_id, Transaction.date >= since)
+        .order_by(Transaction.date)
+    )
+    df = pd.DataFrame(result.all(), columns=TRANSACTION_COLUMNS)
+    # El nombre de la categoría se resuelve con el registro en memoria, sin un JOIN.
+    registry = await get_category_registry(db, df["category"].unique())
+    df["category"] = df["category"].map(registry.name)
+    df["amount"] = df["amount"].astype(float)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def _expense_outliers(df: pd.DataFrame, report_from: pd.Timestamp) -> List[Dict[str, Any]]:
+    """Egresos que superan `EXPENSE_OUTLIER_FACTOR` veces la mediana móvil de su categoría."""
+    expenses = df[df["type"] == "expense"].sort_values("date")
+    if expenses.empty:
+        return []
+
+    # Mediana de los egresos *anteriores* de la misma categoría y moneda.
+    previous = expenses.groupby(["category", "currency"])["amount"].shift(1)
+    median = previous.groupby([expenses["category"], expenses["currency"]]).transform(
+        lambda s: s.rolling(ROLLING_WINDOW, min_periods=ROLLING_MIN_PERIODS).median()
+    )
+    flagged = expenses[
+        (expenses["date"] >= report_from)
+        & (median > 0)
+        & (expenses["amount"] > EXPENSE_OUTLIER_FACTOR * median)
+    ]
+
+    alerts = []
+    for row, row_median in zip(flagged.itertuples(index=False), median[flagged.index]):
+        ratio = row.amount / row_median
+        alerts.append({
+            "title": f"Egreso inusual en {row.category}",
+            "description": (
+                f"El egreso \"{row.description}\" del {row.date:%d/%m/%Y} por {row.amount:,.2f} {row.currency} "
+                f"es {ratio:.1f} veces mayor que lo habitual en la categoría {row.category} "
+                f"(mediana reciente: {row_median:,.2f} {row.currency}). Revisá que sea correcto."
+            ),
+            "priority": "high" if ratio >= 2 * EXPENSE_OUTLIER_FACTOR else "medium",
+            "json_metadata": {
+                "anomaly": "expense_outlier",
+                "anomaly_key": f"expense_outlier:{row.id}",
+                "transaction_id": str(row.id),
+                "category": row.category,
+                "currency": row.currency,
+                "amount": round(row.amount, 2),
+                "rolling_median": round(float(row_median), 2),
+                "date": row.date.date().isoformat(),
+            },
+        })
+    return alerts
+
+
+def _income_drops(df: pd.DataFrame, report_from: pd.Timestamp, report_to: pd.Timestamp) -> List[Dict[str, Any]]:
+    """
+    Meses cerrados dentro del período a informar cuyos ingresos cayeron más de
+    `INCOME_DROP_THRESHOLD` respecto del promedio de los meses anteriores.
+    """
+    incomes = df[df["type"] == "income"]
+    if incomes.empty:
+        return []
+
+    monthly = incomes.groupby(["currency", incomes["date"].dt.to_period("M")])["amount"].sum()
+    # Último mes cerrado antes del fin del período a informar.
+    last_closed = report_to.to_period("M") - 1
+    alerts = []
+    for currency, series in monthly.groupby(level="currency"):
+        series = series.droplevel("currency")
+        # Completar los meses sin ingresos con 0 (incluidos los posteriores al último
+        # ingreso, hasta el último mes cerrado) para que también cuenten como caída.
+        last = max(series.index.max(), last_closed)
+        series = series.reindex(pd.period_range(series.index.min(), last, freq="M"), fill_value=0.0)
+        reference = series.rolling(INCOME_REFERENCE_MONTHS, min_periods=INCOME_REFERENCE_MONTHS).mean().shift(1)
+        month_end = series.index.to_timestamp(how="end")
+        flagged = (
+            (month_end >= report_from)
+            & (month_end < report_to)
+            & (reference > 0)
+            & (series < (1 - INCOME_DROP_THRESHOLD) * reference)
+        )
+        for period in series.index[flagged]:
+            amount, expected = float(series[period]), float(reference[period])
+            drop = 1 - amount / expected
+            alerts.append({
+                "title": "Caída de ingresos mensuales",
+                "description": (
+                    f"Los ingresos de {period.strftime('%m/%Y')} fueron de {amount:,.2f} {currency}, "
+                    f"un {drop:.0%} menos que el promedio de los {INCOME_REFERENCE_MONTHS} meses anteriores "
+                    f"({expected:,.2f} {currency})."
+                ),
+                "priority": "high",
+                "json_metadata": {
+                    "anomaly": "income_drop",
+                    "anomaly_key": f"income_drop:{currency}:{period}",
+                    "month": str(period),
+                    "currency": currency,
+                    "amount": round(amount, 2),
+                    "reference_amount": round(expected, 2),
+                },
+            })
+    return alerts
+
+
+def _same_day_duplicates(df: pd.DataFrame, report_from: pd.Timestamp) -> List[Dict[str, Any]]:
+    """Transacciones del mismo tipo, monto y moneda registradas más de una vez en el mismo día."""
+    recent = df[df["date"] >= report_from]
+    if recent.empty:
+        return []
+
+    recent = recent.assign(day=recent["date"].dt.normalize())
+    keys = ["day", "type", "amount", "currency"]
+    duplicated = recent[recent.duplicated(subset=keys, keep=False)]
+
+    alerts = []
+    for (day, tipo, amount, currency), group in duplicated.groupby(keys):
+        ids = sorted(str(i) for i in group["id"])
+        kind = "ingreso" if tipo == "income" else "egreso"
+        alerts.append({
+            "title": f"Posible {kind} duplicado",
+            "description": (
+                f"Se registraron {len(group)} {kind}s de {amount:,.2f} {currency} el {day:%d/%m/%Y} "
+                f"(\"{group['description'].iloc[0]}\"). Verificá que no se hayan cargado dos veces."
+            ),
+            "priority": "medium",
+            "json_metadata": {
+                "anomaly": "duplicate",
+                "anomaly_key": f"duplicate:{ids[0]}",
+                "transaction_ids": ids,
+                "currency": currency,
+                "amount": round(float(amount), 2),
+                "date": day.date().isoformat(),
+            },
+        })
+    return alerts
+
+
+def detect_anomalies(df: pd.DataFrame, report_from: datetime, report_to: datetime) -> List[Dict[str, Any]]:
+    """
+    Detecta anomalías en las transacciones de un usuario.
+
+    El DataFrame debe incluir la historia necesaria como referencia (medianas y
+    promedios), pero solo se informan las anomalías ocurridas en
+    `[report_from, report_to)`, de modo que una corrida diaria no repita alertas.
+
+    Args:
+        df: Transacciones con las columnas de `TRANSACTION_COLUMNS`.
+        report_from: Inicio (inclusive) del período a informar.
+        report_to: Fin (exclusivo) del período a informar.
+
+    Returns:
+        Una lista de alertas con `title`, `description`, `priority` y `json_metadata`.
+    """
+    if df.empty:
+        return []
+    report_from, report_to = pd.Timestamp(report_from), pd.Timestamp(report_to)
+    df = df[df["date"] < report_to]
+    return (
+        _expense_outliers(df, report_from)
+        + _income_drops(df, report_from, report_to)
+        + _same_day_duplicates(df, report_from)
+    )
+
+
+async def save_alerts(db: AsyncSession, user_id: uuid.UUID, alerts: Sequence[Dict[str, Any]]) -> int:
+    """
+    Guarda las alertas como insights de tipo 'alert' con un único `INSERT` de varias
+    filas, omitiendo las que ya se habían guardado (misma `anomaly_key`). No hace commit.
+
+    Returns:
+        La cantidad de alertas nuevas.
+    """
+    if not alerts:
+        return 0
+
+    keys = [a["json_metadata"]["anomaly_key"] for a in alerts]
+    existing = set(
+        (await db.execute(
+            select(AiInsight.json_metadata["anomaly_key"].astext).where(
+                AiInsight.user_id == user_id,
+                AiInsight.type == "alert",
+                AiInsight.json_metadata["anomaly_key"].astext.in_(keys),
+            )
+        )).scalars().all()
+    )
+    rows = [
+        {"user_id": user_id, "type": "alert", **alert}
+        for alert in alerts
+        if alert["json_metadata"]["anomaly_key"] not in existing
+    ]
+    if rows:
+        await db.execute(insert(AiInsight), rows)
+        await bump_data_version(db, [user_id])
+    return len(rows)
+
+
+async def run_anomaly_detection_for_user(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    report_from: datetime,
+    report_to: datetime,
+    history_from: Optional[datetime] = None,
+) -> int:
+    """
+    Detecta y guarda las alertas de un usuario. Solo se mantienen en memoria las
+    transacciones de ese usuario desde `history_from` (por defecto, `report_from`).
+
+    Returns:
+        La cantidad de alertas nuevas guardadas (sin hacer commit).
+    """
+    df = await fetch_user_transactions(db, user_id, history_from or report_from)
+    alerts = detect_anomalies(df, report_from, report_to)
+    return await save_alerts(db, user_id, alerts)
@@ -0,0 +1,199 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import CashFlowProjection, MonthlyRollup, User
+from src.services.fx import BASE_CURRENCY, CurrencyConversion, build_currency_conversion
+from src.services.inflation import month_number
+
+CENT = Decimal("0.01")
+
+# Cantidad de meses recientes usados para estimar la tendencia lineal.
+TREND_WINDOW_MONTHS = 12
+# Historial mínimo (en meses) para estimar la estacionalidad por mes calendario.
+SEASONAL_MIN_MONTHS = 24
+
+# Historial mensual de un usuario: (user_id, primer mes, ingresos por mes, egresos por mes).
+# Los meses se expresan como `month_number` y las series son contiguas desde el primer
+# mes hasta el último mes cerrado.
+UserHistory = Tuple[uuid.UUID, int, List[float], List[float]]
+
+
+def _project_series(values: np.ndarray, target_positions: np.ndarray) -> np.ndarray:
+    """
+    Proyecta una serie mensual hacia las posiciones indicadas (relativas al primer mes).
+
+    Con al menos `SEASONAL_MIN_MONTHS` meses de historia se usa un promedio estacional:
+    el nivel es el promedio de los últimos 12 meses, la pendiente surge de comparar
+    ese promedio con el de los 12 meses anteriores y a cada mes proyectado se le suma
+    el desvío promedio de su mes calendario en los años completos de historia.
+    Con menos historia se usa una tendencia lineal sobre los últimos
+    `TREND_WINDOW_MONTHS` meses.
+    """
+    n = len(values)
+    if n >= SEASONAL_MIN_MONTHS:
+        level = values[-12:].mean()
+        slope = (level - values[-24:-12].mean()) / 12
+        # Posición central de los últimos 12 meses, a la que corresponde `level`.
+        center = n - 6.5
+
+        # Desvíos de cada mes calendario, sin la tendencia, en los años completos.
+        detrended = values - slope * np.arange(n)
+        complete = n // 12 * 12
+        years = detrended[n - complete:].reshape(-1, 12)
+        deviations = (years - years.mean(axis=1, keepdims=True)).mean(axis=0)
+        seasonal = deviations[(target_positions - (n - complete)) % 12]
+
+        projected = level + slope * (target_positions - center) + seasonal
+    elif n >= 2:
+        positions = np.arange(n)
+        window = min(n, TREND_WINDOW_MONTHS)
+        slope, intercept = np.polyfit(positions[-window:], values[-window:], 1)
+        projected = intercept + slope * target_positions
+    else:
+        projected = np.full(len(target_positions), values[-1] if n else 0.0)
+    return np.clip(projected, 0, None)
+
+
+def project_cash_flow(history: UserHistory, months: int, start_month: int) -> List[Dict[str, Any]]:
+    """
+    Calcula la proyección de flujo de caja de un usuario para `months` meses a partir
+    de `start_month` (inclusive).
+
+    Es una función pura (sin acceso a la base de datos) para poder ejecutarse en un
+    pool de procesos.
+
+    Returns:
+        Una lista de diccionarios con las columnas de `CashFlowProjection`.
+    """
+    user_id, first_month, incomes, expenses = history
+    target_months = np.arange(start_month, start_month + months)
+    target_positions = target_months - first_month
+
+    projected_income = _project_series(np.asarray(incomes, dtype=float), target_positions)
+    projected_expenses = _project_series(np.asarray(expenses, dtype=float), target_positions)
+
+    rows = []
+    for number, income, expense in zip(target_months.tolist(), projected_income, projected_expenses):
+        income = Decimal(float(income)).quantize(CENT)
+        expense = Decimal(float(expense)).quantize(CENT)
+        rows.append({
+            "user_id": user_id,
+            "date": datetime(number // 12, number % 12 + 1, 1),
+            "projected_income": income,
+            "projected_expenses": expense,
+            "net_flow": income - expense,
+        })
+    return rows
+
+
+def project_users(histories: Sequence[UserHistory], months: int, start_month: int) -> List[Dict[str, Any]]:
+    """Proyecta un lote de usuarios. Pensada como unidad de trabajo del pool de procesos."""
+    rows = []
+    for history in histories:
+        rows.extend(project_cash_flow(history, months, start_month))
+    return rows
+
+
+async def fetch_monthly_histories(
+    db: AsyncSession,
+    user_ids: Sequence[uuid.UUID],
+    last_month: int,
+) -> List[UserHistory]:
+    """
+    Obtiene el historial mensual de ingresos y egresos de varios usuarios con una
+    única consulta sobre los rollups mensuales, hasta `last_month` (el último mes
+    cerrado, como `month_number`). El mes en curso queda afuera para que sus totales
+    parciales no bajen el nivel ni la tendencia, y los meses sin movimientos (también
+    los últimos, hasta `last_month`) quedan en 0.
+
+    La proyección se expresa en la moneda preferida de cada usuario
+    (`preferred_currency`), como los análisis: los montos en otras monedas se
+    convierten con la cotización de cierre de cada mes. Si faltan cotizaciones para
+    un usuario, se usan solo sus movimientos en la moneda preferida.
+    """
+    result = await db.execute(
+        select(
+            MonthlyRollup.user_id,
+            User.preferred_currency,
+            MonthlyRollup.currency,
+            MonthlyRollup.year,
+            MonthlyRollup.month,
+            MonthlyRollup.type,
+            func.sum(MonthlyRollup.total_amount),
+        )
+        .join(User, User.id == MonthlyRollup.user_id)
+        .where(
+            MonthlyRollup.user_id.in_(user_ids),
+            MonthlyRollup.year * 12 + MonthlyRollup.month - 1 <= last_month,
+        )
+        .group_by(
+            MonthlyRollup.user_id, User.preferred_currency, MonthlyRollup.currency,
+            MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.type,
+        )
+    )
+
+    rows_by_user: Dict[uuid.UUID, List[Tuple[str, int, str, float]]] = {}
+    targets: Dict[uuid.UUID, str] = {}
+    keys_by_target: Dict[str, Set[Tuple[str, int]]] = {}
+    for user_id, preferred, currency, year, month, tipo, total in result.all():
+        target = (preferred or BASE_CURRENCY).upper()
+        currency = (currency or BASE_CURRENCY).upper()
+        number = month_number(year, month)
+        targets[user_id] = target
+        rows_by_user.setdefault(user_id, []).append((currency, number, tipo, float(total)))
+        keys_by_target.setdefault(target, set()).add((currency, number))
+
+    # Una conversión por moneda de destino para todo el bloque; si falta alguna
+    # cotización, se resuelve usuario por usuario más abajo.
+    conversions: Dict[str, Optional[CurrencyConversion]] = {}
+    for target, keys in keys_by_target.items():
+        try:
+            conversions[target] = await build_currency_conversion(db, target, keys)
+        except ValueError:
+            conversions[target] = None
+
+    histories = []
+    for user_id, rows in rows_by_user.items():
+        target = targets[user_id]
+        conversion = conversions[target]
+        if conversion is None and any(currency != target for currency, _, _, _ in rows):
+            try:
+                conversion = await build_currency_conversion(db, target, {(c, n) for c, n, _, _ in rows})
+            except ValueError as e:
+                print(f"Proyección del usuario {user_id} solo en {target}: {e}")
+
+        totals: Dict[int, List[float]] = {}
+        for currency, number, tipo, total in rows:
+            if currency != target:
+                if conversion is None:
+                    continue
+                total *= float(conversion.factor(currency, number))
+            month_totals = totals.setdefault(number, [0.0, 0.0])
+            if tipo == 'income':
+                month_totals[0] += total
+            elif tipo == 'expense':
+                month_totals[1] += total
+        if not totals:
+            continue
+
+        first = min(totals)
+        series = [totals.get(number, [0.0, 0.0]) for number in range(first, last_month + 1)]
+        histories.append((user_id, first, [s[0] for s in series], [s[1] for s in series]))
+    return histories
+
+
+async def save_projections(db: AsyncSession, user_ids: Sequence[uuid.UUID], rows: List[Dict[str, Any]]) -> None:
+    """
+    Reemplaza las proyecciones almacenadas de los usuarios indicados por las nuevas,
+    con un único `INSERT` de varias filas, y hace commit.
+    """
+    await db.execute(delete(CashFlowProjection).where(CashFlowProjection.user_id.in_(user_ids)))
+    if rows:
+        await db.execute(insert(CashFlowProjection), rows)
+    await db.commit()
@@ -0,0 +1,249 @@
+import re
+import uuid
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Transaction
+from src.services.category_registry import CategoryRegistry, get_category_registry
+
+# Palabras clave de cada categoría por defecto, para clasificar descripciones de
+# extractos bancarios. Se comparan como palabras completas, sin distinguir
+# mayúsculas ni tildes, así que las variantes (plurales, etc.) se listan aparte.
+# Se evitan las palabras de uso común que no indican la categoría (como "claro").
+CATEGORY_KEYWORDS: Dict[str, Iterable[str]] = {
+    "Ventas": [
+        "venta", "ventas", "cobro", "cobros", "cobranza", "cobranzas", "factura", "facturas",
+    ],
+    "Servicios Profesionales": [
+        "honorarios", "consultoria", "consultorias", "asesoria", "asesorias", "servicios profesionales",
+    ],
+    "Salarios": [
+        "sueldo", "sueldos", "salario", "salarios", "haberes", "aguinaldo", "nomina",
+        "cargas sociales", "f931",
+    ],
+    "Alquiler": [
+        "alquiler", "alquileres", "expensas", "arrendamiento", "locacion",
+    ],
+    "Servicios Públicos": [
+        "edenor", "edesur", "metrogas", "naturgy", "aysa", "luz", "gas", "agua", "electricidad",
+        "telefono", "telefonia", "internet", "telecom", "fibertel", "movistar",
+    ],
+    "Marketing": [
+        "publicidad", "publicitaria", "publicitario", "marketing", "campana", "campanas",
+        "google ads", "facebook ads", "meta ads", "anuncio", "anuncios",
+    ],
+    "Software y Suscripciones": [
+        "software", "licencia", "licencias", "suscripcion", "suscripciones", "hosting", "dominio",
+        "aws", "google workspace", "microsoft", "adobe", "slack", "github", "saas",
+    ],
+    "Insumos de Oficina": [
+        "insumos", "libreria", "papeleria", "toner", "cartuchos", "resmas", "articulos de oficina",
+    ],
+    "Impuestos": [
+        "afip", "arca", "arba", "agip", "iva", "ganancias", "iibb", "ingresos brutos", "monotributo",
+        "impuesto", "impuestos", "tasa municipal", "sellos", "percepcion", "retencion",
+    ],
+    "Otros Egresos": [
+        "comision", "comisiones", "mantenimiento de cuenta", "gastos bancarios",
+    ],
+}
+
+# Máximo de pares (descripción, categoría) distintos que se aprenden de las
+# transacciones anteriores de un usuario (los más frecuentes).
+MAX_LEARNED_DESCRIPTIONS = 50000
+# Largo mínimo de una palabra clave normalizada: las más cortas coinciden con
+# abreviaturas sueltas de las descripciones (como la "F" de "F.C.").
+MIN_KEYWORD_LENGTH = 3
+# Separador entre tipo y descripción en las claves de lo aprendido.
+_KEY_SEPARATOR = "\x1f"
+
+
+def normalize_descriptions(descriptions: pd.Series) -> pd.Series:
+    """
+    Normaliza descripciones para compararlas: minúsculas, sin tildes y solo letras y
+    números. La puntuación y las palabras formadas solo por números (de comprobante o
+    de operación) se descartan, para que "TRANSF 00123 - JUAN" y "Transf. 00456 Juan"
+    coincidan; las que combinan letras y números (como "F931") se conservan.
+    """
+    return (
+        descriptions.fillna("").astype(str)
+        .str.lower()
+        .str.normalize("NFKD")
+        .str.replace("[\u0300-\u036f]", "", regex=True)
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.replace(r"\b[0-9]+\b", " ", regex=True)
+        .str.replace(r" +", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Compila palabras clave en una expresión regular con forma de trie: los prefijos
+    comunes se comparten y, en cada posición, se prueba primero la palabra más larga.
+    Así la búsqueda de todas las palabras es una sola pasada del motor de `re` (en C)
+    por cada texto, en lugar de una por palabra.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, Any]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return f"(?:{body})?" if len(branches) == 1 else body + "?"
+        return body
+
+    return render(trie)
+
+
+class KeywordIndex:
+    """
+    Índice de palabras clave precompilado: una expresión regular por tipo de
+    transacción ('income'/'expense'), para que una palabra de una categoría de
+    ingresos no clasifique un egreso. Si varias palabras coinciden, gana la que
+    aparece primero en la descripción (y, entre las que empiezan en el mismo lugar,
+    la más larga).
+
+    Las palabras clave que normalizadas tienen menos de `MIN_KEYWORD_LENGTH`
+    caracteres se rechazan con `ValueError`.
+    """
+
+    def __init__(self, registry: CategoryRegistry, keywords: Mapping[str, Iterable[str]] = CATEGORY_KEYWORDS):
+        self.category_ids: Dict[str, uuid.UUID] = {}
+        words_by_type: Dict[str, list] = {}
+        for name, words in keywords.items():
+            category_id = registry.ids_by_name.get(name)
+            if category_id is None:
+                continue
+            category_type = registry.by_id[category_id].type
+            for word in normalize_descriptions(pd.Series(list(words))):
+                if len(word) < MIN_KEYWORD_LENGTH:
+                    raise ValueError(f"Palabra clave demasiado corta para la categoría '{name}': '{word}'.")
+                self.category_ids.setdefault(word, category_id)
+                words_by_type.setdefault(category_type, []).append(word)
+        self.patterns = {
+            category_type: re.compile(rf"\b({_trie_pattern(words)})\b")
+            for category_type, words in words_by_type.items()
+        }
+
+    def match(self, texts: pd.Series, category_type: str) -> pd.Series:
+        """Categoría de cada texto normalizado según las palabras clave del tipo (NaN si no hay)."""
+        pattern = self.patterns.get(category_type)
+        if pattern is None or texts.empty:
+            return pd.Series(np.nan, index=texts.index, dtype=object)
+        return texts.str.extract(pattern, expand=False).map(self.category_ids)
+
+
+# El índice se compila una vez por registro de categorías (cambia solo si cambian
+# las categorías).
+_cached_index: Optional[KeywordIndex] = None
+_cached_for: Optional[CategoryRegistry] = None
+
+
+def get_keyword_index(registry: CategoryRegistry) -> KeywordIndex:
+    global _cached_index, _cached_for
+    if _cached_for is not registry:
+        _cached_index = KeywordIndex(registry)
+        _cached_for = registry
+    return _cached_index
+
+
+def _keys(types: pd.Series, texts: pd.Series) -> pd.Series:
+    return types.astype(str) + _KEY_SEPARATOR + texts
+
+
+class TransactionCategorizer:
+    """
+    Clasifica descripciones de transacciones en categorías, en lote:
+
+    1. Si el usuario ya cargó transacciones con la misma descripción normalizada (y el
+       mismo tipo), se usa la categoría que más les asignó.
+    2. Si no, se buscan las palabras clave del índice.
+
+    Las descripciones repetidas (muy comunes en los extractos) se clasifican una sola vez.
+    """
+
+    def __init__(self, index: KeywordIndex, learned: Optional[Mapping[str, uuid.UUID]] = None):
+        self.index = index
+        self.learned = learned or {}
+
+    def classify(self, descriptions: pd.Series, types: pd.Series) -> pd.Series:
+        """
+        Devuelve el ID de categoría de cada descripción, con el mismo índice que
+        `descriptions` (NaN para las que no se pudieron clasificar).
+
+        Args:
+            descriptions: Descripciones tal como vienen en el extracto.
+            types: Tipo de cada transacción ('income' o 'expense').
+        """
+        codes, uniques = pd.factorize(descriptions.fillna("").astype(str))
+        texts = normalize_descriptions(pd.Series(uniques, dtype=object))
+        types = types.to_numpy(dtype=object)
+        result = np.full(len(codes), np.nan, dtype=object)
+        for category_type in pd.unique(types):
+            rows = types == category_type
+            present = np.unique(codes[rows])
+            candidates = texts.iloc[present]
+            found = _keys(pd.Series(category_type, index=candidates.index), candidates).map(self.learned).astype(object)
+            pending = found.isna()
+            if pending.any():
+                found[pending] = self.index.match(candidates[pending], category_type)
+            by_code = np.full(len(texts), np.nan, dtype=object)
+            by_code[present] = found.to_numpy()
+            result[rows] = by_code[codes[rows]]
+        return pd.Series(result, index=descriptions.index)
+
+
+async def load_learned_categories(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    exclude_category_ids: Iterable[uuid.UUID] = (),
+) -> Dict[str, uuid.UUID]:
+    """
+    Aprende de las transacciones del usuario qué categoría usa para cada descripción
+    (normalizada) y tipo: la más frecuente. Con `exclude_category_ids` se ignoran
+    categorías que no indican una elección del usuario (como la de respaldo que se
+    asigna cuando no se pudo clasificar).
+    """
+    count = func.count().label("count")
+    stmt = (
+        select(Transaction.type, Transaction.description, Transaction.category_id, count)
+        .where(Transaction.user_id == user_id)
+        .group_by(Transaction.type, Transaction.description, Transaction.category_id)
+        .order_by(count.desc())
+        .limit(MAX_LEARNED_DESCRIPTIONS)
+    )
+    excluded = list(exclude_category_ids)
+    if excluded:
+        stmt = stmt.where(Transaction.category_id.notin_(excluded))
+    df = pd.DataFrame((await db.execute(stmt)).all(), columns=["type", "description", "category_id", "count"])
+    if df.empty:
+        return {}
+    df["key"] = _keys(df["type"], normalize_descriptions(df["description"]))
+    df = df[df["key"].str.len() > len("expense") + 1]
+    # Se suman las variantes que se normalizan igual y se queda la categoría más usada.
+    totals = df.groupby(["key", "category_id"], sort=False)["count"].sum().reset_index()
+    best = totals.sort_values("count", ascending=False, kind="stable").drop_duplicates("key")
+    return dict(zip(best["key"], best["category_id"]))
+
+
+async def load_categorizer(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    exclude_category_ids: Iterable[uuid.UUID] = (),
+) -> TransactionCategorizer:
+    """Clasificador con el índice de palabras clave y lo aprendido de las transacciones del usuario."""
+    index = get_keyword_index(await get_category_registry(db))
+    return TransactionCategorizer(index, await load_learned_categories(db, user_id, exclude_category_ids))
@@ -0,0 +1,85 @@
+import time
+import uuid
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import CATEGORY_REGISTRY_TTL_SECONDS
+from src.core.etag import weak_etag
+from src.db.models import TransactionCategory
+
+
+class Category(NamedTuple):
+    id: uuid.UUID
+    name: str
+    type: str
+    color: Optional[str]
+    is_default: bool
+
+
+class CategoryRegistry:
+    """
+    Instantánea inmutable de todas las categorías de transacción (son pocas y
+    globales), para resolverlas sin consultar la base de datos.
+
+    `by_id` mapea ID -> categoría e `ids_by_name`, nombre -> ID (si hay nombres
+    repetidos, gana la primera categoría en orden de nombre e ID).
+    """
+
+    def __init__(self, categories: Iterable[Category]):
+        self.categories = tuple(sorted(categories, key=lambda c: (c.name, str(c.id))))
+        self.by_id: Mapping[uuid.UUID, Category] = MappingProxyType({c.id: c for c in self.categories})
+        ids_by_name: Dict[str, uuid.UUID] = {}
+        for category in self.categories:
+            ids_by_name.setdefault(category.name, category.id)
+        self.ids_by_name: Mapping[str, uuid.UUID] = MappingProxyType(ids_by_name)
+        # ETag del listado de categorías: cambia solo si cambia alguna categoría.
+        self.etag = weak_etag("categories", *self.categories)
+
+    def name(self, category_id: uuid.UUID) -> Optional[str]:
+        category = self.by_id.get(category_id)
+        return category.name if category is not None else None
+
+    def category_dict(self, category_id: uuid.UUID) -> Dict[str, Any]:
+        return self.by_id[category_id]._asdict()
+
+    def as_dicts(self, category_ids: Optional[Iterable[uuid.UUID]] = None) -> List[Dict[str, Any]]:
+        """Categorías como diccionarios, ordenadas por nombre (todas, o solo las de `category_ids`)."""
+        if category_ids is None:
+            return [c._asdict() for c in self.categories]
+        ids = set(category_ids)
+        return [c._asdict() for c in self.categories if c.id in ids]
+
+
+# --- Caché en memoria del registro ---
+# Se carga una sola vez por proceso y se recarga al crear una categoría. El TTL hace
+# que los demás procesos (otros workers de la API, el worker de análisis) también
+# terminen viendo las categorías nuevas.
+_cached_registry: Optional[CategoryRegistry] = None
+_cached_at: float = 0.0
+
+
+def invalidate_category_registry() -> None:
+    """Descarta el registro en memoria; se recargará en el próximo uso."""
+    global _cached_registry
+    _cached_registry = None
+
+
+async def get_category_registry(db: AsyncSession, required_ids: Iterable[uuid.UUID] = ()) -> CategoryRegistry:
+    """
+    Devuelve el registro de categorías, cargándolo desde la base si no está en caché,
+    si venció o si le falta alguna de `required_ids` (una categoría creada en otro
+    proceso, que de otro modo no se vería hasta que venza el TTL).
+    """
+    global _cached_registry, _cached_at
+    if (
+        _cached_registry is None
+        or time.monotonic() - _cached_at > CATEGORY_REGISTRY_TTL_SECONDS
+        or any(category_id not in _cached_registry.by_id for category_id in required_ids)
+    ):
+        result = await db.execute(select(*[getattr(TransactionCategory, f) for f in Category._fields]))
+        _cached_registry = CategoryRegistry(Category(*row) for row in result.all())
+        _cached_at = time.monotonic()
+    return _cached_registry
@@ -0,0 +1,25 @@
+import uuid
+from typing import Iterable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import User
+
+
+async def bump_data_version(db: AsyncSession, user_ids: Optional[Iterable[uuid.UUID]] = None) -> None:
+    """
+    Incrementa la versión de datos (`users.data_version`) de los usuarios indicados,
+    o de todos si `user_ids` es `None`. Debe llamarse en cada escritura de
+    transacciones o insights, dentro de la misma transacción de base de datos, para
+    que las ETag de los listados cambien exactamente cuando cambian sus datos.
+    Los endpoints leen la versión de la fila del usuario autenticado, así que no hay
+    una caché que invalidar. No hace commit.
+    """
+    stmt = update(User).values(data_version=User.data_version + 1)
+    if user_ids is not None:
+        ids = set(user_ids)
+        if not ids:
+            return
+        stmt = stmt.where(User.id.in_(ids))
+    await db.execute(stmt)
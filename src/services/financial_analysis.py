@@ -1,29 +1,181 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Iterable, Sequence, Tuple
 from decimal import Decimal
 from collections import defaultdict
-from src.db.models import Transaction
+from datetime import date, datetime, timedelta
+import uuid
 
-def calculate_financial_metrics(transactions: List[Transaction]) -> Dict[str, Any]:
+import numpy as np
+from sqlalchemy import select, func, case, cast, extract, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Transaction, MonthlyRollup
+from src.services.category_registry import get_category_registry
+from src.services.inflation import InflationAdjustment, month_number
+from src.services.fx import BASE_CURRENCY, CurrencyConversion, build_currency_conversion
+
+CENT = Decimal("0.01")
+
+
+def empty_metrics() -> Dict[str, Any]:
+    """Métricas que se devuelven cuando el usuario no tiene transacciones."""
+    return {
+        "total_ingresos": 0,
+        "total_egresos": 0,
+        "beneficio_neto": 0,
+        "margen_beneficio_neto": 0,
+        "desglose_egresos": {},
+        "periodo_analizado": "N/A"
+    }
+
+
+def build_metrics(
+    total_ingresos: Decimal,
+    total_egresos: Decimal,
+    desglose_egresos: Dict[str, Decimal],
+    fecha_min: datetime,
+    fecha_max: datetime,
+    adjustment: Optional[InflationAdjustment] = None,
+    currency: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Arma el diccionario final de métricas a partir de los totales ya agregados.
+
+    Es compartido por todas las implementaciones del cálculo, de modo que el
+    formato de salida sea idéntico sin importar de dónde provengan los totales.
+    Si los montos fueron convertidos a una moneda se agrega la clave `moneda`, y si
+    fueron ajustados por inflación, la clave `pesos_constantes_de` con el mes base.
+    """
+    fecha_inicio = fecha_min.strftime('%Y-%m-%d')
+    fecha_fin = fecha_max.strftime('%Y-%m-%d')
+
+    # Calcular beneficio y margen
+    beneficio_neto = total_ingresos - total_egresos
+    margen_beneficio_neto = (beneficio_neto / total_ingresos) * 100 if total_ingresos > 0 else Decimal(0)
+
+    # Ordenar desglose de egresos por monto, de mayor a menor
+    desglose_egresos_ordenado = dict(sorted(desglose_egresos.items(), key=lambda item: item[1], reverse=True))
+
+    # Formatear el diccionario final, convirtiendo Decimal a float para serialización JSON
+    metrics = {
+        "total_ingresos": float(total_ingresos),
+        "total_egresos": float(total_egresos),
+        "beneficio_neto": float(beneficio_neto),
+        "margen_beneficio_neto": float(round(margen_beneficio_neto, 2)),
+        "desglose_egresos": {k: float(v) for k, v in desglose_egresos_ordenado.items()},
+        "periodo_analizado": f"{fecha_inicio} al {fecha_fin}",
+    }
+    if currency is not None:
+        metrics["moneda"] = currency
+    if adjustment is not None:
+        metrics["pesos_constantes_de"] = adjustment.label
+    return metrics
+
+
+def _apply_factor(amount: Decimal, factor: float) -> Decimal:
+    """Aplica un factor de conversión o ajuste a un monto, redondeando al centavo."""
+    return (amount * Decimal(float(factor))).quantize(CENT)
+
+
+def _monthly_factors(
+    currencies: List[str],
+    month_numbers: List[int],
+    adjustment: Optional[InflationAdjustment] = None,
+    conversion: Optional[CurrencyConversion] = None,
+) -> Optional[np.ndarray]:
+    """
+    Factores combinados (conversión de moneda y ajuste por inflación) para una lista
+    de grupos (moneda, mes). Devuelve `None` si no hay nada que aplicar.
+    """
+    factors = None
+    if conversion is not None:
+        factors = conversion.factors(currencies, month_numbers)
+    if adjustment is not None:
+        inflation = adjustment.factors(np.array(month_numbers, dtype=np.int64))
+        factors = inflation if factors is None else factors * inflation
+    return factors
+
+
+async def _build_conversion(
+    db: AsyncSession,
+    currency: Optional[str],
+    currencies: List[str],
+    month_numbers: List[int],
+) -> Optional[CurrencyConversion]:
+    """Prepara la conversión a `currency` para los grupos indicados (o `None` si no se pidió)."""
+    if currency is None:
+        return None
+    return await build_currency_conversion(db, currency, zip(currencies, month_numbers))
+
+
+def _metrics_from_monthly_totals(
+    rows: Iterable[Tuple[str, str, int, int, str, Decimal]],
+    fecha_min: datetime,
+    fecha_max: datetime,
+    adjustment: Optional[InflationAdjustment] = None,
+    conversion: Optional[CurrencyConversion] = None,
+) -> Dict[str, Any]:
+    """
+    Reduce totales mensuales `(tipo, nombre_categoria, año, mes, moneda, total)` a las
+    métricas finales. La conversión de moneda y el ajuste por inflación se aplican por
+    grupo (moneda, mes), no por transacción: los factores se calculan en bloque.
+    """
+    rows = list(rows)
+    totals = [row[5] for row in rows]
+    if rows:
+        factors = _monthly_factors(
+            [row[4] for row in rows],
+            [month_number(row[2], row[3]) for row in rows],
+            adjustment,
+            conversion,
+        )
+        if factors is not None:
+            totals = [_apply_factor(total, factor) for total, factor in zip(totals, factors)]
+
+    total_ingresos = Decimal(0)
+    total_egresos = Decimal(0)
+    desglose_egresos = defaultdict(Decimal)
+    for (tipo, nombre, _, _, _, _), total in zip(rows, totals):
+        if tipo == 'income':
+            total_ingresos += total
+        elif tipo == 'expense':
+            total_egresos += total
+            if nombre is not None:
+                desglose_egresos[nombre] += total
+
+    return build_metrics(
+        total_ingresos, total_egresos, desglose_egresos, fecha_min, fecha_max,
+        adjustment, conversion.target if conversion is not None else None,
+    )
+
+
+def calculate_financial_metrics(
+    transactions: List[Transaction],
+    adjustment: Optional[InflationAdjustment] = None,
+    conversion: Optional[CurrencyConversion] = None,
+) -> Dict[str, Any]:
     """
     Calcula un conjunto de métricas financieras clave a partir de una lista de objetos
     de transacción de SQLAlchemy.
 
+    Es la implementación de referencia: recorre las transacciones en Python.
+    Para usuarios con muchas transacciones conviene usar
+    `calculate_financial_metrics_from_db`, que delega la agregación a la base de datos.
+
     Args:
         transactions: Una lista de objetos `Transaction` de la base de datos.
                       Se espera que la relación `category` haya sido cargada (eager loaded).
+        adjustment: Si se indica, los montos se expresan en pesos constantes del
+                    mes base del ajuste (ver `src/services/inflation.py`). Aquí cada
+                    monto se ajusta y redondea por separado, mientras que las versiones
+                    agregadas ajustan totales mensuales: pueden diferir en centavos.
+        conversion: Si se indica, los montos se convierten a la moneda de destino
+                    con la cotización de cierre del mes de cada transacción.
 
     Returns:
         Un diccionario con las métricas calculadas.
     """
     if not transactions:
-        return {
-            "total_ingresos": 0,
-            "total_egresos": 0,
-            "beneficio_neto": 0,
-            "margen_beneficio_neto": 0,
-            "desglose_egresos": {},
-            "periodo_analizado": "N/A"
-        }
+        return empty_metrics()
 
     total_ingresos = Decimal(0)
     total_egresos = Decimal(0)
@@ -31,33 +183,237 @@ def calculate_financial_metrics(transactions: List[Transaction]) -> Dict[str, An
 
     # Determinar el período de análisis
     fechas = [t.date for t in transactions]
-    fecha_inicio = min(fechas).strftime('%Y-%m-%d')
-    fecha_fin = max(fechas).strftime('%Y-%m-%d')
 
     for t in transactions:
+        amount = t.amount
+        if conversion is not None:
+            amount = _apply_factor(amount, conversion.factor(t.currency or BASE_CURRENCY, month_number(t.date.year, t.date.month)))
+        if adjustment is not None:
+            amount = _apply_factor(amount, adjustment.factor(t.date.year, t.date.month))
         if t.type == 'income':
-            total_ingresos += t.amount
+            total_ingresos += amount
         elif t.type == 'expense':
-            total_egresos += t.amount
+            total_egresos += amount
             # Asegurarse de que la categoría no sea None
             if t.category:
-                desglose_egresos[t.category.name] += t.amount
+                desglose_egresos[t.category.name] += amount
 
-    # Calcular beneficio y margen
-    beneficio_neto = total_ingresos - total_egresos
-    margen_beneficio_neto = (beneficio_neto / total_ingresos) * 100 if total_ingresos > 0 else Decimal(0)
+    return build_metrics(
+        total_ingresos, total_egresos, desglose_egresos, min(fechas), max(fechas),
+        adjustment, conversion.target if conversion is not None else None,
+    )
 
-    # Ordenar desglose de egresos por monto, de mayor a menor
-    desglose_egresos_ordenado = dict(sorted(desglose_egresos.items(), key=lambda item: item[1], reverse=True))
 
-    # Formatear el diccionario final, convirtiendo Decimal a float para serialización JSON
-    metrics = {
-        "total_ingresos": float(total_ingresos),
-        "total_egresos": float(total_egresos),
-        "beneficio_neto": float(beneficio_neto),
-        "margen_beneficio_neto": float(round(margen_beneficio_neto, 2)),
-        "desglose_egresos": {k: float(v) for k, v in desglose_egresos_ordenado.items()},
-        "periodo_analizado": f"{fecha_inicio} al {fecha_fin}",
-    }
+def _date_range_conditions(date_from: Optional[date] = None, date_to: Optional[date] = None) -> list:
+    """
+    Condiciones de filtrado por fecha para `Transaction.date`.
+    Ambos extremos son inclusivos y se interpretan como días completos.
+    """
+    conditions = []
+    if date_from:
+        conditions.append(Transaction.date >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        conditions.append(Transaction.date < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    return conditions
 
-    return metrics
+
+async def calculate_financial_metrics_from_db(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    adjustment: Optional[InflationAdjustment] = None,
+    currency: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Calcula las mismas métricas que `calculate_financial_metrics`, pero resolviendo
+    las sumas y el período con consultas agregadas (GROUP BY) en la base de datos,
+    sin materializar los objetos `Transaction` del usuario.
+
+    Args:
+        db: La sesión asíncrona de base de datos.
+        user_id: El ID del usuario a analizar.
+        date_from: Fecha inicial (inclusive) del rango a analizar. Opcional.
+        date_to: Fecha final (inclusive) del rango a analizar. Opcional.
+        adjustment: Ajuste opcional a pesos constantes de un mes base.
+        currency: Moneda a la que se convierten los montos. Si no se indica, se suman
+                  los montos tal como están, sin importar su moneda.
+
+    Returns:
+        Un diccionario con las métricas calculadas, con el mismo formato que
+        `calculate_financial_metrics`.
+    """
+    conditions = [Transaction.user_id == user_id, *_date_range_conditions(date_from, date_to)]
+
+    # 1. Período analizado (también indica si el usuario tiene transacciones)
+    periodo = await db.execute(
+        select(func.min(Transaction.date), func.max(Transaction.date))
+        .where(*conditions)
+    )
+    fecha_min, fecha_max = periodo.one()
+    if fecha_min is None:
+        return empty_metrics()
+
+    # 2. Totales por tipo, categoría, mes y moneda: alcanzan para obtener los totales,
+    #    el desglose de egresos y, si corresponde, convertir y ajustar cada grupo.
+    #    Se agrupa por ID de categoría y el nombre se resuelve con el registro en memoria.
+    year = cast(extract("year", Transaction.date), Integer)
+    month = cast(extract("month", Transaction.date), Integer)
+    moneda = func.coalesce(Transaction.currency, BASE_CURRENCY)
+    totales = await db.execute(
+        select(
+            Transaction.type, Transaction.category_id, year, month,
+            moneda, func.sum(Transaction.amount),
+        )
+        .where(*conditions)
+        .group_by(Transaction.type, Transaction.category_id, year, month, moneda)
+    )
+    rows = totales.all()
+    registry = await get_category_registry(db, {row[1] for row in rows})
+    rows = [(tipo, registry.name(category_id), *rest) for tipo, category_id, *rest in rows]
+
+    conversion = await _build_conversion(
+        db, currency, [row[4] for row in rows], [month_number(row[2], row[3]) for row in rows]
+    )
+    return _metrics_from_monthly_totals(rows, fecha_min, fecha_max, adjustment, conversion)
+
+
+async def calculate_time_series(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    granularity: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    adjustment: Optional[InflationAdjustment] = None,
+    currency: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Calcula la serie temporal de ingresos, egresos y resultado neto agrupada por
+    período (`day`, `week`, `month` o `quarter`) con una única consulta agrupada.
+
+    Los períodos se separan además por mes calendario (una semana puede abarcar dos
+    meses) y por moneda para poder aplicar la conversión a `currency` y el ajuste por
+    inflación de cada mes.
+
+    Returns:
+        Una lista ordenada cronológicamente con un elemento por período que tenga
+        movimientos: `{"periodo": "YYYY-MM-DD", "ingresos", "egresos", "neto"}`,
+        donde `periodo` es la fecha de inicio del período.
+    """
+    bucket = func.date_trunc(granularity, Transaction.date).label("bucket")
+    year = cast(extract("year", Transaction.date), Integer)
+    month = cast(extract("month", Transaction.date), Integer)
+    moneda = func.coalesce(Transaction.currency, BASE_CURRENCY)
+    ingresos = func.sum(case((Transaction.type == 'income', Transaction.amount), else_=0))
+    egresos = func.sum(case((Transaction.type == 'expense', Transaction.amount), else_=0))
+
+    result = await db.execute(
+        select(bucket, year, month, moneda, ingresos, egresos)
+        .where(Transaction.user_id == user_id, *_date_range_conditions(date_from, date_to))
+        .group_by(bucket, year, month, moneda)
+        .order_by(bucket)
+    )
+    rows = result.all()
+    if rows:
+        currencies = [row[3] for row in rows]
+        month_numbers = [month_number(row[1], row[2]) for row in rows]
+        conversion = await _build_conversion(db, currency, currencies, month_numbers)
+        factors = _monthly_factors(currencies, month_numbers, adjustment, conversion)
+        if factors is not None:
+            rows = [
+                (inicio, y, m, code, _apply_factor(total_ingresos, f), _apply_factor(total_egresos, f))
+                for (inicio, y, m, code, total_ingresos, total_egresos), f in zip(rows, factors)
+            ]
+
+    series: Dict[datetime, List[Decimal]] = {}
+    for inicio, _, _, _, total_ingresos, total_egresos in rows:
+        totales = series.setdefault(inicio, [Decimal(0), Decimal(0)])
+        totales[0] += total_ingresos
+        totales[1] += total_egresos
+
+    return [
+        {
+            "periodo": inicio.strftime('%Y-%m-%d'),
+            "ingresos": float(total_ingresos),
+            "egresos": float(total_egresos),
+            "neto": float(total_ingresos - total_egresos),
+        }
+        for inicio, (total_ingresos, total_egresos) in series.items()
+    ]
+
+
+async def calculate_financial_metrics_from_rollups(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    adjustment: Optional[InflationAdjustment] = None,
+    currency: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Calcula las mismas métricas que `calculate_financial_metrics` leyendo la tabla
+    de rollups mensuales (`monthly_rollups`) en lugar de las transacciones.
+
+    El costo depende de la cantidad de meses y categorías del usuario, no de la
+    cantidad de transacciones. Requiere que los rollups estén al día
+    (ver `src/services/rollups.py`).
+
+    Args:
+        db: La sesión asíncrona de base de datos.
+        user_id: El ID del usuario a analizar.
+        adjustment: Ajuste opcional a pesos constantes de un mes base.
+        currency: Moneda a la que se convierten los montos. Si no se indica, se suman
+                  los montos tal como están, sin importar su moneda.
+
+    Returns:
+        Un diccionario con las métricas calculadas, con el mismo formato que
+        `calculate_financial_metrics`.
+    """
+    result = await db.execute(
+        select(
+            MonthlyRollup.type,
+            MonthlyRollup.category_id,
+            MonthlyRollup.year,
+            MonthlyRollup.month,
+            MonthlyRollup.currency,
+            MonthlyRollup.total_amount,
+            MonthlyRollup.first_date,
+            MonthlyRollup.last_date,
+        )
+        .where(MonthlyRollup.user_id == user_id)
+    )
+    rows = result.all()
+    if not rows:
+        return empty_metrics()
+    registry = await get_category_registry(db, {row.category_id for row in rows})
+    conversion = await _build_conversion(
+        db, currency, [row.currency for row in rows], [month_number(row.year, row.month) for row in rows]
+    )
+    return metrics_from_rollup_rows(rows, registry.name, adjustment, conversion)
+
+
+def metrics_from_rollup_rows(
+    rows: Sequence[Any],
+    category_name: Callable[[Optional[uuid.UUID]], Optional[str]],
+    adjustment: Optional[InflationAdjustment] = None,
+    conversion: Optional[CurrencyConversion] = None,
+) -> Dict[str, Any]:
+    """
+    Reduce filas de rollups mensuales (objetos con los atributos `type`, `category_id`,
+    `year`, `month`, `currency`, `total_amount`, `first_date` y `last_date` de
+    `MonthlyRollup`) a las métricas finales, sin acceder a la base de datos.
+
+    Args:
+        rows: Las filas de rollups del usuario.
+        category_name: Devuelve el nombre de una categoría a partir de su ID.
+        adjustment: Ajuste opcional a pesos constantes de un mes base.
+        conversion: Conversión opcional a una moneda de destino, con las cotizaciones
+                    de todos los grupos (moneda, mes) de `rows`.
+    """
+    if not rows:
+        return empty_metrics()
+    fecha_min = min(row.first_date for row in rows)
+    fecha_max = max(row.last_date for row in rows)
+    totals = (
+        (row.type, category_name(row.category_id), row.year, row.month, row.currency, row.total_amount)
+        for row in rows
+    )
+    return _metrics_from_monthly_totals(totals, fecha_min, fecha_max, adjustment, conversion)
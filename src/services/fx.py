@@ -0,0 +1,184 @@
+import bisect
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import LRUCache
+from src.core.config import FX_RATE_CACHE_SIZE, FX_RATE_CACHE_TTL_SECONDS
+from src.db.models import FxRate
+
+# Las cotizaciones se guardan como pesos argentinos por unidad de cada moneda.
+BASE_CURRENCY = "ARS"
+# Si no hay cotización exacta para una fecha se usa la última disponible dentro de
+# esta cantidad de días (fines de semana, feriados, etc.).
+FX_LOOKBACK_DAYS = 31
+
+# Caché acotada de cotizaciones, indexada por (moneda, fecha). `load_fx_rates` la vacía
+# en su proceso; el TTL hace que los demás (API, workers) también vean las cotizaciones
+# nuevas o corregidas, incluidas las fechas resueltas con una cotización anterior.
+_rate_cache = LRUCache(maxsize=FX_RATE_CACHE_SIZE, ttl=FX_RATE_CACHE_TTL_SECONDS)
+
+
+def month_end(month_number: int) -> date:
+    """Último día del mes indicado como `month_number` (`year * 12 + month - 1`)."""
+    year, month = month_number // 12, month_number % 12 + 1
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def clear_rate_cache() -> None:
+    """Vacía la caché de cotizaciones (por ejemplo, después de cargar nuevas)."""
+    _rate_cache.clear()
+
+
+def rate_cache_stats() -> dict:
+    return _rate_cache.stats()
+
+
+async def get_rates(db: AsyncSession, currency: str, dates: Iterable[date]) -> Dict[date, Decimal]:
+    """
+    Devuelve la cotización de `currency` (ARS por unidad) vigente en cada fecha:
+    la del mismo día o, si no existe, la última anterior dentro de `FX_LOOKBACK_DAYS`.
+
+    Las fechas que no están en caché se resuelven juntas con una única consulta.
+
+    Raises:
+        ValueError: Si alguna fecha no tiene cotización disponible.
+    """
+    if currency == BASE_CURRENCY:
+        return {d: Decimal(1) for d in dates}
+
+    rates: Dict[date, Decimal] = {}
+    missing: List[date] = []
+    for d in set(dates):
+        rate = _rate_cache.get((currency, d))
+        if rate is None:
+            missing.append(d)
+        else:
+            rates[d] = rate
+    if not missing:
+        return rates
+
+    result = await db.execute(
+        select(FxRate.date, FxRate.rate)
+        .where(
+            FxRate.currency == currency,
+            FxRate.date >= min(missing) - timedelta(days=FX_LOOKBACK_DAYS),
+            FxRate.date <= max(missing),
+        )
+        .order_by(FxRate.date)
+    )
+    known = result.all()
+    known_dates = [row[0] for row in known]
+
+    for d in missing:
+        position = bisect.bisect_right(known_dates, d) - 1
+        if position < 0 or (d - known_dates[position]).days > FX_LOOKBACK_DAYS:
+            raise ValueError(f"No hay cotización de {currency} para el {d.isoformat()}.")
+        rates[d] = known[position][1]
+        _rate_cache.set((currency, d), rates[d])
+    return rates
+
+
+class CurrencyConversion:
+    """
+    Convierte montos de distintas monedas a una moneda de destino usando la
+    cotización de cierre de cada mes.
+
+    Las cotizaciones necesarias se obtienen por adelantado (ver
+    `build_currency_conversion`), de modo que convertir es solo una búsqueda en memoria.
+    """
+
+    def __init__(self, target: str, rates: Dict[Tuple[str, int], Decimal]):
+        self.target = target
+        self.rates = rates
+
+    def _rate(self, currency: str, month_number: int) -> Decimal:
+        currency = currency.upper()
+        if currency == BASE_CURRENCY:
+            return Decimal(1)
+        return self.rates[(currency, month_number)]
+
+    def factor(self, currency: str, month_number: int) -> Decimal:
+        """Factor para convertir un monto de `currency` del mes indicado a la moneda de destino."""
+        if currency.upper() == self.target:
+            return Decimal(1)
+        return self._rate(currency, month_number) / self._rate(self.target, month_number)
+
+    def factors(self, currencies: Sequence[str], month_numbers: Sequence[int]) -> np.ndarray:
+        """
+        Versión en bloque de `factor`: calcula el factor de cada grupo
+        (moneda, mes) distinto una sola vez y lo reparte entre las filas.
+        """
+        keys = list(zip(currencies, month_numbers))
+        by_key = {key: float(self.factor(*key)) for key in set(keys)}
+        return np.array([by_key[key] for key in keys], dtype=float)
+
+
+async def build_currency_conversion(
+    db: AsyncSession,
+    target: str,
+    keys: Iterable[Tuple[str, int]],
+) -> CurrencyConversion:
+    """
+    Prepara la conversión a `target` para los pares (moneda, `month_number`) indicados,
+    obteniendo las cotizaciones de cierre de mes de cada moneda en bloque. Las monedas
+    se comparan sin distinguir mayúsculas (las cotizaciones se guardan en mayúsculas).
+
+    Raises:
+        ValueError: Si falta alguna cotización.
+    """
+    target = (target or BASE_CURRENCY).upper()
+    keys = {(currency.upper(), number) for currency, number in keys}
+    months_by_currency: Dict[str, Set[int]] = {}
+    for currency, number in keys:
+        if currency != target:
+            months_by_currency.setdefault(currency, set()).add(number)
+            # También hace falta la cotización de la moneda de destino en esos meses.
+            months_by_currency.setdefault(target, set()).add(number)
+    months_by_currency.pop(BASE_CURRENCY, None)
+
+    rates: Dict[Tuple[str, int], Decimal] = {}
+    for currency, numbers in months_by_currency.items():
+        by_date = await get_rates(db, currency, [month_end(n) for n in numbers])
+        for number in numbers:
+            rates[(currency, number)] = by_date[month_end(number)]
+    return CurrencyConversion(target, rates)
+
+
+async def load_fx_rates(db: AsyncSession, rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Carga (o actualiza) cotizaciones y vacía la caché en memoria.
+
+    Args:
+        rows: Diccionarios con `currency`, `date`, `rate` y opcionalmente `source`.
+
+    Returns:
+        La cantidad de cotizaciones cargadas.
+    """
+    values = [
+        {
+            "currency": str(r["currency"]).upper(),
+            "date": r["date"],
+            "rate": Decimal(str(r["rate"])),
+            "source": r.get("source") or "BCRA",
+        }
+        for r in rows
+    ]
+    if not values:
+        return 0
+
+    stmt = pg_insert(FxRate).values(values)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_fx_rates_currency_date",
+        set_={"rate": stmt.excluded.rate, "source": stmt.excluded.source},
+    )
+    await db.execute(stmt)
+    await db.commit()
+    clear_rate_cache()
+    return len(values)
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import uuid
+from datetime import timedelta
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from src.core.cache import LRUCache
+from src.core.config import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_KEY_TTL_SECONDS
+from src.db.models import IdempotencyKey
+
+# Respuestas ya guardadas, indexadas por (usuario, operación, clave), con su hash de
+# solicitud. Evita ir a la base en los reintentos inmediatos, que son los más comunes.
+_response_cache = LRUCache(maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_KEY_TTL_SECONDS)
+
+StoredResponse = Tuple[int, Any]
+
+
+class IdempotencyConflictError(Exception):
+    """La clave ya se usó con una solicitud distinta."""
+
+
+class IdempotencyInProgressError(Exception):
+    """La solicitud original con esa clave todavía se está procesando."""
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Hash canónico del contenido de una solicitud (no depende del orden de las claves)."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _stored_response(entry: Tuple[str, Optional[int], Any], fingerprint: str) -> StoredResponse:
+    stored_hash, status_code, response = entry
+    if stored_hash != fingerprint:
+        raise IdempotencyConflictError(
+            "La clave de idempotencia ya se usó con una solicitud distinta."
+        )
+    if status_code is None:
+        raise IdempotencyInProgressError(
+            "La solicitud original con esta clave de idempotencia todavía se está procesando."
+        )
+    return status_code, response
+
+
+async def claim_idempotency_key(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    scope: str,
+    key: str,
+    fingerprint: str,
+    ttl_seconds: int = IDEMPOTENCY_KEY_TTL_SECONDS,
+) -> Optional[StoredResponse]:
+    """
+    Reserva una clave de idempotencia para procesar la solicitud, o devuelve la
+    respuesta guardada si la clave ya se usó.
+
+    La reserva es un `INSERT ... ON CONFLICT`: si otra solicitud con la misma clave
+    está en curso, la base espera a que termine su transacción, así que dos reintentos
+    simultáneos no procesan la solicitud dos veces. Una clave vencida se reutiliza.
+    No hace commit: la reserva se confirma junto con el resultado de la solicitud.
+
+    Returns:
+        `None` si la clave quedó reservada (hay que procesar la solicitud y luego
+        llamar a `save_idempotent_response`), o la tupla `(status_code, respuesta)`
+        guardada.
+
+    Raises:
+        IdempotencyConflictError: Si la clave se usó con otro contenido.
+        IdempotencyInProgressError: Si la solicitud original todavía no terminó.
+    """
+    cache_key = (user_id, scope, key)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        return _stored_response(cached, fingerprint)
+
+    expires_at = func.now() + timedelta(seconds=ttl_seconds)
+    stmt = pg_insert(IdempotencyKey).values(
+        user_id=user_id, scope=scope, key=key, request_hash=fingerprint, expires_at=expires_at
+    )
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "scope", "key"],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "status_code": None,
+                "response": None,
+                "created_at": func.now(),
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at < func.now(),
+        ).returning(IdempotencyKey.key)
+    )
+    if result.scalar_one_or_none() is not None:
+        return None
+
+    result = await db.execute(
+        select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+        )
+    )
+    entry = tuple(result.one())
+    stored = _stored_response(entry, fingerprint)
+    _response_cache.set(cache_key, entry)
+    return stored
+
+
+async def save_idempotent_response(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    scope: str,
+    key: str,
+    status_code: int,
+    response: Any,
+) -> None:
+    """
+    Guarda la respuesta de una solicitud cuya clave se reservó con
+    `claim_idempotency_key`. La respuesta debe ser serializable como JSON. No hace
+    commit: debe confirmarse en la misma transacción que el resultado de la solicitud
+    y, después del commit, conviene llamar a `remember_idempotent_response`.
+    """
+    await db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+        )
+        .values(status_code=status_code, response=response)
+    )
+
+
+def remember_idempotent_response(
+    user_id: uuid.UUID,
+    scope: str,
+    key: str,
+    fingerprint: str,
+    status_code: int,
+    response: Any,
+) -> None:
+    """Guarda en memoria una respuesta ya confirmada, para contestar los reintentos sin ir a la base."""
+    _response_cache.set((user_id, scope, key), (fingerprint, status_code, response))
+
+
+async def release_idempotency_key(db: AsyncSession, user_id: uuid.UUID, scope: str, key: str) -> None:
+    """
+    Libera una clave reservada cuya solicitud falló, para que el cliente pueda
+    reintentarla. Se usa cuando la reserva ya se confirmó antes de que falle la
+    solicitud (si no, alcanza con el rollback). Hace commit.
+    """
+    _response_cache.pop((user_id, scope, key))
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+        )
+    )
+    await db.commit()
+
+
+async def purge_expired_idempotency_keys(db: AsyncSession) -> int:
+    """Elimina las claves vencidas y devuelve cuántas se eliminaron. Hace commit."""
+    result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < func.now()))
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,163 @@
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import INFLATION_INDEX_TTL_SECONDS
+from src.db.models import InflationData
+
+
+def month_number(year: int, month: int) -> int:
+    """Número absoluto de mes (`year * 12 + month - 1`), usado para indexar el índice."""
+    return year * 12 + month - 1
+
+
+def month_numbers_from_dates(dates: np.ndarray) -> np.ndarray:
+    """Versión vectorizada de `month_number` para un arreglo de fechas `datetime64`."""
+    # datetime64[M] cuenta los meses desde 1970-01.
+    return np.asarray(dates).astype("datetime64[M]").astype(np.int64) + month_number(1970, 1)
+
+
+class InflationIndex:
+    """
+    Índice de precios acumulado construido a partir de las tasas mensuales de
+    `inflation_data`.
+
+    `levels[k]` es el nivel de precios al cierre del mes `first_month + k`, tomando
+    como 1 el nivel al inicio del primer mes cargado. Los meses sin dato (y todos los
+    posteriores a un hueco) quedan en NaN.
+    """
+
+    def __init__(self, first_month: int, levels: np.ndarray):
+        self.first_month = first_month
+        self.levels = levels
+
+    @classmethod
+    def from_rates(cls, rates: Dict[int, Decimal]) -> "InflationIndex":
+        """Construye el índice a partir de un mapa `month_number -> tasa mensual en %`."""
+        if not rates:
+            return cls(0, np.empty(0))
+        first, last = min(rates), max(rates)
+        monthly = np.full(last - first + 1, np.nan)
+        for number, rate in rates.items():
+            monthly[number - first] = float(rate)
+        return cls(first, np.cumprod(1 + monthly / 100))
+
+    def levels_for(self, month_numbers: np.ndarray) -> np.ndarray:
+        """Niveles de precios para un arreglo de números de mes (NaN fuera de rango)."""
+        positions = np.asarray(month_numbers, dtype=np.int64) - self.first_month
+        valid = (positions >= 0) & (positions < len(self.levels))
+        result = np.full(positions.shape, np.nan)
+        result[valid] = self.levels[positions[valid]]
+        return result
+
+
+class InflationAdjustment:
+    """Convierte montos nominales a pesos constantes de un mes base."""
+
+    def __init__(self, index: InflationIndex, base_year: int, base_month: int):
+        self.index = index
+        self.base_year = base_year
+        self.base_month = base_month
+        base_level = index.levels_for(np.array([month_number(base_year, base_month)]))[0]
+        if np.isnan(base_level):
+            raise ValueError(f"No hay datos de inflación para el mes base {self.label}.")
+        self.base_level = base_level
+
+    @property
+    def label(self) -> str:
+        return f"{self.base_year}-{self.base_month:02d}"
+
+    def factors(self, month_numbers: np.ndarray) -> np.ndarray:
+        """
+        Factores por los que hay que multiplicar los montos de cada mes para
+        expresarlos en pesos del mes base.
+
+        Raises:
+            ValueError: Si algún mes no tiene dato de inflación.
+        """
+        month_numbers = np.asarray(month_numbers, dtype=np.int64)
+        factors = self.base_level / self.index.levels_for(month_numbers)
+        missing = np.isnan(factors)
+        if missing.any():
+            first_missing = int(month_numbers[missing].min())
+            raise ValueError(
+                "No hay datos de inflación para el mes "
+                f"{first_missing // 12}-{first_missing % 12 + 1:02d}."
+            )
+        return factors
+
+    def factor(self, year: int, month: int) -> Decimal:
+        """Factor de un único mes, como `Decimal`."""
+        return Decimal(float(self.factors(np.array([month_number(year, month)]))[0]))
+
+
+# --- Caché en memoria del índice ---
+# El índice se construye una sola vez por proceso y se invalida al cargar nuevas
+# tasas. El TTL hace que los demás procesos también terminen viendo los cambios.
+_cached_index: Optional[InflationIndex] = None
+_cached_at: float = 0.0
+
+
+def invalidate_inflation_index() -> None:
+    """Descarta el índice en memoria; se reconstruirá en el próximo uso."""
+    global _cached_index
+    _cached_index = None
+
+
+async def get_inflation_index(db: AsyncSession) -> InflationIndex:
+    """Devuelve el índice acumulado, construyéndolo desde `inflation_data` si no está en caché."""
+    global _cached_index, _cached_at
+    if _cached_index is None or time.monotonic() - _cached_at > INFLATION_INDEX_TTL_SECONDS:
+        result = await db.execute(select(InflationData.year, InflationData.month, InflationData.rate))
+        rates = {month_number(year, month): rate for year, month, rate in result.all()}
+        _cached_index = InflationIndex.from_rates(rates)
+        _cached_at = time.monotonic()
+    return _cached_index
+
+
+async def get_inflation_adjustment(db: AsyncSession, base_month: date) -> InflationAdjustment:
+    """
+    Crea el ajuste a pesos constantes del mes de `base_month`.
+
+    Raises:
+        ValueError: Si no hay datos de inflación para el mes base.
+    """
+    index = await get_inflation_index(db)
+    return InflationAdjustment(index, base_month.year, base_month.month)
+
+
+async def load_inflation_rows(db: AsyncSession, rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Carga (o reemplaza) tasas de inflación mensuales e invalida el índice en memoria.
+
+    Args:
+        rows: Diccionarios con `year`, `month`, `rate` y opcionalmente `source`.
+
+    Returns:
+        La cantidad de meses cargados.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    months = {(int(r["year"]), int(r["month"])) for r in rows}
+    await db.execute(
+        delete(InflationData).where(tuple_(InflationData.year, InflationData.month).in_(list(months)))
+    )
+    db.add_all(
+        InflationData(
+            year=int(r["year"]),
+            month=int(r["month"]),
+            rate=Decimal(str(r["rate"])),
+            **({"source": r["source"]} if r.get("source") else {}),
+        )
+        for r in rows
+    )
+    await db.commit()
+    invalidate_inflation_index()
+    return len(months)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import LRUCache
+from src.core.config import REPORT_CACHE_SIZE
+from src.db.models import AiInsight
+from src.services.report_generator import PROMPT_VERSION, build_report_prompt
+from src.services.report_service import REPORT_MODEL, RateLimiter, ReportGenerationError, get_report_service
+
+# Informes ya generados, indexados por (usuario, hash de sus métricas): un informe
+# describe los datos de un usuario y no se comparte con otros.
+_report_cache = LRUCache(maxsize=REPORT_CACHE_SIZE)
+# Contadores del proceso: aciertos en memoria, aciertos en la base y fallos.
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+
+def report_hash(metrics: Dict[str, Any]) -> str:
+    """
+    Hash canónico de un informe: depende solo del contenido de las métricas (no del
+    orden de las claves), de la versión del prompt y del modelo.
+    """
+    canonical = json.dumps(metrics, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    payload = f"{PROMPT_VERSION}\n{REPORT_MODEL}\n{canonical}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def report_cache_stats() -> Dict[str, Any]:
+    """Aciertos y fallos de la caché de informes desde que arrancó el proceso."""
+    lookups = _stats["memory_hits"] + _stats["db_hits"] + _stats["misses"]
+    hits = _stats["memory_hits"] + _stats["db_hits"]
+    return {
+        **_stats,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        "size": len(_report_cache),
+        "maxsize": _report_cache.maxsize,
+        "prompt_version": PROMPT_VERSION,
+    }
+
+
+async def get_cached_report(db: AsyncSession, user_id: uuid.UUID, key: str) -> Optional[str]:
+    """
+    Busca un informe del usuario por su hash, primero en memoria y luego entre sus
+    insights guardados (`metadata->>'report_hash'`, que tiene un índice propio).
+    """
+    text = _report_cache.get((user_id, key))
+    if text is not None:
+        _stats["memory_hits"] += 1
+        return text
+
+    result = await db.execute(
+        select(AiInsight.description)
+        .where(
+            AiInsight.user_id == user_id,
+            AiInsight.type == "financial_summary",
+            AiInsight.json_metadata["report_hash"].astext == key,
+        )
+        .limit(1)
+    )
+    text = result.scalar_one_or_none()
+    if text is None:
+        _stats["misses"] += 1
+        return None
+
+    _stats["db_hits"] += 1
+    _report_cache.set((user_id, key), text)
+    return text
+
+
+def remember_report(user_id: uuid.UUID, key: str, text: str) -> None:
+    """Guarda en memoria un informe generado por fuera de `get_or_generate_report` (por ejemplo, en streaming)."""
+    _report_cache.set((user_id, key), text)
+
+
+async def get_or_generate_report(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    metrics: Dict[str, Any],
+    rate_limiter: Optional[RateLimiter] = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Devuelve el informe de las métricas del usuario, reutilizando uno anterior suyo si
+    las métricas (y la versión del prompt) son idénticas. Solo se llama al modelo en un fallo, y
+    solo esas llamadas consumen el `rate_limiter`, si se indica.
+
+    Returns:
+        Una tupla `(texto, hash)`. Si la generación falla, el texto describe el error
+        y el hash es `None`, para que el error no quede guardado como informe válido.
+    """
+    key = report_hash(metrics)
+    text = await get_cached_report(db, user_id, key)
+    if text is not None:
+        return text, key
+
+    if rate_limiter is not None:
+        await rate_limiter.acquire()
+    try:
+        text = await get_report_service().generate(build_report_prompt(metrics))
+    except ReportGenerationError as e:
+        return f"Error al generar el informe con IA: {e}", None
+
+    _report_cache.set((user_id, key), text)
+    return text, key
@@ -1,32 +1,34 @@
-import os
+import asyncio
 import json
-import google.generativeai as genai
 from typing import Dict, Any
 
-def generate_report(metrics: Dict[str, Any], api_key: str) -> str:
+from src.services.report_service import get_report_service
+
+# Versión del prompt. Debe incrementarse cada vez que cambie el texto de
+# `build_report_prompt`, para que los informes en caché dejen de reutilizarse.
+PROMPT_VERSION = "2"
+
+
+def build_report_prompt(metrics: Dict[str, Any]) -> str:
     """
-    Genera un informe financiero narrativo utilizando la API de Gemini.
+    Arma el prompt del informe financiero a partir de las métricas calculadas.
 
     Args:
         metrics: Un diccionario con las métricas financieras calculadas.
-        api_key: La clave de API para Google Gemini.
 
     Returns:
-        Una cadena de texto con el informe generado.
+        El texto completo del prompt.
     """
-    if not api_key:
-        raise ValueError("La clave de API de Google no fue proporcionada.")
-
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-1.5-flash')
-
     # Formatear las métricas para que sean fáciles de leer en el prompt
     formatted_metrics = json.dumps(metrics, indent=2, ensure_ascii=False)
+    currency = metrics.get("moneda", "ARS")
+    if currency == "ARS":
+        currency = "Pesos Argentinos (ARS)"
 
     prompt = f"""
     **Misión:** Eres "FinanzasClaras", un asesor financiero experto en pymes de Argentina. Tu objetivo es analizar un conjunto de métricas financieras y generar un informe claro, accionable y pedagógico para un empresario que no tiene conocimientos financieros avanzados. Tu tono debe ser profesional pero cercano, alentador y siempre enfocado en dar los próximos pasos.
 
-    **Contexto:** Has recibido las siguientes métricas financieras para una pyme. Los valores monetarios están en Pesos Argentinos (ARS).
+    **Contexto:** Has recibido las siguientes métricas financieras para una pyme. Los valores monetarios están expresados en {currency}.
 
     **Métricas a Analizar:**
     ```json
@@ -58,24 +60,37 @@ def generate_report(metrics: Dict[str, Any], api_key: str) -> str:
     ---
     """
 
-    try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Error al generar el informe con la API de Gemini: {e}"
+    return prompt
+
+
+async def generate_report(metrics: Dict[str, Any]) -> str:
+    """
+    Genera un informe financiero narrativo con el servicio de informes del proceso
+    (Gemini o el backend local, según `REPORT_BACKEND`), sin bloquear el event loop.
+
+    Args:
+        metrics: Un diccionario con las métricas financieras calculadas.
+
+    Returns:
+        Una cadena de texto con el informe generado.
+
+    Raises:
+        ReportGenerationError: Si no se pudo generar el informe tras los reintentos.
+    """
+    return await get_report_service().generate(build_report_prompt(metrics))
 
 if __name__ == '__main__':
     print("Ejecutando pruebas para report_generator.py...")
 
-    # Para esta prueba, se requiere una clave de API de Google.
-    # El usuario debe establecer la variable de entorno GOOGLE_API_KEY.
-    api_key_from_env = os.getenv("GOOGLE_API_KEY")
+    # Para esta prueba, se requiere una clave de API de Google (GOOGLE_API_KEY)
+    # o usar el backend local con REPORT_BACKEND=stub.
+    from src.services.report_service import is_report_backend_configured
 
-    if not api_key_from_env:
+    if not is_report_backend_configured():
         print("\nADVERTENCIA: La variable de entorno GOOGLE_API_KEY no está configurada.")
         print("La prueba de integración con la API de Gemini será omitida.")
     else:
-        print("\nClave de API encontrada. Procediendo con la prueba de integración...")
+        print("\nBackend de informes configurado. Procediendo con la prueba de integración...")
         # Usar un conjunto de métricas de ejemplo
         sample_metrics = {
             "total_ingresos": 305000.0,
@@ -93,7 +108,7 @@ if __name__ == '__main__':
             "periodo_analizado": "2024-01-05 al 2024-03-29"
         }
 
-        reporte_generado = generate_report(sample_metrics, api_key_from_env)
+        reporte_generado = asyncio.run(generate_report(sample_metrics))
 
         print("\n--- INICIO DEL REPORTE GENERADO ---")
         print(reporte_generado)
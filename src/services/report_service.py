@@ -0,0 +1,223 @@
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Optional
+
+import google.generativeai as genai
+
+from src.core.config import (
+    GOOGLE_API_KEY,
+    REPORT_BACKEND,
+    REPORT_MAX_CONCURRENCY,
+    REPORT_MAX_RETRIES,
+    REPORT_RETRY_BACKOFF_SECONDS,
+    REPORT_TIMEOUT_SECONDS,
+)
+
+# Modelo de Gemini usado para los informes.
+REPORT_MODEL = 'gemini-1.5-flash'
+
+
+class ReportGenerationError(Exception):
+    """No se pudo generar el informe después de agotar los reintentos."""
+
+
+class GeminiBackend:
+    """
+    Genera informes con la API de Gemini. El cliente se configura una sola vez y el
+    modelo se reutiliza en todas las llamadas.
+    """
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str = REPORT_MODEL):
+        if not api_key:
+            raise ValueError("La clave de API de Google no fue proporcionada.")
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class StubBackend:
+    """
+    Backend local que simula la latencia de un modelo sin llamar a ninguna API.
+    Sirve para desarrollo y para pruebas de carga fuera de línea.
+    """
+    name = "stub"
+
+    def __init__(self, latency: float = 1.0, jitter: float = 0.2, failure_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+
+    def _report_text(self, prompt: str) -> str:
+        if random.random() < self.failure_rate:
+            raise RuntimeError("Falla simulada del backend de informes.")
+        return (
+            "### Análisis Financiero para tu Pyme\n\n"
+            "*Informe de prueba generado localmente, sin modelo de IA.*\n\n"
+            f"Longitud del prompt: {len(prompt)} caracteres."
+        )
+
+    async def generate(self, prompt: str) -> str:
+        await asyncio.sleep(max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter)))
+        return self._report_text(prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        # La latencia total se reparte entre los fragmentos, como en un modelo real.
+        lines = self._report_text(prompt).splitlines(keepends=True)
+        for line in lines:
+            await asyncio.sleep(self.latency / len(lines))
+            yield line
+
+
+class RateLimiter:
+    """
+    Limita la cantidad de operaciones por minuto (cubeta de fichas): permite ráfagas
+    de hasta `per_minute` operaciones y luego las espacia de manera uniforme.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Espera hasta que haya una ficha disponible y la consume."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ReportService:
+    """
+    Servicio asíncrono de generación de informes.
+
+    Limita la cantidad de llamadas simultáneas al backend con un semáforo y aplica a
+    cada llamada un tiempo máximo y reintentos con espera exponencial, de modo que una
+    respuesta lenta nunca bloquea el event loop ni al resto de las solicitudes.
+    """
+
+    def __init__(
+        self,
+        backend,
+        max_concurrency: int = REPORT_MAX_CONCURRENCY,
+        timeout: float = REPORT_TIMEOUT_SECONDS,
+        max_retries: int = REPORT_MAX_RETRIES,
+        backoff: float = REPORT_RETRY_BACKOFF_SECONDS,
+    ):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+
+    async def generate(self, prompt: str) -> str:
+        """
+        Genera el informe de un prompt.
+
+        Raises:
+            ReportGenerationError: Si todos los intentos fallaron o superaron el tiempo máximo.
+        """
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Espera exponencial con un poco de azar para no reintentar todos a la vez.
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+            async with self._semaphore:
+                self.in_flight += 1
+                try:
+                    return await asyncio.wait_for(self.backend.generate(prompt), self.timeout)
+                except asyncio.TimeoutError:
+                    last_error = TimeoutError(f"El backend '{self.backend.name}' no respondió en {self.timeout} s.")
+                except Exception as e:
+                    last_error = e
+                finally:
+                    self.in_flight -= 1
+            print(f"Intento {attempt + 1} de generación de informe fallido: {last_error}")
+        raise ReportGenerationError(str(last_error)) from last_error
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Genera el informe de un prompt fragmento a fragmento, a medida que el backend
+        lo produce. El tiempo máximo se aplica a la espera de cada fragmento y solo se
+        reintenta si el error ocurre antes del primero (después ya se envió texto).
+
+        Raises:
+            ReportGenerationError: Si la generación falló o se agotó el tiempo de espera.
+        """
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+            started = False
+            async with self._semaphore:
+                self.in_flight += 1
+                try:
+                    chunks = self.backend.stream(prompt).__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                        except StopAsyncIteration:
+                            return
+                        started = True
+                        yield chunk
+                except asyncio.TimeoutError:
+                    last_error = TimeoutError(f"El backend '{self.backend.name}' no respondió en {self.timeout} s.")
+                except Exception as e:
+                    last_error = e
+                finally:
+                    self.in_flight -= 1
+            print(f"Intento {attempt + 1} de generación de informe fallido: {last_error}")
+            if started:
+                break
+        raise ReportGenerationError(str(last_error)) from last_error
+
+
+_service: Optional[ReportService] = None
+
+
+def is_report_backend_configured() -> bool:
+    """Indica si hay un backend disponible (el stub o Gemini con su clave de API)."""
+    if _service is not None or REPORT_BACKEND == "stub":
+        return True
+    return bool(GOOGLE_API_KEY) and GOOGLE_API_KEY != "TU_CLAVE_DE_API_DE_GOOGLE_AQUI"
+
+
+def get_report_service() -> ReportService:
+    """
+    Devuelve el servicio de informes del proceso, creándolo la primera vez según
+    `REPORT_BACKEND` ('gemini' o 'stub').
+    """
+    global _service
+    if _service is None:
+        if REPORT_BACKEND == "stub":
+            backend = StubBackend()
+        else:
+            backend = GeminiBackend(GOOGLE_API_KEY)
+        _service = ReportService(backend)
+    return _service
+
+
+def set_report_service(service: Optional[ReportService]) -> None:
+    """Reemplaza el servicio del proceso (por ejemplo, por uno con el stub en una prueba de carga)."""
+    global _service
+    _service = service
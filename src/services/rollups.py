@@ -0,0 +1,194 @@
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import Integer, cast, delete, extract, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import MonthlyRollup, Transaction
+from src.services.data_version import bump_data_version
+
+# Clave de un rollup: (user_id, year, month, category_id, type, currency)
+RollupKey = Tuple[uuid.UUID, int, int, uuid.UUID, str, str]
+ROLLUP_KEY_COLUMNS = ["user_id", "year", "month", "category_id", "type", "currency"]
+
+
+def aggregate_transactions(transactions: Iterable[Any]) -> Dict[RollupKey, Dict[str, Any]]:
+    """
+    Agrupa transacciones (objetos del modelo o cualquier objeto con los mismos
+    atributos) por mes, categoría, tipo y moneda, acumulando suma, cantidad y
+    fechas extremas.
+    """
+    buckets: Dict[RollupKey, Dict[str, Any]] = {}
+    for t in transactions:
+        key = (t.user_id, t.date.year, t.date.month, t.category_id, t.type, t.currency or "ARS")
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = {
+                "total_amount": Decimal(t.amount),
+                "transaction_count": 1,
+                "first_date": t.date,
+                "last_date": t.date,
+            }
+        else:
+            bucket["total_amount"] += Decimal(t.amount)
+            bucket["transaction_count"] += 1
+            bucket["first_date"] = min(bucket["first_date"], t.date)
+            bucket["last_date"] = max(bucket["last_date"], t.date)
+    return buckets
+
+
+def aggregate_transactions_frame(df: pd.DataFrame) -> Dict[RollupKey, Dict[str, Any]]:
+    """
+    Igual que `aggregate_transactions`, pero sobre un DataFrame con las columnas
+    `user_id`, `date`, `category_id`, `type`, `currency` y `amount`, agrupando con
+    pandas en lugar de recorrer las filas.
+    """
+    if df.empty:
+        return {}
+    grouped = (
+        df.assign(year=df["date"].dt.year, month=df["date"].dt.month)
+        .groupby(ROLLUP_KEY_COLUMNS, sort=False)
+        .agg(
+            total_amount=("amount", "sum"),
+            transaction_count=("amount", "size"),
+            first_date=("date", "min"),
+            last_date=("date", "max"),
+        )
+    )
+    return {
+        (user_id, int(year), int(month), category_id, type_, currency): {
+            # Los montos llegan redondeados a centavos; se redondea la suma para
+            # descartar el error de punto flotante antes de pasar a Decimal.
+            "total_amount": Decimal(f"{row.total_amount:.2f}"),
+            "transaction_count": int(row.transaction_count),
+            "first_date": row.first_date.to_pydatetime(),
+            "last_date": row.last_date.to_pydatetime(),
+        }
+        for (user_id, year, month, category_id, type_, currency), row in zip(
+            grouped.index, grouped.itertuples(index=False)
+        )
+    }
+
+
+async def apply_transactions_to_rollups(db: AsyncSession, transactions: Iterable[Any]) -> None:
+    """
+    Suma un lote de transacciones nuevas a la tabla de rollups mensuales.
+
+    Usa un `INSERT ... ON CONFLICT DO UPDATE` por lote, por lo que es seguro ante
+    escrituras concurrentes. También incrementa la versión de datos de los usuarios
+    del lote. No hace commit: debe llamarse dentro de la misma transacción que
+    inserta las filas en `transactions` para que ambas tablas queden siempre
+    consistentes.
+    """
+    await upsert_rollup_buckets(db, aggregate_transactions(transactions))
+
+
+async def upsert_rollup_buckets(db: AsyncSession, buckets: Dict[RollupKey, Dict[str, Any]]) -> None:
+    """Suma a los rollups mensuales los valores ya agrupados por clave (ver `apply_transactions_to_rollups`)."""
+    if not buckets:
+        return
+
+    rows = [
+        {**dict(zip(ROLLUP_KEY_COLUMNS, key)), **values}
+        for key, values in buckets.items()
+    ]
+
+    stmt = pg_insert(MonthlyRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=ROLLUP_KEY_COLUMNS,
+        set_={
+            "total_amount": MonthlyRollup.total_amount + stmt.excluded.total_amount,
+            "transaction_count": MonthlyRollup.transaction_count + stmt.excluded.transaction_count,
+            "first_date": func.least(MonthlyRollup.first_date, stmt.excluded.first_date),
+            "last_date": func.greatest(MonthlyRollup.last_date, stmt.excluded.last_date),
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    await bump_data_version(db, {key[0] for key in buckets})
+
+
+def _expected_rollups_query(user_id: Optional[uuid.UUID] = None):
+    """Consulta que recalcula los rollups directamente desde `transactions`."""
+    year = cast(extract("year", Transaction.date), Integer)
+    month = cast(extract("month", Transaction.date), Integer)
+    currency = func.coalesce(Transaction.currency, "ARS")
+    stmt = (
+        select(
+            Transaction.user_id,
+            year.label("year"),
+            month.label("month"),
+            Transaction.category_id,
+            Transaction.type,
+            currency.label("currency"),
+            func.sum(Transaction.amount).label("total_amount"),
+            func.count().label("transaction_count"),
+            func.min(Transaction.date).label("first_date"),
+            func.max(Transaction.date).label("last_date"),
+        )
+        .group_by(
+            Transaction.user_id, year, month, Transaction.category_id, Transaction.type, currency
+        )
+    )
+    if user_id:
+        stmt = stmt.where(Transaction.user_id == user_id)
+    return stmt
+
+
+async def rebuild_rollups(db: AsyncSession, user_id: Optional[uuid.UUID] = None) -> int:
+    """
+    Reconstruye los rollups desde cero (para un usuario o para todos) a partir
+    de la tabla `transactions`. Hace commit y devuelve la cantidad de filas generadas.
+    """
+    delete_stmt = delete(MonthlyRollup)
+    if user_id:
+        delete_stmt = delete_stmt.where(MonthlyRollup.user_id == user_id)
+    await db.execute(delete_stmt)
+
+    expected = _expected_rollups_query(user_id).subquery()
+    columns = ROLLUP_KEY_COLUMNS + ["total_amount", "transaction_count", "first_date", "last_date"]
+    await db.execute(
+        insert(MonthlyRollup).from_select(columns, select(*[expected.c[c] for c in columns]))
+    )
+    # Si se reconstruyen es porque las transacciones cambiaron por fuera de la API.
+    await bump_data_version(db, [user_id] if user_id else None)
+    await db.commit()
+
+    count_stmt = select(func.count()).select_from(MonthlyRollup)
+    if user_id:
+        count_stmt = count_stmt.where(MonthlyRollup.user_id == user_id)
+    return (await db.execute(count_stmt)).scalar_one()
+
+
+async def verify_rollups(db: AsyncSession, user_id: Optional[uuid.UUID] = None) -> List[Dict[str, Any]]:
+    """
+    Compara los rollups almacenados con los valores recalculados desde `transactions`.
+
+    Returns:
+        Una lista con una entrada por cada clave que difiere (vacía si no hay desvíos).
+    """
+    expected = {
+        tuple(getattr(r, c) for c in ROLLUP_KEY_COLUMNS): (r.total_amount, r.transaction_count)
+        for r in (await db.execute(_expected_rollups_query(user_id))).all()
+    }
+
+    stored_stmt = select(MonthlyRollup)
+    if user_id:
+        stored_stmt = stored_stmt.where(MonthlyRollup.user_id == user_id)
+    stored = {
+        tuple(getattr(r, c) for c in ROLLUP_KEY_COLUMNS): (r.total_amount, r.transaction_count)
+        for r in (await db.execute(stored_stmt)).scalars().all()
+    }
+
+    drift = []
+    for key in expected.keys() | stored.keys():
+        if expected.get(key) != stored.get(key):
+            drift.append({
+                **dict(zip(ROLLUP_KEY_COLUMNS, key)),
+                "expected": expected.get(key),
+                "stored": stored.get(key),
+            })
+    return drift
@@ -0,0 +1,250 @@
+import uuid
+import zipfile
+from decimal import Decimal
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from src.core.config import STATEMENT_IMPORT_CHUNK_SIZE
+from src.db.models import Transaction
+from src.services.categorization import TransactionCategorizer, load_categorizer
+from src.services.category_registry import get_category_registry
+from src.services.fx import BASE_CURRENCY
+from src.services.rollups import aggregate_transactions_frame, upsert_rollup_buckets
+from src.services.transaction_ingestion import MAX_REPORTED_ERRORS
+
+# Columnas del formato de extracto (el mismo de `datos_ejemplo.csv`).
+STATEMENT_COLUMNS = ["Fecha", "Descripción", "Categoría", "Ingreso", "Egreso"]
+# Columna opcional con la moneda de cada fila (la agrega la exportación a CSV). Las
+# filas sin moneda se importan en `BASE_CURRENCY`.
+CURRENCY_COLUMN = "Moneda"
+# Columnas obligatorias al importar: los extractos bancarios no suelen traer categoría,
+# así que "Categoría" puede faltar (la categoría se deduce de la descripción).
+IMPORT_REQUIRED_COLUMNS = ["Fecha", "Descripción", "Ingreso", "Egreso"]
+
+# Mapeo simple para convertir las categorías del CSV a las categorías por defecto.
+CSV_CATEGORY_MAP = {
+    "Ventas": "Ventas",
+    "Compra de licencia de software": "Software y Suscripciones",
+    "Gastos de Software": "Software y Suscripciones",
+    "Gastos Fijos": "Alquiler",
+    "Pago de alquiler de oficina": "Alquiler",
+    "Salarios": "Salarios",
+    "Pago de salarios": "Salarios",
+    "Campaña publicitaria en redes": "Marketing",
+    "Marketing": "Marketing",
+    "Compra de insumos para oficina": "Insumos de Oficina",
+    "Gastos Administrativos": "Insumos de Oficina",
+    "Servicios de contador": "Servicios Profesionales",
+    "Venta de consultoría inicial": "Servicios Profesionales",
+    "Venta de consultoría recurrente": "Servicios Profesionales",
+    "Venta de consultoría final": "Servicios Profesionales",
+    "Venta de producto A": "Ventas",
+    "Venta de producto B": "Ventas",
+}
+# Categoría asignada a las que no figuran en `CSV_CATEGORY_MAP` ni se pudieron clasificar
+# por la descripción.
+DEFAULT_CSV_CATEGORY = "Otros Egresos"
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+class StatementFormatError(ValueError):
+    """El archivo no tiene el formato de extracto esperado."""
+
+
+def check_statement_columns(columns, required: List[str] = STATEMENT_COLUMNS) -> None:
+    """
+    Raises:
+        StatementFormatError: Si faltan columnas del formato de extracto.
+    """
+    missing = [col for col in required if col not in columns]
+    if missing:
+        raise StatementFormatError(f"Faltan las siguientes columnas en el archivo: {', '.join(missing)}")
+
+
+def clean_statement_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Limpia un bloque del extracto: convierte los montos a números (los inválidos
+    quedan en 0) y las fechas a `datetime`, descartando las filas sin fecha válida.
+    """
+    df = df.copy()
+    df["Ingreso"] = pd.to_numeric(df["Ingreso"], errors="coerce").fillna(0)
+    df["Egreso"] = pd.to_numeric(df["Egreso"], errors="coerce").fillna(0)
+    df["Fecha"] = pd.to_datetime(df["Fecha"], errors="coerce")
+    return df.dropna(subset=["Fecha"])
+
+
+def read_statement_chunks(file: BinaryIO, filename: str, chunksize: int = STATEMENT_IMPORT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Lee un extracto CSV o Excel en bloques de `chunksize` filas, sin cargar el
+    archivo completo en memoria. Cada bloque conserva como índice el número de fila
+    de datos (desde 0) para poder informar errores.
+
+    Raises:
+        StatementFormatError: Si faltan columnas del formato de extracto o el archivo
+            no se puede leer (vacío, CSV mal formado, Excel dañado, etc.).
+    """
+    try:
+        if filename.lower().endswith(EXCEL_EXTENSIONS):
+            yield from _read_excel_chunks(file, chunksize)
+            return
+
+        for chunk in pd.read_csv(file, chunksize=chunksize):
+            check_statement_columns(chunk.columns, IMPORT_REQUIRED_COLUMNS)
+            yield chunk
+    except StatementFormatError:
+        raise
+    # Los errores de pandas (`EmptyDataError`, `ParserError`) y de decodificación son
+    # `ValueError`; openpyxl lanza los suyos ante un archivo que no es un Excel válido.
+    except (ValueError, zipfile.BadZipFile, InvalidFileException) as e:
+        raise StatementFormatError(str(e) or type(e).__name__) from e
+
+
+def _read_excel_chunks(file: BinaryIO, chunksize: int) -> Iterator[pd.DataFrame]:
+    # En modo `read_only` openpyxl recorre la hoja fila a fila en lugar de cargarla entera.
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(c).strip() if c is not None else "" for c in next(rows, ())]
+        check_statement_columns(header, IMPORT_REQUIRED_COLUMNS)
+        start = 0
+        batch: List[Tuple[Any, ...]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=header, index=range(start, start + len(batch)))
+                start += len(batch)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header, index=range(start, start + len(batch)))
+    finally:
+        workbook.close()
+
+
+async def load_category_ids_by_name(db: AsyncSession) -> Dict[str, uuid.UUID]:
+    registry = await get_category_registry(db)
+    return dict(registry.ids_by_name)
+
+
+def statement_to_transactions(
+    df: pd.DataFrame,
+    user_id: uuid.UUID,
+    category_ids: Dict[str, uuid.UUID],
+    categorizer: Optional[TransactionCategorizer] = None,
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Convierte un bloque del extracto en filas de `transactions`, con operaciones
+    vectorizadas: el tipo sale de si la fila tiene ingreso o egreso, la moneda de la
+    columna `CURRENCY_COLUMN` (si está; si no, `BASE_CURRENCY`) y la categoría,
+    de su nombre si ya existe o de `CSV_CATEGORY_MAP`. Las filas sin categoría
+    reconocible (o sin columna "Categoría") se clasifican por la descripción con
+    `categorizer`, si se indica, y el resto queda en `DEFAULT_CSV_CATEGORY`.
+
+    Returns:
+        Una tupla `(transacciones, errores)`. Los errores indican la fila de datos
+        (`index`, desde 0) y el motivo por el que se descartó.
+    """
+    check_statement_columns(df.columns, IMPORT_REQUIRED_COLUMNS)
+    errors: List[Dict[str, Any]] = []
+
+    cleaned = clean_statement_frame(df)
+    for index in df.index.difference(cleaned.index):
+        errors.append({"index": int(index), "errors": ["Fecha: no es una fecha válida."]})
+
+    is_income = cleaned["Ingreso"] > 0
+    amount = cleaned["Ingreso"].where(is_income, cleaned["Egreso"]).round(2)
+    type_ = is_income.map({True: "income", False: "expense"})
+    # Las categorías que ya existen con ese nombre (por ejemplo, en un CSV exportado por
+    # la API) se usan tal cual; el resto se traduce con `CSV_CATEGORY_MAP`.
+    csv_category = cleaned["Categoría"] if "Categoría" in cleaned else pd.Series(None, index=cleaned.index, dtype=object)
+    category_name = csv_category.where(csv_category.isin(list(category_ids)))
+    category_name = category_name.fillna(csv_category.map(CSV_CATEGORY_MAP))
+    category_id = category_name.map(category_ids).astype(object)
+    if categorizer is not None:
+        unresolved = category_id.isna()
+        if unresolved.any():
+            category_id[unresolved] = categorizer.classify(cleaned["Descripción"][unresolved], type_[unresolved])
+    category_name = category_name.fillna(DEFAULT_CSV_CATEGORY)
+    category_id = category_id.fillna(category_name.map(category_ids))
+
+    no_amount = amount <= 0
+    no_category = category_id.isna()
+    for index in cleaned.index[no_amount]:
+        errors.append({"index": int(index), "errors": ["La fila no tiene ingreso ni egreso."]})
+    for index in cleaned.index[no_category & ~no_amount]:
+        errors.append({"index": int(index), "errors": [f"No existe la categoría '{category_name[index]}'."]})
+
+    if CURRENCY_COLUMN in cleaned:
+        currency = cleaned[CURRENCY_COLUMN].astype("string").str.strip().str.upper()
+        currency = currency.mask(currency == "").fillna(BASE_CURRENCY).astype(object)
+    else:
+        currency = pd.Series(BASE_CURRENCY, index=cleaned.index, dtype=object)
+
+    valid = ~(no_amount | no_category)
+    transactions = pd.DataFrame({
+        "user_id": user_id,
+        "category_id": category_id[valid],
+        "description": cleaned["Descripción"][valid].fillna("").astype(str),
+        "amount": amount[valid],
+        "currency": currency[valid],
+        "type": type_[valid],
+        "date": cleaned["Fecha"][valid],
+    })
+    errors.sort(key=lambda e: e["index"])
+    return transactions, errors
+
+
+async def insert_statement_transactions(db: AsyncSession, transactions: pd.DataFrame) -> None:
+    """
+    Inserta un bloque de transacciones con un único `executemany` y suma sus totales
+    a los rollups mensuales. No hace commit.
+    """
+    if transactions.empty:
+        return
+    values = transactions.assign(amount=[Decimal(f"{a:.2f}") for a in transactions["amount"]]).to_dict("records")
+    await db.execute(insert(Transaction), values)
+    await upsert_rollup_buckets(db, aggregate_transactions_frame(transactions))
+
+
+async def import_statement(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    file: BinaryIO,
+    filename: str,
+    chunksize: int = STATEMENT_IMPORT_CHUNK_SIZE,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Importa un extracto bloque a bloque dentro de una misma transacción y, después de
+    cada bloque, devuelve el avance acumulado. La lectura y el parseo de cada bloque
+    corren en un hilo aparte para no bloquear el event loop. Hace commit al final,
+    así que si la importación se interrumpe no queda ninguna fila a medias.
+
+    Raises:
+        StatementFormatError: Si el archivo no tiene el formato de extracto esperado.
+    """
+    category_ids = await load_category_ids_by_name(db)
+    # Lo aprendido no incluye la categoría de respaldo: que una descripción haya quedado
+    # ahí antes no significa que el usuario la haya elegido.
+    fallback_ids = [category_ids[DEFAULT_CSV_CATEGORY]] if DEFAULT_CSV_CATEGORY in category_ids else []
+    categorizer = await load_categorizer(db, user_id, exclude_category_ids=fallback_ids)
+    chunks = read_statement_chunks(file, filename, chunksize)
+    progress = {"rows": 0, "inserted": 0, "failed": 0}
+    while True:
+        chunk = await run_in_threadpool(next, chunks, None)
+        if chunk is None:
+            break
+        transactions, errors = await run_in_threadpool(
+            statement_to_transactions, chunk, user_id, category_ids, categorizer
+        )
+        await insert_statement_transactions(db, transactions)
+        progress["rows"] += len(chunk)
+        progress["inserted"] += len(transactions)
+        progress["failed"] += len(errors)
+        yield {**progress, "errors": errors[:MAX_REPORTED_ERRORS]}
+    await db.commit()
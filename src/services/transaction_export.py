@@ -0,0 +1,164 @@
+import io
+import json
+import uuid
+from typing import AsyncIterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import TRANSACTION_EXPORT_BATCH_SIZE
+from src.db.models import Transaction, TransactionCategory
+from src.services.statement_import import CURRENCY_COLUMN, STATEMENT_COLUMNS
+
+EXPORT_COLUMNS = ["id", "date", "description", "category", "type", "amount", "currency"]
+# El CSV usa el formato de extracto (el que leen `load_financial_data` y la
+# importación), más la moneda, que la importación respeta.
+CSV_COLUMNS = STATEMENT_COLUMNS + [CURRENCY_COLUMN]
+
+PARQUET_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("date", pa.timestamp("us")),
+    ("description", pa.string()),
+    ("category", pa.string()),
+    ("type", pa.string()),
+    ("amount", pa.decimal128(15, 2)),
+    ("currency", pa.string()),
+])
+
+
+def export_statement(user_id: uuid.UUID, conditions: Sequence = ()):
+    """Consulta de las transacciones a exportar, en orden cronológico."""
+    return (
+        select(
+            Transaction.id,
+            Transaction.date,
+            Transaction.description,
+            TransactionCategory.name,
+            Transaction.type,
+            Transaction.amount,
+            Transaction.currency,
+        )
+        .join(TransactionCategory, Transaction.category_id == TransactionCategory.id)
+        .where(Transaction.user_id == user_id, *conditions)
+        .order_by(Transaction.date, Transaction.id)
+    )
+
+
+def _csv_chunk(df: pd.DataFrame) -> bytes:
+    is_income = df["type"] == "income"
+    statement = pd.DataFrame({
+        "Fecha": df["date"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "Descripción": df["description"],
+        "Categoría": df["category"],
+        "Ingreso": np.where(is_income, df["amount"], 0),
+        "Egreso": np.where(is_income, 0, df["amount"]),
+        CURRENCY_COLUMN: df["currency"],
+    })
+    return statement.to_csv(index=False, header=False).encode("utf-8")
+
+
+def _ndjson_chunk(df: pd.DataFrame) -> bytes:
+    lines = [
+        json.dumps(
+            {
+                "id": str(row.id),
+                "date": row.date.isoformat(),
+                "description": row.description,
+                "category": row.category,
+                "type": row.type,
+                "amount": str(row.amount),
+                "currency": row.currency,
+            },
+            ensure_ascii=False,
+        )
+        for row in df.itertuples(index=False)
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ParquetSink(io.RawIOBase):
+    """
+    Destino de `ParquetWriter` que acumula los bytes escritos hasta que se retiran con
+    `drain`, llevando la posición total (el escritor la usa para el pie del archivo).
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_table(df: pd.DataFrame) -> pa.Table:
+    return pa.table(
+        {
+            "id": df["id"].astype(str).tolist(),
+            "date": df["date"].tolist(),
+            "description": df["description"].tolist(),
+            "category": df["category"].tolist(),
+            "type": df["type"].tolist(),
+            "amount": df["amount"].tolist(),
+            "currency": df["currency"].tolist(),
+        },
+        schema=PARQUET_SCHEMA,
+    )
+
+
+async def stream_transactions_export(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    export_format: str,
+    conditions: Sequence = (),
+    batch_size: int = TRANSACTION_EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Exporta las transacciones de un usuario como 'csv', 'ndjson' o 'parquet',
+    devolviendo el archivo de a partes.
+
+    Las filas se leen con un cursor del lado del servidor, de a `batch_size`, y cada
+    lote se codifica y se entrega antes de leer el siguiente, por lo que la memoria
+    usada no depende de la cantidad de transacciones. En Parquet, cada lote es un
+    row group.
+    """
+    result = await db.stream(export_statement(user_id, conditions).execution_options(yield_per=batch_size))
+
+    if export_format == "csv":
+        yield (",".join(CSV_COLUMNS) + "\n").encode("utf-8")
+    sink = writer = None
+    if export_format == "parquet":
+        sink = _ParquetSink()
+        writer = pq.ParquetWriter(sink, PARQUET_SCHEMA)
+
+    async for rows in result.partitions():
+        df = pd.DataFrame(rows, columns=EXPORT_COLUMNS)
+        df["date"] = pd.to_datetime(df["date"])
+        if export_format == "csv":
+            yield _csv_chunk(df)
+        elif export_format == "ndjson":
+            yield _ndjson_chunk(df)
+        else:
+            writer.write_table(_parquet_table(df))
+            yield sink.drain()
+
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
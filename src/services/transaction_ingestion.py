@@ -0,0 +1,166 @@
+import json
+import uuid
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import TRANSACTION_BULK_CHUNK_SIZE
+from src.db.models import Transaction
+from src.schemas.transaction import TransactionCreate
+from src.services.category_registry import get_category_registry, invalidate_category_registry
+from src.services.rollups import apply_transactions_to_rollups
+
+# Tipos de transacción aceptados en una carga masiva.
+TRANSACTION_TYPES = {"income", "expense"}
+# Máximo de errores por fila que se detallan en la respuesta (el resto solo se cuenta).
+MAX_REPORTED_ERRORS = 1000
+UNKNOWN_CATEGORY_ERROR = "category_id: la categoría no existe."
+
+
+class BulkIngestionResult:
+    """Acumula el resultado de una carga masiva de transacciones."""
+
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add_error(self, index: int, errors: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"index": index, "errors": errors})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+async def load_category_ids(db: AsyncSession, reload: bool = False) -> Set[uuid.UUID]:
+    """
+    IDs de las categorías existentes (del registro en memoria), para validar las filas
+    sin violar la clave foránea. Con `reload`, se vuelven a leer de la base.
+    """
+    if reload:
+        invalidate_category_registry()
+    registry = await get_category_registry(db)
+    return set(registry.by_id)
+
+
+def validate_row(raw: Any, category_ids: Set[uuid.UUID]) -> Tuple[Optional[TransactionCreate], List[str]]:
+    """
+    Valida una fila con el esquema `TransactionCreate` y, además, que su tipo y su
+    categoría sean válidos (lo que evita que un error de la base aborte el lote).
+
+    Returns:
+        Una tupla `(transacción, errores)`; la transacción es `None` si hubo errores.
+    """
+    if not isinstance(raw, dict):
+        return None, ["La fila debe ser un objeto JSON."]
+    try:
+        row = TransactionCreate.parse_obj(raw)
+    except ValidationError as e:
+        return None, [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+
+    errors = []
+    if row.type not in TRANSACTION_TYPES:
+        errors.append(f"type: debe ser uno de {sorted(TRANSACTION_TYPES)}.")
+    if row.category_id not in category_ids:
+        errors.append(UNKNOWN_CATEGORY_ERROR)
+    return (None, errors) if errors else (row, [])
+
+
+async def _insert_chunk(db: AsyncSession, user_id: uuid.UUID, rows: List[TransactionCreate]) -> None:
+    """Inserta un lote con un único `executemany` y actualiza sus rollups mensuales."""
+    values = [{**row.dict(), "user_id": user_id} for row in rows]
+    await db.execute(insert(Transaction), values)
+    await apply_transactions_to_rollups(db, [SimpleNamespace(**v) for v in values])
+
+
+async def ingest_transactions(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    rows: AsyncIterator[Tuple[int, Any]],
+    chunk_size: int = TRANSACTION_BULK_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Valida e inserta transacciones de un usuario a medida que llegan, en lotes de
+    `chunk_size` filas, todo dentro de una misma transacción de base de datos.
+
+    Las filas inválidas no se insertan ni interrumpen la carga: se informan en
+    `errors` con su posición (`index`) en la entrada. Hace commit al final.
+
+    Args:
+        rows: Pares `(posición, fila)`. La fila puede ser un `dict` o una excepción, si
+            no se pudo decodificar.
+    """
+    category_ids = await load_category_ids(db)
+    categories_reloaded = False
+    result = BulkIngestionResult()
+    chunk: List[TransactionCreate] = []
+
+    async for index, raw in rows:
+        result.received += 1
+        if isinstance(raw, Exception):
+            result.add_error(index, [str(raw)])
+            continue
+        row, errors = validate_row(raw, category_ids)
+        if errors == [UNKNOWN_CATEGORY_ERROR] and not categories_reloaded:
+            # Puede ser una categoría creada en otro proceso: se recarga el registro una vez.
+            category_ids = await load_category_ids(db, reload=True)
+            categories_reloaded = True
+            row, errors = validate_row(raw, category_ids)
+        if errors:
+            result.add_error(index, errors)
+            continue
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            await _insert_chunk(db, user_id, chunk)
+            result.inserted += len(chunk)
+            chunk = []
+
+    if chunk:
+        await _insert_chunk(db, user_id, chunk)
+        result.inserted += len(chunk)
+    await db.commit()
+    return result.as_dict()
+
+
+async def iter_json_array(items: Iterable[Any]) -> AsyncIterator[Tuple[int, Any]]:
+    """Adapta una lista ya decodificada a los pares `(posición, fila)` de `ingest_transactions`."""
+    for index, item in enumerate(items):
+        yield index, item
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Decodifica un cuerpo NDJSON (un objeto JSON por línea) a medida que llega, sin
+    leerlo completo en memoria. Las líneas vacías se ignoran y las que no son JSON
+    válido se devuelven como excepción, para informarlas como error de esa fila.
+    """
+    buffer = b""
+    index = 0
+    async for data in chunks:
+        buffer += data
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield index, _decode_line(line)
+                index += 1
+    if buffer.strip():
+        yield index, _decode_line(buffer)
+
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"JSON inválido: {e}")
@@ -0,0 +1,47 @@
+import uuid
+from typing import Any, Dict, Iterable, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Transaction, TransactionCategory
+from src.services.category_registry import get_category_registry
+
+# Columnas de una transacción en los listados. Se seleccionan columnas en lugar de
+# entidades del ORM: las filas se convierten directamente en diccionarios, sin pasar
+# por el mapa de identidad ni por la validación de Pydantic de cada fila.
+TRANSACTION_FIELDS = ["id", "user_id", "category_id", "description", "amount", "currency", "type", "date", "created_at"]
+CATEGORY_FIELDS = ["id", "name", "type", "color", "is_default"]
+
+
+def transaction_list_statement(user_id: uuid.UUID, conditions: Sequence = (), compact: bool = False):
+    """
+    Consulta del listado de transacciones de un usuario. Salvo en modo compacto,
+    incluye las columnas de la categoría (con el prefijo `category__`).
+    """
+    columns = [getattr(Transaction, f) for f in TRANSACTION_FIELDS]
+    stmt = select(*columns)
+    if not compact:
+        stmt = stmt.add_columns(
+            *[getattr(TransactionCategory, f).label(f"category__{f}") for f in CATEGORY_FIELDS]
+        ).join(TransactionCategory, Transaction.category_id == TransactionCategory.id)
+    return stmt.where(Transaction.user_id == user_id, *conditions)
+
+
+def transaction_dict(row: Any) -> Dict[str, Any]:
+    """Transacción de un listado compacto (solo con `category_id`)."""
+    return {f: getattr(row, f) for f in TRANSACTION_FIELDS}
+
+
+def transaction_with_category_dict(row: Any) -> Dict[str, Any]:
+    """Transacción de un listado con su categoría completa anidada."""
+    item = transaction_dict(row)
+    item["category"] = {f: getattr(row, f"category__{f}") for f in CATEGORY_FIELDS}
+    return item
+
+
+async def load_categories(db: AsyncSession, category_ids: Iterable[uuid.UUID]) -> List[Dict[str, Any]]:
+    """Categorías (sin repetir) de un conjunto de IDs, para la tabla auxiliar del modo compacto."""
+    ids = set(category_ids)
+    registry = await get_category_registry(db, ids)
+    return registry.as_dicts(ids)
@@ -0,0 +1,62 @@
+import uuid
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.pagination import keyset_paginate
+from src.db.models import TRANSACTION_DESCRIPTION_TSVECTOR, Transaction
+from src.services.transaction_listing import TRANSACTION_FIELDS
+
+# Largo mínimo de una búsqueda: con menos caracteres los trigramas no discriminan.
+MIN_QUERY_LENGTH = 2
+
+
+def search_statement(user_id: uuid.UUID, query: str):
+    """
+    Consulta de búsqueda sobre las descripciones de un usuario y su relevancia.
+
+    Una transacción coincide si su descripción contiene las palabras buscadas (texto
+    completo en español, con las mismas raíces: "alquiler" encuentra "alquileres") o
+    si alguna de sus palabras se parece a la búsqueda (trigramas, tolera errores de
+    tipeo y siglas como "AFIP"). Ambas condiciones usan su propio índice GIN.
+
+    Returns:
+        Una tupla `(consulta, relevancia)`, donde la relevancia es la mayor entre el
+        rango de texto completo y la similitud de palabras (entre 0 y 1).
+    """
+    ts_query = func.websearch_to_tsquery(text("'spanish'::regconfig"), query)
+    rank = func.greatest(
+        func.ts_rank(TRANSACTION_DESCRIPTION_TSVECTOR, ts_query),
+        func.word_similarity(query, Transaction.description),
+    ).label("rank")
+    stmt = (
+        select(*[getattr(Transaction, f) for f in TRANSACTION_FIELDS], rank)
+        .where(
+            Transaction.user_id == user_id,
+            TRANSACTION_DESCRIPTION_TSVECTOR.op("@@")(ts_query)
+            | Transaction.description.op("%>")(query),
+        )
+    )
+    return stmt, rank
+
+
+async def search_transactions(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    query: str,
+    limit: int,
+    after: Optional[Sequence[Any]] = None,
+) -> List[Tuple[Any, float]]:
+    """
+    Busca transacciones de un usuario por su descripción, de la más a la menos
+    relevante, con paginación por clave sobre (relevancia, id).
+
+    Devuelve hasta `limit + 1` pares `(fila, relevancia)` (ver `page_cursor`); cada
+    fila tiene las columnas de `TRANSACTION_FIELDS`, sin la categoría (se resuelve
+    con el registro de categorías).
+    """
+    stmt, rank = search_statement(user_id, query)
+    stmt = keyset_paginate(stmt, [rank, Transaction.id], after, limit)
+    result = await db.execute(stmt)
+    return [(row, float(row.rank)) for row in result.all()]
@@ -0,0 +1,2 @@
+# Procesos que corren por fuera de la API, por ejemplo:
+# python -m src.workers.analysis_worker
@@ -0,0 +1,100 @@
+"""
+Worker que procesa la cola de análisis financieros (`analysis_jobs`).
+
+Se ejecuta por separado de la API y puede correrse en tantas máquinas o procesos
+como haga falta: cada trabajo se reclama con `SELECT ... FOR UPDATE SKIP LOCKED`,
+así que nunca lo procesan dos workers a la vez. Cada trabajo usa sus propias
+sesiones de base de datos. Mientras procesa un trabajo, el worker renueva su
+`started_at` periódicamente, así otro worker solo lo retoma si este murió. Un error
+de la base de datos no detiene al worker: se registra y se vuelve a intentar con
+una espera creciente. Al recibir SIGINT o SIGTERM, el worker deja de tomar trabajos
+nuevos y termina los que tiene en curso.
+
+Uso (desde la raíz del proyecto):
+    python -m src.workers.analysis_worker
+    python -m src.workers.analysis_worker --concurrency 8
+"""
+import argparse
+import asyncio
+import signal
+
+from src.core.config import ANALYSIS_JOB_POLL_SECONDS, ANALYSIS_JOB_STALE_SECONDS, ANALYSIS_WORKER_CONCURRENCY
+from src.db.session import AsyncSessionLocal
+from src.services.analysis_service import claim_next_job, heartbeat_job, process_job
+
+# Cada cuánto se renueva `started_at` de un trabajo en curso: bastante menos que el
+# plazo tras el cual se lo considera abandonado.
+HEARTBEAT_SECONDS = ANALYSIS_JOB_STALE_SECONDS / 3
+# Espera máxima (en segundos) tras errores consecutivos al reclamar o registrar trabajos.
+MAX_ERROR_BACKOFF_SECONDS = 60
+
+
+async def keep_job_alive(job_id) -> None:
+    """Renueva `started_at` del trabajo hasta que se cancele la tarea."""
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await heartbeat_job(db, job_id)
+        except Exception as e:
+            print(f"No se pudo renovar el trabajo {job_id}: {e}")
+
+
+async def wait_or_stop(stop: asyncio.Event, seconds: float) -> None:
+    """Espera `seconds` segundos, o menos si se pide detener el worker."""
+    try:
+        await asyncio.wait_for(stop.wait(), seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def worker_loop(worker_id: int, stop: asyncio.Event, poll_seconds: float) -> None:
+    """Reclama y procesa trabajos hasta que se pida detener el worker."""
+    errors = 0
+    while not stop.is_set():
+        job = None
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await claim_next_job(db)
+            if job is None:
+                errors = 0
+                await wait_or_stop(stop, poll_seconds)
+                continue
+
+            heartbeat = asyncio.create_task(keep_job_alive(job.id))
+            try:
+                async with AsyncSessionLocal() as db:
+                    status = await process_job(db, job)
+            finally:
+                heartbeat.cancel()
+            errors = 0
+            print(f"[worker {worker_id}] Trabajo {job.id} del usuario {job.user_id}: {status}.")
+        except Exception as e:
+            # Un trabajo que quedó a medio registrar sigue en 'running' sin renovarse,
+            # así que se retoma al considerarse abandonado.
+            errors += 1
+            delay = min(poll_seconds * 2 ** errors, MAX_ERROR_BACKOFF_SECONDS)
+            target = f"el trabajo {job.id}" if job is not None else "la cola"
+            print(f"[worker {worker_id}] Error con {target}: {e}. Nuevo intento en {delay:.1f} s.")
+            await wait_or_stop(stop, delay)
+
+
+async def run_worker(concurrency: int, poll_seconds: float) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(f"Worker de análisis iniciado con {concurrency} trabajos simultáneos.")
+    await asyncio.gather(*[worker_loop(i, stop, poll_seconds) for i in range(concurrency)])
+    print("Worker de análisis detenido.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=ANALYSIS_WORKER_CONCURRENCY,
+                        help="Trabajos procesados a la vez por este proceso.")
+    parser.add_argument("--poll-interval", type=float, default=ANALYSIS_JOB_POLL_SECONDS,
+                        help="Segundos de espera cuando la cola está vacía.")
+    args = parser.parse_args()
+    asyncio.run(run_worker(args.concurrency, args.poll_interval))
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from src.services.anomaly_detection import TRANSACTION_COLUMNS, detect_anomalies
+
+
+def make_transactions(rows):
+    """DataFrame con las columnas de `TRANSACTION_COLUMNS` a partir de (fecha, tipo, monto)."""
+    df = pd.DataFrame(
+        [
+            (uuid.uuid4(), datetime.fromisoformat(date), amount, "ARS", tipo, "Ventas", "Cobro")
+            for date, tipo, amount in rows
+        ],
+        columns=TRANSACTION_COLUMNS,
+    )
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def income_drops(alerts):
+    return [a for a in alerts if a["json_metadata"]["anomaly"] == "income_drop"]
+
+
+def test_income_drop_when_month_has_no_income():
+    df = make_transactions([(f"2025-0{m}-10", "income", 1000.0) for m in range(1, 5)])
+
+    alerts = income_drops(detect_anomalies(df, datetime(2025, 5, 31), datetime(2025, 6, 1)))
+
+    assert len(alerts) == 1
+    assert alerts[0]["json_metadata"]["month"] == "2025-05"
+    assert alerts[0]["json_metadata"]["amount"] == 0.0
+    assert alerts[0]["json_metadata"]["reference_amount"] == 1000.0
+
+
+def test_income_drop_when_month_has_low_income():
+    rows = [(f"2025-0{m}-10", "income", 1000.0) for m in range(1, 5)] + [("2025-05-10", "income", 100.0)]
+
+    alerts = income_drops(detect_anomalies(make_transactions(rows), datetime(2025, 5, 31), datetime(2025, 6, 1)))
+
+    assert [a["json_metadata"]["month"] for a in alerts] == ["2025-05"]
+    assert alerts[0]["json_metadata"]["amount"] == 100.0
+
+
+def test_no_income_drop_for_month_in_progress():
+    df = make_transactions([(f"2025-0{m}-10", "income", 1000.0) for m in range(1, 5)])
+
+    # Mayo todavía no cerró: no hay ingresos, pero no es una caída.
+    assert income_drops(detect_anomalies(df, datetime(2025, 5, 1), datetime(2025, 5, 20))) == []
@@ -0,0 +1,56 @@
+import asyncio
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from src.services.cash_flow_projection import fetch_monthly_histories, project_cash_flow
+from src.services.inflation import month_number
+
+
+class FakeSession:
+    """Sesión que responde a la consulta de los rollups con las filas indicadas."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, stmt):
+        rows = self.rows
+
+        class Result:
+            def all(self):
+                return list(rows)
+
+        return Result()
+
+
+def test_histories_are_zero_filled_through_last_closed_month():
+    user_id = uuid.uuid4()
+    db = FakeSession([
+        (user_id, "ARS", "ARS", 2025, 1, "income", Decimal("1000")),
+        (user_id, "ARS", "ARS", 2025, 1, "expense", Decimal("400")),
+        (user_id, "ARS", "ARS", 2025, 3, "income", Decimal("1200")),
+    ])
+
+    histories = asyncio.run(fetch_monthly_histories(db, [user_id], month_number(2025, 5)))
+
+    assert histories == [(user_id, month_number(2025, 1), [1000.0, 0.0, 1200.0, 0.0, 0.0], [400.0, 0.0, 0.0, 0.0, 0.0])]
+
+
+def test_projection_of_constant_history():
+    history = (uuid.uuid4(), month_number(2024, 1), [1000.0] * 6, [600.0] * 6)
+
+    rows = project_cash_flow(history, 3, month_number(2024, 8))
+
+    assert [row["date"].month for row in rows] == [8, 9, 10]
+    assert [row["projected_income"] for row in rows] == [Decimal("1000.00")] * 3
+    assert [row["net_flow"] for row in rows] == [Decimal("400.00")] * 3
+
+
+def test_projection_follows_trend_across_current_month():
+    # Historial hasta junio; el mes en curso (julio) no está y la proyección empieza en agosto.
+    history = (uuid.uuid4(), month_number(2024, 1), [100.0 * k for k in range(1, 7)], [0.0] * 6)
+
+    rows = project_cash_flow(history, 2, month_number(2024, 8))
+
+    assert [float(row["projected_income"]) for row in rows] == pytest.approx([800.0, 900.0])
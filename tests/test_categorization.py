@@ -0,0 +1,125 @@
+import re
+import uuid
+
+import pandas as pd
+import pytest
+
+from src.services.categorization import (
+    CATEGORY_KEYWORDS,
+    KeywordIndex,
+    TransactionCategorizer,
+    _trie_pattern,
+    normalize_descriptions,
+)
+from src.services.category_registry import Category, CategoryRegistry
+
+INCOME_CATEGORIES = {"Ventas", "Servicios Profesionales"}
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return CategoryRegistry(
+        Category(
+            id=uuid.uuid4(),
+            name=name,
+            type="income" if name in INCOME_CATEGORIES else "expense",
+            color="#000000",
+            is_default=True,
+        )
+        for name in CATEGORY_KEYWORDS
+    )
+
+
+@pytest.fixture(scope="module")
+def categorizer(registry):
+    return TransactionCategorizer(KeywordIndex(registry))
+
+
+def classify_names(categorizer, registry, rows):
+    descriptions = pd.Series([d for d, _ in rows])
+    types = pd.Series([t for _, t in rows])
+    return [registry.name(c) if isinstance(c, uuid.UUID) else None for c in categorizer.classify(descriptions, types)]
+
+
+def test_normalize_descriptions():
+    normalized = normalize_descriptions(pd.Series(["TRANSF 00123 - JUAN", "Transf. 00456 Juan", "Pago F931 AFIP", None]))
+
+    assert normalized.tolist() == ["transf juan", "transf juan", "pago f931 afip", ""]
+
+
+def test_trie_pattern_matches_every_word_and_only_whole_words():
+    words = ["iva", "iibb", "impuesto", "impuestos", "ingresos brutos"]
+    pattern = re.compile(rf"\b({_trie_pattern(words)})\b")
+
+    for word in words:
+        assert pattern.fullmatch(word)
+    assert pattern.search("pago impuestos varios").group(1) == "impuestos"
+    assert pattern.search("ingresos brutos caba").group(1) == "ingresos brutos"
+    assert pattern.search("impuestoss") is None
+    assert pattern.search("ivan") is None
+
+
+def test_keyword_index_rejects_short_keywords(registry):
+    with pytest.raises(ValueError):
+        KeywordIndex(registry, {"Salarios": ["F 931"]})
+
+
+def test_keyword_index_match_by_type(registry):
+    index = KeywordIndex(registry)
+    texts = normalize_descriptions(pd.Series(["Cobro factura 123", "Pago EDENOR"]))
+
+    income, expense = index.match(texts, "income"), index.match(texts, "expense")
+
+    assert income.tolist()[0] == registry.ids_by_name["Ventas"]
+    assert expense.isna().tolist() == [True, False]
+    assert expense.tolist()[1] == registry.ids_by_name["Servicios Públicos"]
+
+
+def test_classify_with_keywords(categorizer, registry):
+    rows = [
+        ("Cobro factura 0001-00012345", "income"),
+        ("Débito automático TELECOM", "expense"),
+        ("Percepción IIBB ARBA", "expense"),
+        ("Pago F931 AFIP", "expense"),
+        ("Honorarios consultoría", "income"),
+        ("Suscripción Slack", "expense"),
+    ]
+
+    assert classify_names(categorizer, registry, rows) == [
+        "Ventas",
+        "Servicios Públicos",
+        "Impuestos",
+        "Salarios",
+        "Servicios Profesionales",
+        "Software y Suscripciones",
+    ]
+
+
+def test_classify_ignores_generic_words(categorizer, registry):
+    rows = [
+        ("TRANSF F 1234 PROVEEDOR", "expense"),
+        ("Pago proveedor F.C. 1", "expense"),
+        ("Claro que si", "expense"),
+        ("Cobro factura", "expense"),
+    ]
+
+    assert classify_names(categorizer, registry, rows) == [None, None, None, None]
+
+
+def test_classify_prefers_learned_categories(registry):
+    learned_id = registry.ids_by_name["Alquiler"]
+    key = "expense\x1f" + normalize_descriptions(pd.Series(["Transferencia a Juan"]))[0]
+    categorizer = TransactionCategorizer(KeywordIndex(registry), {key: learned_id})
+
+    rows = [("TRANSFERENCIA A JUAN 00456", "expense"), ("Transferencia a Juan", "income"), ("Pago EDENOR", "expense")]
+
+    assert classify_names(categorizer, registry, rows) == ["Alquiler", None, "Servicios Públicos"]
+
+
+def test_classify_keeps_index(categorizer):
+    descriptions = pd.Series(["Pago EDENOR", "xyz"], index=[10, 20])
+
+    result = categorizer.classify(descriptions, pd.Series(["expense", "expense"], index=[10, 20]))
+
+    assert list(result.index) == [10, 20]
+    assert result.isna().tolist() == [False, True]
@@ -0,0 +1,89 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from src.services.financial_analysis import calculate_financial_metrics, metrics_from_rollup_rows
+from src.services.fx import CurrencyConversion
+from src.services.inflation import InflationAdjustment, InflationIndex, month_number
+from src.services.rollups import aggregate_transactions, aggregate_transactions_frame
+
+
+def rollup_rows(buckets):
+    """Filas con los atributos de `MonthlyRollup` a partir de los grupos de `aggregate_transactions`."""
+    return [
+        SimpleNamespace(user_id=user_id, year=year, month=month, category_id=category_id, type=type_, currency=currency, **bucket)
+        for (user_id, year, month, category_id, type_, currency), bucket in buckets.items()
+    ]
+
+
+def transactions_frame(transactions):
+    return pd.DataFrame({
+        "user_id": [t.user_id for t in transactions],
+        "date": pd.to_datetime([t.date for t in transactions]),
+        "category_id": [t.category_id for t in transactions],
+        "type": [t.type for t in transactions],
+        "currency": [t.currency for t in transactions],
+        "amount": [float(t.amount) for t in transactions],
+    })
+
+
+@pytest.fixture(scope="module")
+def category_name(transactions):
+    names = {t.category_id: t.category.name for t in transactions if t.category}
+    return names.get
+
+
+@pytest.fixture(scope="module", params=["objects", "frame"])
+def rows(request, transactions):
+    """Rollups armados igual que al guardar transacciones, una por una o desde un DataFrame."""
+    if request.param == "objects":
+        return rollup_rows(aggregate_transactions(transactions))
+    return rollup_rows(aggregate_transactions_frame(transactions_frame(transactions)))
+
+
+@pytest.fixture(scope="module")
+def conversion(transactions):
+    # Cotizaciones enteras: convertir cada transacción o cada total mensual da
+    # exactamente lo mismo, sin diferencias de redondeo.
+    months = {month_number(t.date.year, t.date.month) for t in transactions}
+    rates = {}
+    for number in months:
+        rates[("USD", number)] = Decimal(800 + number % 50)
+        rates[("EUR", number)] = Decimal(900 + number % 30)
+    return CurrencyConversion("ARS", rates)
+
+
+def test_rollups_match_reference(transactions, rows, category_name):
+    assert metrics_from_rollup_rows(rows, category_name) == calculate_financial_metrics(transactions)
+
+
+def test_rollups_match_reference_with_conversion(transactions, rows, category_name, conversion):
+    expected = calculate_financial_metrics(transactions, conversion=conversion)
+
+    assert expected["moneda"] == "ARS"
+    assert metrics_from_rollup_rows(rows, category_name, conversion=conversion) == expected
+
+
+def test_rollups_with_inflation_adjustment_differ_only_in_rounding(transactions, rows, category_name):
+    rates = {month_number(2024, 1) + k: Decimal("3.1") + Decimal(k % 5) * Decimal("0.41") for k in range(24)}
+    adjustment = InflationAdjustment(InflationIndex.from_rates(rates), 2025, 12)
+
+    expected = calculate_financial_metrics(transactions, adjustment)
+    result = metrics_from_rollup_rows(rows, category_name, adjustment)
+
+    # La referencia redondea al centavo cada transacción ajustada y los rollups, cada
+    # total mensual: cada redondeo aporta como mucho medio centavo de diferencia.
+    tolerance = 0.005 * (len(transactions) + len(rows))
+    assert result["periodo_analizado"] == expected["periodo_analizado"]
+    assert result["pesos_constantes_de"] == expected["pesos_constantes_de"]
+    for key in ("total_ingresos", "total_egresos", "beneficio_neto"):
+        assert result[key] == pytest.approx(expected[key], abs=tolerance)
+    assert result["desglose_egresos"].keys() == expected["desglose_egresos"].keys()
+    for name, amount in expected["desglose_egresos"].items():
+        assert result["desglose_egresos"][name] == pytest.approx(amount, abs=tolerance)
+
+
+def test_rollups_without_rows():
+    assert metrics_from_rollup_rows([], lambda category_id: None) == calculate_financial_metrics([])
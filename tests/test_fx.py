@@ -0,0 +1,74 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.core import cache
+from src.services import fx
+
+
+class FakeSession:
+    """Sesión que responde a la consulta de `get_rates` con las cotizaciones de `rows`."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        rows = self.rows
+
+        class Result:
+            def all(self):
+                return list(rows)
+
+        return Result()
+
+
+@pytest.fixture(autouse=True)
+def empty_rate_cache():
+    fx.clear_rate_cache()
+    yield
+    fx.clear_rate_cache()
+
+
+def test_get_rates_uses_previous_rate_within_lookback():
+    db = FakeSession([(date(2025, 5, 29), Decimal("1100"))])
+
+    rates = asyncio.run(fx.get_rates(db, "USD", [date(2025, 5, 31)]))
+
+    assert rates == {date(2025, 5, 31): Decimal("1100")}
+
+
+def test_cached_rates_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    db = FakeSession([(date(2025, 5, 29), Decimal("1100"))])
+    assert asyncio.run(fx.get_rates(db, "USD", [date(2025, 5, 31)]))[date(2025, 5, 31)] == Decimal("1100")
+
+    # Se carga la cotización del último día del mes: mientras la caché esté vigente se
+    # sigue usando la anterior, y al vencer se lee la nueva.
+    db.rows = [(date(2025, 5, 29), Decimal("1100")), (date(2025, 5, 31), Decimal("1150"))]
+    assert asyncio.run(fx.get_rates(db, "USD", [date(2025, 5, 31)]))[date(2025, 5, 31)] == Decimal("1100")
+    assert db.queries == 1
+
+    now[0] += fx.FX_RATE_CACHE_TTL_SECONDS + 1
+    assert asyncio.run(fx.get_rates(db, "USD", [date(2025, 5, 31)]))[date(2025, 5, 31)] == Decimal("1150")
+    assert db.queries == 2
+
+
+def test_get_rates_without_rate_raises():
+    db = FakeSession([(date(2025, 1, 1), Decimal("1000"))])
+
+    with pytest.raises(ValueError):
+        asyncio.run(fx.get_rates(db, "USD", [date(2025, 5, 31)]))
+
+
+def test_currency_conversion_is_case_insensitive():
+    month = 2025 * 12 + 4
+    conversion = fx.CurrencyConversion("USD", {("USD", month): Decimal("1000"), ("EUR", month): Decimal("1100")})
+
+    assert conversion.factor("usd", month) == Decimal(1)
+    assert conversion.factor("ars", month) == Decimal("0.001")
+    assert conversion.factor("eur", month) == Decimal("1.1")
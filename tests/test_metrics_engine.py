@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.services.financial_analysis import _apply_factor, calculate_financial_metrics
+from src.services.inflation import InflationAdjustment, InflationIndex, month_number
+from src.services.metrics_engine import TYPE_CODES, _apply_factors, calculate_financial_metrics_columnar
+
+
+def to_columns(transactions):
+    """Columnas de NumPy que espera `calculate_financial_metrics_columnar`."""
+    names = sorted({t.category.name for t in transactions if t.category})
+    codes = {name: code for code, name in enumerate(names)}
+    return dict(
+        amount_cents=np.array([int(t.amount * 100) for t in transactions], dtype=np.int64),
+        type_codes=np.array([TYPE_CODES[t.type] for t in transactions]),
+        category_codes=np.array([codes[t.category.name] if t.category else -1 for t in transactions]),
+        category_names=names,
+        dates=np.array([t.date for t in transactions], dtype="datetime64[us]"),
+    )
+
+
+@pytest.fixture(scope="module")
+def adjustment():
+    # Tasas mensuales con varios decimales, para que los montos ajustados no sean exactos.
+    rates = {month_number(2024, 1) + k: Decimal("2.5") + Decimal(k % 7) * Decimal("0.37") for k in range(24)}
+    return InflationAdjustment(InflationIndex.from_rates(rates), 2025, 12)
+
+
+def test_columnar_matches_reference(transactions):
+    assert calculate_financial_metrics_columnar(**to_columns(transactions)) == calculate_financial_metrics(transactions)
+
+
+def test_columnar_matches_reference_with_inflation_adjustment(transactions, adjustment):
+    expected = calculate_financial_metrics(transactions, adjustment)
+
+    assert calculate_financial_metrics_columnar(**to_columns(transactions), adjustment=adjustment) == expected
+
+
+def test_columnar_without_transactions():
+    empty = np.array([], dtype=np.int64)
+    result = calculate_financial_metrics_columnar(empty, empty, empty, [], np.array([], dtype="datetime64[us]"))
+
+    assert result == calculate_financial_metrics([])
+
+
+def test_apply_factors_rounds_like_decimal():
+    # En float64, 15 * 1.1 da exactamente 16.5 (y `np.rint` lo lleva a 16), pero el
+    # producto exacto es apenas mayor y `Decimal` lo redondea a 17.
+    amount_cents = np.array([15, 10, 150, 5, 3, 1], dtype=np.int64)
+    factors = np.array([1.1, 1.05, 1.21, 0.7, 1.5, 1.5])
+
+    expected = [int(_apply_factor(Decimal(int(c)).scaleb(-2), f) * 100) for c, f in zip(amount_cents, factors)]
+
+    assert _apply_factors(amount_cents, factors).tolist() == expected == [17, 11, 181, 3, 4, 2]
+
+
+def test_apply_factors_random_amounts():
+    rng = np.random.default_rng(7)
+    amount_cents = rng.integers(1, 10**12, size=5000)
+    factors = rng.choice([1.1, 1.05, 0.7, 2.3, 1.0 / 3], size=5000)
+
+    expected = [int(_apply_factor(Decimal(int(c)).scaleb(-2), f) * 100) for c, f in zip(amount_cents, factors)]
+
+    assert _apply_factors(amount_cents, factors).tolist() == expected